@@ -0,0 +1,237 @@
+"""Acoustic echo cancellation of TTS playback before wake word inference."""
+
+import logging
+import threading
+from typing import Callable
+
+import numpy as np
+
+from .resampler import PolyphaseResampler
+from .ring_buffer import RingBuffer
+
+logger = logging.getLogger(__name__)
+
+
+class EchoReference:
+    """
+    TTS playback samples aligned to the capture sample clock.
+
+    The playback callback writes what it just sent to the speaker at the
+    capture ring buffer's current write position, so the echo canceller can
+    fetch the reference for any captured frame by its absolute position.
+    Positions that saw no playback read back as silence.
+    """
+
+    def __init__(
+        self,
+        capture_position: Callable[[], int],
+        capture_rate: int,
+        playback_rate: int,
+        buffer_seconds: float = 2.0,
+        max_lead_ms: int = 200,
+    ):
+        """
+        Initialize echo reference.
+
+        Args:
+            capture_position: Returns the capture ring buffer's write position
+            capture_rate: Capture sample rate in Hz
+            playback_rate: Playback sample rate in Hz
+            buffer_seconds: How much reference history to keep
+            max_lead_ms: How far playback may run ahead of capture before
+                the excess is dropped (corrects clock drift between devices)
+        """
+        self.capture_position = capture_position
+        self.capture_rate = capture_rate
+        self.playback_rate = playback_rate
+        # Playback blocks form one continuous stream, so resampling keeps state
+        self._resampler = (
+            PolyphaseResampler(playback_rate, capture_rate) if playback_rate != capture_rate else None
+        )
+        self.max_lead = capture_rate * max_lead_ms // 1000
+        # Echo tails die out well within a second of playback stopping
+        self.hold = capture_rate
+        self._ring = RingBuffer(int(capture_rate * buffer_seconds))
+        self._lock = threading.Lock()
+        self.last_write_position = 0
+
+    def write(self, played: np.ndarray) -> None:
+        """
+        Record samples that were just handed to the speaker.
+
+        Args:
+            played: Mono int16 samples at the playback rate
+        """
+        samples = self._resampler.process(played) if self._resampler else played
+        now = self.capture_position()
+
+        with self._lock:
+            # Nothing was played since the last write: fill the gap with silence
+            self._ring.write_silence(now - self._ring.write_position)
+            room = now + self.max_lead - self._ring.write_position
+            if room <= 0:
+                return
+            self._ring.write(samples[:room])
+            self.last_write_position = self._ring.write_position
+
+    def read(self, end: int, n: int) -> np.ndarray:
+        """
+        Reference samples for capture positions [end - n, end).
+
+        Args:
+            end: Absolute capture position just past the frame
+            n: Number of samples
+
+        Returns:
+            int16 array of length n (silence where nothing was played)
+        """
+        out = np.zeros(n, dtype=np.int16)
+        with self._lock:
+            write_pos = self._ring.write_position
+            start = max(end - n, write_pos - self._ring.capacity)
+            stop = min(end, write_pos)
+            if stop > start:
+                out[start - (end - n):stop - (end - n)] = self._ring.view(start, stop - start)
+        return out
+
+    def active(self, end: int) -> bool:
+        """True if playback may still be echoing at capture position end."""
+        return self.last_write_position > 0 and end - self.last_write_position < self.hold
+
+
+class EchoCanceller:
+    """
+    Partitioned-block frequency-domain NLMS adaptive filter.
+
+    The filter models the speaker-to-microphone echo path in M partitions
+    of B taps each and subtracts the predicted echo from every captured
+    block. Adaptation is frozen while a Geigel detector sees near-end
+    speech (double talk), so a user barging in is not cancelled away.
+    """
+
+    def __init__(
+        self,
+        block_size: int = 256,
+        filter_ms: int = 128,
+        sample_rate: int = 16000,
+        step_size: float = 0.5,
+        delay_ms: int = 0,
+        double_talk_threshold: float = 2.0,
+    ):
+        """
+        Initialize echo canceller.
+
+        Args:
+            block_size: Samples per processing block (B)
+            filter_ms: Length of the modelled echo path in milliseconds
+            sample_rate: Sample rate in Hz
+            step_size: NLMS step size (0-1, higher adapts faster)
+            delay_ms: Bulk delay applied to the reference before filtering
+            double_talk_threshold: Geigel threshold: double talk is declared when
+                the mic peak exceeds this multiple of the recent reference peak
+        """
+        self.block_size = block_size
+        self.partitions = max(1, int(np.ceil(filter_ms * sample_rate / 1000 / block_size)))
+        self.step_size = step_size
+        self.delay = delay_ms * sample_rate // 1000
+        self.double_talk_threshold = double_talk_threshold
+
+        bins = block_size + 1
+        self._weights = np.zeros((self.partitions, bins), dtype=np.complex64)
+        self._x_spectra = np.zeros((self.partitions, bins), dtype=np.complex64)
+        self._x_power = np.full(bins, 1e-3, dtype=np.float32)
+        self._x_prev = np.zeros(block_size, dtype=np.float32)
+        self._x_delay = np.zeros(self.delay, dtype=np.float32)
+        self._x_peak_history = np.zeros(self.partitions, dtype=np.float32)
+
+        # Counters
+        self.blocks_processed = 0
+        self.blocks_double_talk = 0
+
+    def reset(self) -> None:
+        """Forget the learned echo path."""
+        self._weights[:] = 0
+        self._x_spectra[:] = 0
+        self._x_prev[:] = 0
+        self._x_delay[:] = 0
+        self._x_peak_history[:] = 0
+
+    def process(self, mic: np.ndarray, reference: np.ndarray) -> np.ndarray:
+        """
+        Remove the echo of reference from mic.
+
+        Args:
+            mic: Captured int16 samples (length a multiple of block_size)
+            reference: Playback int16 samples aligned to mic
+
+        Returns:
+            Echo-cancelled int16 samples
+        """
+        d = mic.astype(np.float32) / 32768.0
+        x = reference.astype(np.float32) / 32768.0
+        if self.delay:
+            x = np.concatenate((self._x_delay, x))
+            self._x_delay = x[-self.delay:].copy()
+            x = x[:len(d)]
+
+        out = np.empty_like(d)
+        B = self.block_size
+        for start in range(0, len(d) - B + 1, B):
+            out[start:start + B] = self._process_block(d[start:start + B], x[start:start + B])
+
+        tail = len(d) % B
+        if tail:
+            # Unaligned tail passes through unfiltered
+            out[-tail:] = d[-tail:]
+
+        return np.clip(out * 32768.0, -32768, 32767).astype(np.int16)
+
+    def _process_block(self, d: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """Filter and adapt on one block of B samples."""
+        B = self.block_size
+
+        # Overlap-save: spectrum of the last 2B reference samples
+        X = np.fft.rfft(np.concatenate((self._x_prev, x)))
+        self._x_prev = x
+        self._x_spectra = np.roll(self._x_spectra, 1, axis=0)
+        self._x_spectra[0] = X
+
+        # Echo estimate and error
+        y = np.fft.irfft((self._weights * self._x_spectra).sum(axis=0))[B:]
+        e = d - y
+        self.blocks_processed += 1
+
+        # Geigel double-talk detector over the filter's time span
+        self._x_peak_history = np.roll(self._x_peak_history, 1)
+        self._x_peak_history[0] = np.abs(x).max()
+        x_peak = self._x_peak_history.max()
+        if x_peak < 1e-4:
+            return e
+        if np.abs(d).max() > self.double_talk_threshold * x_peak:
+            self.blocks_double_talk += 1
+            return e
+
+        # Normalized gradient with the constraint that keeps each partition causal
+        self._x_power = 0.9 * self._x_power + 0.1 * (np.abs(X) ** 2)
+        E = np.fft.rfft(np.concatenate((np.zeros(B, dtype=np.float32), e)))
+        gradient = np.conj(self._x_spectra) * (E / (self.partitions * self._x_power + 1e-6))
+        constrained = np.fft.irfft(gradient, axis=1)
+        constrained[:, B:] = 0
+        self._weights += self.step_size * np.fft.rfft(constrained, axis=1).astype(np.complex64)
+        return e
+
+
+def erle_db(mic: np.ndarray, cancelled: np.ndarray) -> float:
+    """
+    Echo return loss enhancement between two int16 signals.
+
+    Args:
+        mic: Signal before echo cancellation
+        cancelled: Signal after echo cancellation
+
+    Returns:
+        ERLE in dB (higher is better)
+    """
+    mic_power = float(np.mean(mic.astype(np.float64) ** 2))
+    residual_power = float(np.mean(cancelled.astype(np.float64) ** 2))
+    return 10 * np.log10((mic_power + 1e-9) / (residual_power + 1e-9))
@@ -1,62 +1,274 @@
 """Audio capture module using PyAudio."""
 
 import logging
+import asyncio
+from abc import ABC, abstractmethod
+import threading
+import time
 import pyaudio
 import numpy as np
-from typing import Generator
+from typing import AsyncIterator, Generator, Optional
+
+from .beamformer import DelayAndSumBeamformer
+from .logging_setup import RateLimitedLogger
+from .metrics import Histogram
+from .resampler import PolyphaseResampler
+from .ring_buffer import RingBuffer, RingReader
 
 logger = logging.getLogger(__name__)
+rate_limited = RateLimitedLogger(logger)
+
+# Device buffers whose arrival time is kept for capture_time()
+ARRIVALS_KEPT = 256
+
+
+class AudioSource(ABC):
+    """
+    Base for sources that hand audio to the event loop through a ring buffer.
+
+    Subclasses write samples to `ring` from their own thread and call
+    _notify_consumer(); chunks() takes care of the event loop side.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        channels: int,
+        chunk_size: int,
+        buffer_seconds: float = 2.0,
+        beamformer: Optional[DelayAndSumBeamformer] = None,
+    ):
+        """
+        Initialize audio source.
+
+        Args:
+            sample_rate: Sample rate in Hz
+            channels: Number of interleaved channels produced by the device
+            chunk_size: Default frames per chunk
+            buffer_seconds: Capacity of the ring buffer in seconds
+            beamformer: Combines multi-channel input into one channel (without
+                it, only the first channel of multi-channel input is kept)
+        """
+        self.sample_rate = sample_rate
+        self.device_channels = channels
+        # Consumers always see mono audio
+        self.channels = 1
+        self.chunk_size = chunk_size
+        self.beamformer = beamformer
+        # Converts device-rate audio to sample_rate (None if they match)
+        self.resampler: Optional[PolyphaseResampler] = None
+
+        # PyAudio instance playback may share (None if the source has none)
+        self.pyaudio: Optional[pyaudio.PyAudio] = None
+
+        # Captured samples are handed from the audio thread to the event loop
+        # through a preallocated ring buffer
+        self.ring = RingBuffer(int(sample_rate * buffer_seconds))
+        self._running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._data_ready = asyncio.Event()
 
+        # Arrival time of recent device buffers and the ring position each
+        # ended at, written by the producer thread only
+        self._arrival_times = [0.0] * ARRIVALS_KEPT
+        self._arrival_positions = [0] * ARRIVALS_KEPT
+        self._arrivals = 0
 
-class AudioCapture:
+    @abstractmethod
+    def start(self) -> None:
+        """Start producing audio."""
+
+    @abstractmethod
+    def stop(self) -> None:
+        """Stop producing audio."""
+
+    def list_devices(self) -> None:
+        """Log where audio comes from."""
+
+    async def chunks(
+        self, frame_size: Optional[int] = None, reader: Optional[RingReader] = None
+    ) -> AsyncIterator[np.ndarray]:
+        """
+        Async iterator over captured frames that never blocks the event loop.
+
+        Each call gets its own cursor over the shared ring buffer, so several
+        consumers can read differently sized frames from the same capture.
+        Frames are read-only views into the ring buffer; copy them if they
+        must outlive roughly `buffer_seconds` of further capture.
+
+        Args:
+            frame_size: Frames per yielded chunk (defaults to chunk_size)
+            reader: Cursor to read with (defaults to a new one at the write position)
+
+        Yields:
+            Audio frames as numpy arrays of int16 samples
+        """
+        self._loop = asyncio.get_running_loop()
+        frame_samples = (frame_size or self.chunk_size) * self.channels
+        reader = reader or self.ring.reader()
+
+        while self._running:
+            frame = reader.read(frame_samples)
+            if frame is None:
+                # Any write after the failed read schedules a set() that runs
+                # after this clear(), so no wakeup can be lost
+                self._data_ready.clear()
+                await self._data_ready.wait()
+                continue
+            yield frame
+
+    def _write(self, samples: np.ndarray) -> None:
+        """Reduce captured samples to one channel at sample_rate and append them to the ring buffer."""
+        if self.beamformer:
+            samples = self.beamformer.process(samples)
+        elif self.device_channels > 1:
+            # Strided view of the first channel; the ring buffer copies it
+            samples = samples[::self.device_channels]
+        if self.resampler:
+            samples = self.resampler.process(samples)
+        self.ring.write(samples)
+
+        # The time is stored before the position that publishes it
+        i = self._arrivals % ARRIVALS_KEPT
+        self._arrival_times[i] = time.monotonic()
+        self._arrival_positions[i] = self.ring.write_position
+        self._arrivals += 1
+
+    def capture_time(self, position: int) -> Optional[float]:
+        """
+        When the sample just before a ring position was captured.
+
+        Args:
+            position: Absolute ring buffer position (e.g. just past a frame)
+
+        Returns:
+            Monotonic arrival time of the device buffer holding that sample,
+            or None if it is older than the arrivals kept
+        """
+        count = self._arrivals
+        captured_at = None
+        # Walk back to the first buffer that reaches the position
+        for n in range(count - 1, max(count - ARRIVALS_KEPT, 0) - 1, -1):
+            i = n % ARRIVALS_KEPT
+            if self._arrival_positions[i] < position:
+                return captured_at
+            captured_at = self._arrival_times[i]
+        return captured_at if count <= ARRIVALS_KEPT else None
+
+    def _notify_consumer(self) -> None:
+        """Wake the chunks() consumer from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._data_ready.set)
+        except RuntimeError:
+            # Event loop shut down between the check and the call
+            pass
+
+
+class AudioCapture(AudioSource):
     """Handles audio capture from microphone."""
 
-    def __init__(self, device_index: int, sample_rate: int, channels: int, chunk_size: int):
+    def __init__(
+        self,
+        device_index: int,
+        sample_rate: int,
+        channels: int,
+        chunk_size: int,
+        capture_mode: str = "callback",
+        buffer_seconds: float = 2.0,
+        beamformer: Optional[DelayAndSumBeamformer] = None,
+        device_sample_rate: Optional[int] = None,
+    ):
         """
         Initialize audio capture.
 
         Args:
             device_index: Index of the audio input device
-            sample_rate: Sample rate in Hz (16000 for speech)
-            channels: Number of audio channels (1 for mono)
-            chunk_size: Number of frames per buffer
+            sample_rate: Sample rate in Hz delivered to consumers (16000 for speech)
+            channels: Number of audio channels (1 for mono, more for a mic array)
+            chunk_size: Number of frames per buffer at sample_rate
+            capture_mode: 'callback' (PyAudio callback) or 'thread' (dedicated reader thread)
+            buffer_seconds: Capacity of the capture ring buffer in seconds
+            beamformer: Combines mic array channels into one (runs on the audio thread)
+            device_sample_rate: Rate to open the device at, resampled to sample_rate
+                in process (None for sample_rate, 0 to use the device's default
+                rate when it doesn't support sample_rate)
         """
+        if capture_mode not in ("callback", "thread"):
+            raise ValueError(f"Unknown capture mode: {capture_mode}")
+
+        super().__init__(sample_rate, channels, chunk_size, buffer_seconds, beamformer)
         self.device_index = device_index
-        self.sample_rate = sample_rate
-        self.channels = channels
-        self.chunk_size = chunk_size
+        self.capture_mode = capture_mode
         self.format = pyaudio.paInt16
 
         self.pyaudio = pyaudio.PyAudio()
         self.stream = None
 
+        self.device_sample_rate = self._resolve_device_rate(device_sample_rate)
+        if self.device_sample_rate != sample_rate:
+            self.resampler = PolyphaseResampler(self.device_sample_rate, sample_rate)
+        # Same buffer duration at the device rate
+        self.device_chunk_size = chunk_size * self.device_sample_rate // sample_rate
+
+        self.input_overflows = 0
+        self._reader_thread: Optional[threading.Thread] = None
+
+        # Deviation of each buffer's arrival from the nominal buffer period
+        self.jitter_histogram: Optional[Histogram] = None
+        self.max_jitter_ms = 0.0
+        self._buffer_seconds = self.device_chunk_size / self.device_sample_rate
+        self._last_buffer_at: Optional[float] = None
+
     def start(self) -> None:
         """Start audio capture stream."""
         try:
             logger.info(
                 f"Opening audio stream: device={self.device_index}, "
-                f"rate={self.sample_rate}, channels={self.channels}"
+                f"rate={self.device_sample_rate}, channels={self.device_channels}, mode={self.capture_mode}"
             )
+            if self.resampler:
+                logger.info(
+                    f"Resampling {self.device_sample_rate} Hz to {self.sample_rate} Hz "
+                    f"({self.resampler.latency_ms:.1f} ms filter delay)"
+                )
+            self._running = True
+            self._last_buffer_at = None
             self.stream = self.pyaudio.open(
                 format=self.format,
-                channels=self.channels,
-                rate=self.sample_rate,
+                channels=self.device_channels,
+                rate=self.device_sample_rate,
                 input=True,
                 input_device_index=self.device_index,
-                frames_per_buffer=self.chunk_size,
+                frames_per_buffer=self.device_chunk_size,
+                stream_callback=self._on_audio if self.capture_mode == "callback" else None,
             )
+            if self.capture_mode == "thread":
+                self._reader_thread = threading.Thread(
+                    target=self._reader_loop, name="audio-capture", daemon=True
+                )
+                self._reader_thread.start()
             logger.info("Audio stream opened successfully")
         except Exception as e:
+            self._running = False
             logger.error(f"Failed to open audio stream: {e}")
             raise
 
     def stop(self) -> None:
         """Stop audio capture stream."""
+        self._running = False
+        if self._reader_thread:
+            self._reader_thread.join(timeout=1.0)
+            self._reader_thread = None
         if self.stream:
             logger.info("Closing audio stream")
             self.stream.stop_stream()
             self.stream.close()
             self.stream = None
+        # Wake any consumer waiting in chunks() so it can exit
+        self._notify_consumer()
 
     def read_chunk(self) -> np.ndarray:
         """
@@ -67,14 +279,16 @@ class AudioCapture:
         """
         if not self.stream:
             raise RuntimeError("Audio stream not started")
+        if self.capture_mode == "callback":
+            raise RuntimeError("read_chunk() is not available in callback capture mode")
 
         try:
-            data = self.stream.read(self.chunk_size, exception_on_overflow=False)
+            data = self.stream.read(self.device_chunk_size, exception_on_overflow=False)
             # Convert bytes to numpy array of int16
             audio_array = np.frombuffer(data, dtype=np.int16)
             return audio_array
         except Exception as e:
-            logger.error(f"Error reading audio chunk: {e}")
+            rate_limited.error("Error reading audio chunk: %s", e)
             raise
 
     def stream_chunks(self) -> Generator[np.ndarray, None, None]:
@@ -87,6 +301,57 @@ class AudioCapture:
         while True:
             yield self.read_chunk()
 
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PyAudio stream callback; runs on the PortAudio thread."""
+        if status & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        self._record_arrival()
+        self._write(np.frombuffer(in_data, dtype=np.int16))
+        self._notify_consumer()
+        return (None, pyaudio.paContinue if self._running else pyaudio.paComplete)
+
+    def _reader_loop(self) -> None:
+        """Blocking reads on a dedicated thread, feeding the ring buffer."""
+        while self._running:
+            try:
+                chunk = self.read_chunk()
+            except Exception:
+                # read_chunk() already logged the error; back off briefly
+                time.sleep(0.1)
+                continue
+            self._record_arrival()
+            self._write(chunk)
+            self._notify_consumer()
+
+    def _record_arrival(self) -> None:
+        """Measure capture jitter: how far this buffer's arrival is from one period after the last."""
+        now = time.monotonic()
+        if self._last_buffer_at is not None:
+            jitter = abs(now - self._last_buffer_at - self._buffer_seconds)
+            self.max_jitter_ms = max(self.max_jitter_ms, jitter * 1000)
+            if self.jitter_histogram:
+                self.jitter_histogram.observe(jitter)
+        self._last_buffer_at = now
+
+    def _resolve_device_rate(self, device_sample_rate: Optional[int]) -> int:
+        """Pick the rate to open the device at (see __init__)."""
+        if device_sample_rate is None:
+            return self.sample_rate
+        if device_sample_rate:
+            return device_sample_rate
+        try:
+            self.pyaudio.is_format_supported(
+                self.sample_rate,
+                input_device=self.device_index,
+                input_channels=self.device_channels,
+                input_format=self.format,
+            )
+            return self.sample_rate
+        except ValueError:
+            rate = int(self.get_device_info().get("defaultSampleRate", self.sample_rate))
+            logger.info(f"Device {self.device_index} doesn't support {self.sample_rate} Hz, using {rate} Hz")
+            return rate
+
     def get_device_info(self) -> dict:
         """Get information about the audio device."""
         try:
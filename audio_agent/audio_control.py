@@ -0,0 +1,170 @@
+"""Non-blocking speaker mute control for local barge-in."""
+
+import logging
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pulsectl
+except ImportError:
+    pulsectl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SINK = "@DEFAULT_SINK@"
+
+
+class PulseControlBackend:
+    """
+    Mutes through a long-lived PulseAudio/PipeWire connection (pulsectl).
+
+    pulsectl is blocking and not thread-safe, so the connection lives on a
+    single dedicated thread and calls are awaited from the event loop.
+    """
+
+    name = "pulsectl"
+
+    def __init__(self, sink: str = DEFAULT_SINK):
+        """
+        Initialize backend.
+
+        Args:
+            sink: Sink name, or @DEFAULT_SINK@ for the current default
+        """
+        if pulsectl is None:
+            raise RuntimeError("pulsectl is not installed")
+        self.sink = sink
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speaker-control")
+        self._pulse = None
+
+    async def connect(self) -> None:
+        """Open the server connection ahead of the first mute."""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._ensure_connected)
+
+    async def set_mute(self, muted: bool) -> None:
+        """Mute or unmute the sink."""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._set_mute, muted)
+
+    def close(self) -> None:
+        """Close the connection and its thread."""
+        self._executor.submit(self._disconnect)
+        self._executor.shutdown(wait=False)
+
+    def _ensure_connected(self) -> None:
+        if self._pulse is None:
+            self._pulse = pulsectl.Pulse("audio-agent")
+
+    def _disconnect(self) -> None:
+        if self._pulse is not None:
+            self._pulse.close()
+            self._pulse = None
+
+    def _set_mute(self, muted: bool) -> None:
+        for attempt in range(2):
+            try:
+                self._ensure_connected()
+                name = self.sink
+                if name == DEFAULT_SINK:
+                    name = self._pulse.server_info().default_sink_name
+                self._pulse.mute(self._pulse.get_sink_by_name(name), muted)
+                return
+            except pulsectl.PulseError:
+                # Server restarted under us; reconnect once and retry
+                self._disconnect()
+                if attempt:
+                    raise
+
+
+class PactlBackend:
+    """Mutes by running pactl as an async subprocess (never blocks the loop)."""
+
+    name = "pactl"
+
+    def __init__(self, sink: str = DEFAULT_SINK, timeout: float = 1.0):
+        """
+        Initialize backend.
+
+        Args:
+            sink: Sink name, or @DEFAULT_SINK@ for the current default
+            timeout: Seconds to wait for pactl to finish
+        """
+        self.sink = sink
+        self.timeout = timeout
+
+    async def connect(self) -> None:
+        """Nothing to prepare for pactl."""
+
+    async def set_mute(self, muted: bool) -> None:
+        """Mute or unmute the sink."""
+        process = await asyncio.create_subprocess_exec(
+            "pactl", "set-sink-mute", self.sink, "1" if muted else "0",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            await asyncio.wait_for(process.wait(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            raise
+
+    def close(self) -> None:
+        """Nothing to release for pactl."""
+
+
+class SpeakerControl:
+    """Async mute()/unmute() API over the best available backend."""
+
+    def __init__(self, backend: str = "auto", sink: str = DEFAULT_SINK):
+        """
+        Initialize speaker control.
+
+        Args:
+            backend: 'auto', 'pulsectl', 'pactl' or 'none'
+            sink: Sink name, or @DEFAULT_SINK@ for the current default
+        """
+        self.muted = False
+        self.backend = None
+
+        if backend in ("auto", "pulsectl") and pulsectl is not None:
+            self.backend = PulseControlBackend(sink)
+        elif backend == "pulsectl":
+            logger.warning("pulsectl not installed, falling back to pactl")
+            self.backend = PactlBackend(sink)
+        elif backend in ("auto", "pactl"):
+            self.backend = PactlBackend(sink)
+        elif backend != "none":
+            raise ValueError(f"Unknown speaker control backend: {backend}")
+
+    async def start(self) -> None:
+        """Prepare the backend so the first mute is fast."""
+        if not self.backend:
+            logger.info("Speaker control disabled")
+            return
+        try:
+            await self.backend.connect()
+            logger.info(f"Speaker control ready ({self.backend.name})")
+        except Exception as e:
+            logger.warning(f"Speaker control backend failed to connect: {e}")
+
+    async def mute(self) -> None:
+        """Mute the speaker."""
+        await self._set_mute(True)
+
+    async def unmute(self) -> None:
+        """Unmute the speaker."""
+        await self._set_mute(False)
+
+    def close(self) -> None:
+        """Release the backend."""
+        if self.backend:
+            self.backend.close()
+
+    async def _set_mute(self, muted: bool) -> None:
+        if not self.backend:
+            return
+        try:
+            await self.backend.set_mute(muted)
+            self.muted = muted
+            logger.info("🔇 Speaker muted locally" if muted else "🔊 Speaker unmuted")
+        except Exception as e:
+            logger.warning(f"Failed to {'mute' if muted else 'unmute'} speaker: {e}")
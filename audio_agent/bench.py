@@ -0,0 +1,1002 @@
+"""Offline benchmarks for the audio pipeline.
+
+Usage:
+    python -m audio_agent.bench codec [--input session1.wav --input session2.wav]
+    python -m audio_agent.bench aec [--mic mic.wav --ref playback.wav] [--output out.wav]
+    python -m audio_agent.bench beamform [--input array.wav --channels 6 --mic-channels 1,2,3,4]
+    python -m audio_agent.bench resample [--rates 48000 44100] [--alsa-device 1,0 --alsa-rate 48000]
+    python -m audio_agent.bench dispatch [--trace messages.jsonl]
+    python -m audio_agent.bench alloc [--seconds 60 --chunk-size 1024]
+    python -m audio_agent.bench detector [--input session.wav --wake-at 2.4 --wake-at 9.1]
+    python -m audio_agent.bench agent [--input session.wav --wake-at 2.4] [--speed 1]
+    python -m audio_agent.bench models --model hey_jarvis_v0.1.onnx --model alexa_v0.1.onnx
+    python -m audio_agent.bench latency --input traces.jsonl
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import wave
+from contextlib import suppress
+
+import numpy as np
+
+from . import framing
+from .aec import EchoCanceller, erle_db
+from .beamformer import DelayAndSumBeamformer
+from .codec import OpusDecoder, create_encoder
+from .file_source import load_audio_file
+from .logging_setup import setup_logging
+from .resampler import PolyphaseResampler
+from .tracing import summarize
+
+# Detections closer together than this belong to one wake word event
+EVENT_GAP_SECONDS = 1.0
+
+
+def load_wav(path: str, sample_rate: int) -> np.ndarray:
+    """Load a 16-bit WAV or raw PCM file as mono int16 samples."""
+    return load_audio_file(path, sample_rate)
+
+
+def save_wav(path: str, samples: np.ndarray, sample_rate: int) -> None:
+    """
+    Write mono int16 samples to a 16-bit WAV file.
+
+    Args:
+        path: WAV file path
+        samples: Mono int16 samples
+        sample_rate: Sample rate in Hz
+    """
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+
+
+def synthetic_speech(seconds: float, sample_rate: int, seed: int = 0) -> np.ndarray:
+    """
+    Generate a speech-like test signal (harmonic voicing with syllable-rate
+    envelope plus background noise).
+
+    Args:
+        seconds: Duration in seconds
+        sample_rate: Sample rate in Hz
+        seed: Random seed for the noise component
+
+    Returns:
+        Mono int16 samples
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 2
+    signal = 0.3 * voiced * envelope + 0.01 * rng.standard_normal(len(t))
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Percentile of a list, 0.0 if empty."""
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def bench_codec(args: argparse.Namespace) -> None:
+    """Loopback each codec over every session and report CPU and bitrate."""
+    if args.input:
+        sessions = [(path, load_wav(path, args.sample_rate)) for path in args.input]
+    else:
+        sessions = [("synthetic", synthetic_speech(args.seconds, args.sample_rate))]
+
+    print(f"{'session':<24} {'codec':<6} {'cpu %rt':>8} {'us/chunk':>9} "
+          f"{'payload kbps':>13} {'binary kbps':>12} {'json kbps':>10} {'decoded s':>10}")
+
+    for name, audio in sessions:
+        duration = len(audio) / args.sample_rate
+        for codec_name in args.codecs:
+            encoder = create_encoder(
+                codec_name, args.sample_rate, frame_ms=args.frame_ms, bitrate=args.bitrate
+            )
+            if encoder.name != codec_name:
+                print(f"{name:<24} {codec_name:<6} unavailable")
+                continue
+            decoder = OpusDecoder(args.sample_rate, args.frame_ms) if codec_name == "opus" else None
+
+            encode_times = []
+            payload_bytes = binary_bytes = json_bytes = 0
+            decoded_samples = 0
+            sequence = 0
+
+            for start in range(0, len(audio) - args.chunk_size + 1, args.chunk_size):
+                chunk = audio[start:start + args.chunk_size]
+                t0 = time.perf_counter()
+                packets = encoder.encode(chunk)
+                encode_times.append(time.perf_counter() - t0)
+
+                for packet in packets:
+                    # Loop each packet through both wire formats and back
+                    frame = framing.encode_frame(
+                        framing.KIND_AUDIO_CHUNK, encoder.codec_id, sequence, packet
+                    )
+                    received = framing.decode_frame(frame).payload
+                    message = json.dumps({"type": "audio_chunk", "data": {
+                        "audio": base64.b64encode(packet).decode("utf-8"), "seq": sequence,
+                    }})
+                    decoded = decoder.decode(received) if decoder else received
+                    decoded_samples += len(decoded) // (1 if decoder else 2)
+
+                    payload_bytes += len(packet)
+                    binary_bytes += len(frame)
+                    json_bytes += len(message)
+                    sequence += 1
+
+            cpu_fraction = sum(encode_times) / duration
+            print(
+                f"{name[-24:]:<24} {codec_name:<6} {100 * cpu_fraction:>8.3f} "
+                f"{1e6 * _percentile(encode_times, 50):>9.1f} "
+                f"{8 * payload_bytes / duration / 1000:>13.1f} "
+                f"{8 * binary_bytes / duration / 1000:>12.1f} "
+                f"{8 * json_bytes / duration / 1000:>10.1f} "
+                f"{decoded_samples / args.sample_rate:>10.2f}"
+            )
+
+
+def synthetic_echo(seconds: float, sample_rate: int, delay_ms: int = 20) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate a speaker playing TTS into a small room.
+
+    Args:
+        seconds: Duration in seconds
+        sample_rate: Sample rate in Hz
+        delay_ms: Speaker-to-mic delay in milliseconds
+
+    Returns:
+        (mic, reference) int16 arrays of equal length
+    """
+    rng = np.random.default_rng(2)
+    reference = synthetic_speech(seconds, sample_rate, seed=1)
+    # Exponentially decaying noise tail (~50 ms reverberation) after a bulk delay
+    taps = int(0.05 * sample_rate)
+    response = rng.standard_normal(taps) * np.exp(-np.arange(taps) / (0.01 * sample_rate))
+    response = np.concatenate((np.zeros(delay_ms * sample_rate // 1000), 0.5 * response / np.abs(response).max()))
+    echo = np.convolve(reference.astype(np.float64), response)[:len(reference)]
+    mic = echo + 30 * rng.standard_normal(len(echo))
+    return np.clip(mic, -32768, 32767).astype(np.int16), reference
+
+
+def bench_aec(args: argparse.Namespace) -> None:
+    """Run the echo canceller over a mic/reference pair and report ERLE and CPU."""
+    if args.mic and args.ref:
+        mic = load_wav(args.mic, args.sample_rate)
+        reference = load_wav(args.ref, args.sample_rate)
+        n = min(len(mic), len(reference))
+        mic, reference = mic[:n], reference[:n]
+    elif args.mic or args.ref:
+        raise SystemExit("--mic and --ref must be given together")
+    else:
+        mic, reference = synthetic_echo(args.seconds, args.sample_rate)
+
+    canceller = EchoCanceller(
+        block_size=args.block_size,
+        filter_ms=args.filter_ms,
+        sample_rate=args.sample_rate,
+        step_size=args.step_size,
+        delay_ms=args.delay_ms,
+    )
+
+    cancelled = np.zeros_like(mic)
+    frame_times = []
+    for start in range(0, len(mic) - args.frame_size + 1, args.frame_size):
+        end = start + args.frame_size
+        t0 = time.perf_counter()
+        cancelled[start:end] = canceller.process(mic[start:end], reference[start:end])
+        frame_times.append(time.perf_counter() - t0)
+
+    frame_seconds = args.frame_size / args.sample_rate
+    half = len(mic) // 2
+    print(f"frames:            {len(frame_times)} x {1000 * frame_seconds:.0f} ms")
+    print(f"ERLE overall:      {erle_db(mic, cancelled):.1f} dB")
+    print(f"ERLE second half:  {erle_db(mic[half:], cancelled[half:]):.1f} dB")
+    print(f"double-talk:       {canceller.blocks_double_talk}/{canceller.blocks_processed} blocks")
+    print(f"us/frame p50/p99:  {1e6 * _percentile(frame_times, 50):.0f} / {1e6 * _percentile(frame_times, 99):.0f}")
+    print(f"cpu %rt:           {100 * sum(frame_times) / (len(frame_times) * frame_seconds):.2f}")
+
+    if args.output:
+        save_wav(args.output, cancelled, args.sample_rate)
+        print(f"wrote {args.output}")
+
+
+def synthetic_array(
+    seconds: float, sample_rate: int, delays: list[int], noise: float = 0.05
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate a mic array hearing one talker in diffuse noise.
+
+    Args:
+        seconds: Duration in seconds
+        sample_rate: Sample rate in Hz
+        delays: Arrival delay of the talker at each mic, in samples
+        noise: Independent noise level per mic (fraction of full scale)
+
+    Returns:
+        (interleaved int16 array, clean mono int16 talker signal)
+    """
+    rng = np.random.default_rng(3)
+    clean = synthetic_speech(seconds, sample_rate, seed=1)
+    lead = max(delays)
+    padded = np.concatenate((np.zeros(lead, dtype=np.int16), clean)).astype(np.float64)
+    mics = []
+    for delay in delays:
+        talker = padded[lead - delay:lead - delay + len(clean)]
+        mics.append(talker + noise * 32767 * rng.standard_normal(len(clean)))
+    interleaved = np.stack(mics, axis=1).reshape(-1)
+    return np.clip(interleaved, -32768, 32767).astype(np.int16), clean
+
+
+def _snr_db(signal: np.ndarray, clean: np.ndarray, max_lag: int, skip: int = 0) -> float:
+    """
+    SNR of signal against the best-aligned, best-scaled copy of clean.
+
+    Args:
+        signal: Noisy int16 samples, lagging clean by 0..max_lag samples
+        clean: Clean int16 samples
+        max_lag: Largest lag to try
+        skip: Leading samples to leave out (at least max_lag)
+
+    Returns:
+        SNR in dB
+    """
+    x = signal[skip:].astype(np.float64)
+    best = -np.inf
+    for lag in range(max_lag + 1):
+        target = clean[skip - lag:skip - lag + len(x)].astype(np.float64)
+        scale = np.dot(x[:len(target)], target) / (np.dot(target, target) + 1e-9)
+        residual = x[:len(target)] - scale * target
+        best = max(best, 10 * np.log10(scale * scale * np.dot(target, target) / (np.dot(residual, residual) + 1e-9)))
+    return float(best)
+
+
+def bench_beamform(args: argparse.Namespace) -> None:
+    """Beamform a multi-channel recording and report CPU per frame, steering and SNR gain."""
+    clean = None
+    if args.input:
+        interleaved = load_audio_file(args.input, args.sample_rate, args.channels)
+    else:
+        delays = args.delays or [0, 2, 3, 1][:args.channels]
+        if len(delays) != args.channels:
+            raise SystemExit(f"--delays needs {args.channels} values")
+        interleaved, clean = synthetic_array(args.seconds, args.sample_rate, delays, args.noise)
+
+    beamformer = DelayAndSumBeamformer(
+        args.channels,
+        mic_channels=args.mic_channels,
+        max_delay=args.max_delay,
+    )
+
+    step = args.chunk_size * args.channels
+    outputs = []
+    frame_times = []
+    for start in range(0, len(interleaved) - step + 1, step):
+        t0 = time.perf_counter()
+        outputs.append(beamformer.process(interleaved[start:start + step]))
+        frame_times.append(time.perf_counter() - t0)
+    output = np.concatenate(outputs)
+
+    frame_seconds = args.chunk_size / args.sample_rate
+    print(f"frames:            {len(frame_times)} x {1000 * frame_seconds:.0f} ms, {args.channels} channels")
+    print(f"mic channels:      {beamformer.mic_channels}")
+    print(f"steering delays:   {beamformer.delays.tolist()} "
+          f"({beamformer.blocks_steered}/{beamformer.blocks_processed} blocks steered)")
+    print(f"us/frame p50/p99:  {1e6 * _percentile(frame_times, 50):.0f} / {1e6 * _percentile(frame_times, 99):.0f}")
+    print(f"cpu %rt:           {100 * sum(frame_times) / (len(frame_times) * frame_seconds):.2f}")
+
+    if clean is not None:
+        # Skip the first second while the steering settles
+        first_mic = interleaved[beamformer.mic_channels[0]::args.channels]
+        lag = 2 * args.max_delay
+        snr_in = _snr_db(first_mic, clean, lag, skip=args.sample_rate)
+        snr_out = _snr_db(output, clean, lag, skip=args.sample_rate)
+        print(f"SNR first mic:     {snr_in:.1f} dB")
+        print(f"SNR beamformed:    {snr_out:.1f} dB ({snr_out - snr_in:+.1f} dB)")
+
+    if args.output:
+        save_wav(args.output, output, args.sample_rate)
+        print(f"wrote {args.output}")
+
+
+def _tone_level_db(rate: int, frequency: float, convert) -> float:
+    """Level (dBFS) of what a full-scale tone turns into after convert()."""
+    t = np.arange(rate) / rate
+    tone = (32767 * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+    out = convert(tone)[len(tone) // 10:].astype(np.float64)
+    return float(20 * np.log10(np.sqrt(np.mean(out ** 2)) * np.sqrt(2) / 32767 + 1e-9))
+
+
+def _linear_resample(samples: np.ndarray, in_rate: int, out_rate: int) -> np.ndarray:
+    """Linear interpolation, as ALSA's default plug rate converter does."""
+    n_out = len(samples) * out_rate // in_rate
+    positions = np.arange(n_out) * (in_rate / out_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+
+
+def _arecord_cpu(device: str, rate: int, channels: int, seconds: float) -> float:
+    """CPU seconds arecord spends capturing from an ALSA device for a while."""
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    subprocess.run(
+        ["arecord", "-q", "-D", device, "-f", "S16_LE", "-r", str(rate), "-c", str(channels),
+         "-d", str(int(seconds)), "/dev/null"],
+        check=True,
+    )
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+
+
+def bench_resample(args: argparse.Namespace) -> None:
+    """CPU per chunk, chunk continuity and aliasing of the capture resampler."""
+    print(f"{'rate':>6} {'taps':>5} {'us/chunk p50':>13} {'p99':>6} {'cpu %rt':>8} "
+          f"{'linear %rt':>11} {'continuous':>11} {'alias dB':>9} {'linear alias':>13}")
+
+    for rate in args.rates:
+        audio = synthetic_speech(args.seconds, rate)
+        chunk = args.chunk_size * rate // args.sample_rate
+        resampler = PolyphaseResampler(rate, args.sample_rate)
+
+        chunk_times = []
+        linear_times = []
+        outputs = []
+        for start in range(0, len(audio) - chunk + 1, chunk):
+            block = audio[start:start + chunk]
+            t0 = time.perf_counter()
+            outputs.append(resampler.process(block))
+            chunk_times.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            _linear_resample(block, rate, args.sample_rate)
+            linear_times.append(time.perf_counter() - t0)
+
+        # Chunked output must match resampling the whole signal at once
+        whole = PolyphaseResampler(rate, args.sample_rate).process(audio[:len(chunk_times) * chunk])
+        continuous = np.array_equal(np.concatenate(outputs), whole)
+
+        # A tone above the output Nyquist should vanish, not fold down
+        alias_frequency = 0.6 * args.sample_rate
+        alias = _tone_level_db(rate, alias_frequency, PolyphaseResampler(rate, args.sample_rate).process)
+        linear_alias = _tone_level_db(
+            rate, alias_frequency, lambda x: _linear_resample(x, rate, args.sample_rate)
+        )
+
+        chunk_seconds = chunk / rate
+        realtime = len(chunk_times) * chunk_seconds
+        print(
+            f"{rate:>6} {resampler.taps_per_phase:>5} {1e6 * _percentile(chunk_times, 50):>13.0f} "
+            f"{1e6 * _percentile(chunk_times, 99):>6.0f} {100 * sum(chunk_times) / realtime:>8.2f} "
+            f"{100 * sum(linear_times) / realtime:>11.2f} {'yes' if continuous else 'NO':>11} "
+            f"{alias:>9.1f} {linear_alias:>13.1f}"
+        )
+
+    if args.alsa_device and not shutil.which("arecord"):
+        print("arecord not found (install alsa-utils) - skipping the ALSA plug comparison")
+    elif args.alsa_device:
+        # The difference between capturing through plug at the pipeline rate
+        # and capturing at the native rate is what ALSA's resampling costs
+        native = _arecord_cpu(f"hw:{args.alsa_device}", args.alsa_rate, args.alsa_channels, args.alsa_seconds)
+        plug = _arecord_cpu(f"plughw:{args.alsa_device}", args.sample_rate, args.alsa_channels, args.alsa_seconds)
+        print(f"arecord hw:{args.alsa_device} @ {args.alsa_rate} Hz:   "
+              f"cpu %rt {100 * native / args.alsa_seconds:.2f}")
+        print(f"arecord plughw:{args.alsa_device} @ {args.sample_rate} Hz: "
+              f"cpu %rt {100 * plug / args.alsa_seconds:.2f} (plug resampling {100 * (plug - native) / args.alsa_seconds:+.2f})")
+
+
+def synthetic_trace(turns: int, tts_seconds: float, tts_chunk_ms: int, tts_rate: int, seed: int = 0) -> list[str]:
+    """Backend messages of a few conversation turns, as received on the socket."""
+    rng = np.random.default_rng(seed)
+    chunk_bytes = 2 * tts_rate * tts_chunk_ms // 1000
+    words = "turn on the kitchen lights and set the thermostat to twenty one degrees please".split()
+    trace = []
+    for _ in range(turns):
+        trace.append(json.dumps({"type": "set_state", "data": {"state": "listening"}}))
+        for n in range(1, len(words) + 1):
+            trace.append(json.dumps({"type": "transcript", "text": " ".join(words[:n]), "is_final": n == len(words)}))
+        trace.append(json.dumps({"type": "set_state", "data": {"state": "processing"}}))
+        for status in ("started", "finished"):
+            trace.append(json.dumps({"type": "tool_status", "status": status, "name": "set_lights"}))
+        trace.append(json.dumps({"type": "assistant_response", "text": "Done, the kitchen lights are on."}))
+        trace.append(json.dumps({"type": "set_state", "data": {"state": "speaking"}}))
+        for _ in range(int(tts_seconds * 1000 / tts_chunk_ms)):
+            audio = rng.integers(-3000, 3000, chunk_bytes // 2, dtype=np.int16).tobytes()
+            trace.append(json.dumps({"type": "tts_audio", "data": base64.b64encode(audio).decode()}))
+        trace.append(json.dumps({"type": "set_state", "data": {"state": "idle"}}))
+    return trace
+
+
+async def _dispatch_times(client, trace: list[str], rounds: int) -> dict[str, list[float]]:
+    """Time the client's handling of every message, grouped by event type."""
+    times: dict[str, list[float]] = {}
+    for _ in range(rounds):
+        for message, event_type in trace:
+            t0 = time.perf_counter()
+            await client._handle_message(message)
+            times.setdefault(event_type, []).append(time.perf_counter() - t0)
+    return times
+
+
+def bench_dispatch(args: argparse.Namespace) -> None:
+    """Decode and dispatch CPU per incoming message for each JSON backend."""
+    from . import websocket_client
+    from .websocket_client import WebSocketClient, decode_message
+
+    if args.trace:
+        # One message per line, as received from the backend
+        with open(args.trace) as f:
+            messages = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        messages = synthetic_trace(args.turns, args.tts_seconds, args.tts_chunk_ms, args.tts_rate)
+    trace = [(message, json.loads(message).get("type")) for message in messages]
+
+    client = WebSocketClient("ws://localhost", "bench")
+    client.on_tts_audio = lambda audio, audio_format: None
+    client.on_state_change = lambda state: None
+    client.on_transcript = lambda text, is_final: None
+    client.on_tool_status = lambda status, name: None
+
+    backends = [("json", json.loads)]
+    if websocket_client.orjson:
+        backends.append(("orjson", websocket_client.orjson.loads))
+    else:
+        print("orjson not installed (pip install orjson) - timing the stdlib parser only")
+
+    total_bytes = sum(len(message) for message in messages)
+    print(f"trace: {len(messages)} messages, {total_bytes / 1e6:.2f} MB, "
+          f"{sum(event_type == 'tts_audio' for _, event_type in trace)} tts_audio")
+    print(f"{'parser':>14} {'us/msg p50':>11} {'p99':>6} {'tts_audio p50':>14} {'other p50':>10} "
+          f"{'msgs/s':>8} {'MB/s':>6} {'same':>5}")
+
+    saved = websocket_client.json_loads, websocket_client.LAZY_DECODE_BYTES
+    try:
+        for name, loads in backends:
+            for sliced in (False, True):
+                lazy_bytes = saved[1] if sliced else len(max(messages, key=len)) + 1
+                same = all(decode_message(message, loads, lazy_bytes) == json.loads(message) for message in messages)
+
+                websocket_client.json_loads, websocket_client.LAZY_DECODE_BYTES = loads, lazy_bytes
+                times = asyncio.run(_dispatch_times(client, trace, args.rounds))
+                everything = [t for values in times.values() for t in values]
+                tts = times.get("tts_audio", [])
+                other = [t for event_type, values in times.items() if event_type != "tts_audio" for t in values]
+                elapsed = sum(everything)
+                print(
+                    f"{name + (' +slice' if sliced else ''):>14} {1e6 * _percentile(everything, 50):>11.1f} "
+                    f"{1e6 * _percentile(everything, 99):>6.1f} {1e6 * _percentile(tts, 50):>14.1f} "
+                    f"{1e6 * _percentile(other, 50):>10.1f} {len(everything) / elapsed:>8.0f} "
+                    f"{args.rounds * total_bytes / elapsed / 1e6:>6.0f} {'yes' if same else 'NO':>5}"
+                )
+    finally:
+        websocket_client.json_loads, websocket_client.LAZY_DECODE_BYTES = saved
+
+
+def _allocated_bytes(step, buffers: list[bytes]) -> int:
+    """Bytes step() allocates over all buffers (the peak of each call, so freed temporaries count)."""
+    tracemalloc.start()
+    total = 0
+    try:
+        for data in buffers:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            step(data)
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return total
+
+
+def bench_alloc(args: argparse.Namespace) -> None:
+    """Memory allocated per second of streamed audio, from the capture callback to the socket."""
+    from .codec import PcmEncoder
+    from .ring_buffer import RingBuffer
+    from .session_buffer import SessionAudioBuffer
+
+    sample_rate = 16000
+    audio = synthetic_speech(args.seconds, sample_rate)
+    # Device buffers as PyAudio hands them to the capture callback
+    buffers = [
+        audio[i:i + args.chunk_size].tobytes()
+        for i in range(0, len(audio) - args.chunk_size + 1, args.chunk_size)
+    ]
+    seconds = len(buffers) * args.chunk_size / sample_rate
+
+    def legacy_encode(samples: np.ndarray) -> list[bytes]:
+        return [samples.astype(np.int16, copy=False).tobytes()]
+
+    def legacy_frame(sequence: int, payload: bytes) -> bytes:
+        header = framing.HEADER.pack(
+            framing.FRAME_VERSION, framing.KIND_AUDIO_CHUNK, framing.CODEC_PCM_S16LE, 0,
+            sequence, time.time_ns() // 1000,
+        )
+        return header + payload
+
+    print(f"{len(buffers)} buffers of {args.chunk_size} samples ({seconds:.1f} s), "
+          f"wake word frames of {args.frame_size}, binary frames with session replay")
+    print(f"{'path':>10} {'bytes/s':>10} {'per chunk':>10} {'audio x':>8}")
+    for name, encode, frame in (
+        ("copying", legacy_encode, legacy_frame),
+        ("zero-copy", PcmEncoder(sample_rate).encode, None),
+    ):
+        ring = RingBuffer(2 * sample_rate)
+        wake_reader, stream_reader = ring.reader(), ring.reader()
+        session = SessionAudioBuffer(max_bytes=4 * len(audio))
+        session.start("wakeword_detected", {})
+        sequence = 0
+
+        def step(data: bytes) -> None:
+            nonlocal sequence
+            # Capture callback, then what the wake word and streaming loops do
+            ring.write(np.frombuffer(data, dtype=np.int16))
+            while wake_reader.read(args.frame_size) is not None:
+                pass
+            while (chunk := stream_reader.read(args.chunk_size)) is not None:
+                for packet in encode(chunk):
+                    session.add(sequence, "pcm", packet)
+                    # Built by the writer and dropped once sent
+                    if frame:
+                        frame(sequence, packet)
+                    else:
+                        framing.encode_frame(framing.KIND_AUDIO_CHUNK, framing.CODEC_PCM_S16LE, sequence, packet)
+                    sequence += 1
+
+        allocated = _allocated_bytes(step, buffers)
+        print(f"{name:>10} {allocated / seconds:>10.0f} {allocated / len(buffers):>10.0f} "
+              f"{allocated / (seconds * sample_rate * 2):>8.2f}")
+    print("(the websockets library's masking copy on send comes on top of both)")
+
+
+def _group_events(times: list[float]) -> list[float]:
+    """Collapse detections of one utterance into a single event (its first detection)."""
+    events = []
+    for t in sorted(times):
+        if not events or t - last >= EVENT_GAP_SECONDS:
+            events.append(t)
+        last = t
+    return events
+
+
+def _score_events(events: list[float], wake_at: list[float], window: float) -> tuple[list[float], int, int]:
+    """
+    Match detection events to labelled wake word end times.
+
+    Args:
+        events: Detection event times in seconds
+        wake_at: Times at which a wake word ends, in seconds
+        window: Latest acceptable detection after a wake word ends
+
+    Returns:
+        (latencies of matched events, misses, false accepts)
+    """
+    latencies = []
+    unmatched = list(events)
+    for label in sorted(wake_at):
+        # The model may fire slightly before the labelled end of the phrase
+        hits = [t for t in unmatched if label - EVENT_GAP_SECONDS <= t <= label + window]
+        if hits:
+            latencies.append(hits[0] - label)
+            unmatched.remove(hits[0])
+    return latencies, len(wake_at) - len(latencies), len(unmatched)
+
+
+def _print_accuracy(events: list[float], wake_at: list[float], window: float, duration: float) -> None:
+    """Print detection latency, misses and false accepts."""
+    if not wake_at:
+        print(f"detections:        {len(events)} (no --wake-at labels, all count as false accepts)")
+        print(f"false accepts/h:   {3600 * len(events) / duration:.1f}")
+        return
+    latencies, misses, false_accepts = _score_events(events, wake_at, window)
+    print(f"detections:        {len(events)} ({len(wake_at) - misses}/{len(wake_at)} wake words)")
+    print(f"latency p50/p99:   {1000 * _percentile(latencies, 50):.0f} / {1000 * _percentile(latencies, 99):.0f} ms")
+    print(f"misses:            {misses}")
+    print(f"false accepts:     {false_accepts} ({3600 * false_accepts / duration:.1f}/h)")
+
+
+def _load_session(args: argparse.Namespace) -> np.ndarray:
+    """Audio for a benchmark run: --input, or synthetic speech without a wake word."""
+    if args.input:
+        return load_audio_file(args.input, args.sample_rate)
+    return synthetic_speech(args.seconds, args.sample_rate)
+
+
+def _postprocessor(args: argparse.Namespace):
+    """Detection post-processor configured like the agent's (WAKE_WORD_* settings)."""
+    from .config import Config
+    from .wake_word import DetectionPostProcessor
+
+    config = Config.from_env().wake_word
+    return DetectionPostProcessor(
+        threshold=args.threshold,
+        thresholds=config.thresholds,
+        smoothing_frames=config.smoothing_frames,
+        trigger_frames=config.trigger_frames,
+        window_frames=config.trigger_window,
+        adaptive_gain=config.adaptive_gain,
+        release_ms=config.release_ms,
+    )
+
+
+def bench_detector(args: argparse.Namespace) -> None:
+    """Run WakeWordDetector over a recording as fast as possible."""
+    from .wake_word import WakeWordDetector
+
+    audio = _load_session(args)
+    detector = WakeWordDetector(
+        args.model, args.threshold,
+        inference_framework=args.inference, threads=args.threads, quantized=args.quantized,
+    )
+    detector.load_model()
+    postprocessor = None if args.raw else _postprocessor(args)
+
+    frame_seconds = args.frame_size / args.sample_rate
+    inference_times = []
+    detection_times = []
+    wall_start = time.perf_counter()
+    for start in range(0, len(audio) - args.frame_size + 1, args.frame_size):
+        frame = audio[start:start + args.frame_size]
+        t0 = time.perf_counter()
+        if postprocessor:
+            detected = postprocessor.update(detector.predict(frame), frame_seconds) is not None
+        else:
+            detected, _, _ = detector.detect(frame)
+        elapsed = time.perf_counter() - t0
+        inference_times.append(elapsed)
+        if detected:
+            # Live, the result is ready one inference after the frame is captured
+            detection_times.append((start + args.frame_size) / args.sample_rate + elapsed)
+    wall = time.perf_counter() - wall_start
+
+    duration = len(audio) / args.sample_rate
+    print(f"frames:            {len(inference_times)} x {1000 * frame_seconds:.0f} ms")
+    print(f"frames/sec:        {len(inference_times) / wall:.0f} ({duration / wall:.1f}x real time)")
+    print(f"us/frame p50/p99:  {1e6 * _percentile(inference_times, 50):.0f} / {1e6 * _percentile(inference_times, 99):.0f}")
+    print(f"cpu %rt:           {100 * sum(inference_times) / duration:.2f}")
+    if postprocessor:
+        print(f"suppressed:        {postprocessor.suppressed_triggers} repeat triggers, "
+              f"final thresholds {postprocessor.stats()['thresholds']}")
+    _print_accuracy(_group_events(detection_times), args.wake_at, args.window, duration)
+
+
+class _TimedDetector:
+    """Wraps a WakeWordDetector to record inference times."""
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.inference_times: list[float] = []
+
+    def predict(self, audio_chunk: np.ndarray) -> dict[str, float]:
+        t0 = time.monotonic()
+        scores = self.detector.predict(audio_chunk)
+        self.inference_times.append(time.monotonic() - t0)
+        return scores
+
+    def __getattr__(self, name):
+        return getattr(self.detector, name)
+
+
+async def _run_agent(args: argparse.Namespace, path: str) -> None:
+    """Run the full agent on a file against a local stand-in backend."""
+    import websockets
+
+    from .config import Config
+    from .file_source import FileAudioSource
+    from .main import AudioAgent
+
+    wire_bytes: dict[str, int] = {}
+    wire_messages: dict[str, int] = {}
+    sent_times: list[float] = []
+
+    async def backend(websocket) -> None:
+        async for message in websocket:
+            now = time.monotonic()
+            if isinstance(message, bytes):
+                batch = framing.decode_frame(message).kind == framing.KIND_AUDIO_BATCH
+                kind, size = "binary_batch" if batch else "binary_audio", len(message)
+            else:
+                kind, size = json.loads(message).get("type"), len(message.encode())
+            wire_bytes[kind] = wire_bytes.get(kind, 0) + size
+            wire_messages[kind] = wire_messages.get(kind, 0) + 1
+
+            if kind == "connection_ready":
+                await websocket.send(json.dumps({"type": "connection_ack", "data": {
+                    "binary_audio": args.binary, "audio_codec": args.codec, "audio_batch": True,
+                }}))
+            elif kind == "wakeword_detected":
+                sent_times.append(now)
+            elif kind == "stream_end":
+                # Skip the assistant turn so the next wake word starts a new session
+                await websocket.send(json.dumps({"type": "set_state", "data": {"state": "idle"}}))
+
+    async with websockets.serve(backend, "127.0.0.1", 0) as server:
+        config = Config.from_env()
+        config.backend_ws_url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        config.binary_audio = args.binary
+        config.audio.codec = args.codec
+        config.wake_word.model_names = args.model
+        config.wake_word.inference_framework = args.inference
+        config.wake_word.threads = args.threads
+        config.wake_word.quantized = args.quantized
+        config.wake_word.threshold = args.threshold
+        config.connection.audio_batch_max = args.batch
+        config.speaker.control = "none"
+        config.speaker.playback_enabled = False
+        config.aec.enabled = False
+
+        source = FileAudioSource(
+            path,
+            sample_rate=args.sample_rate,
+            chunk_size=config.audio.chunk_size,
+            speed=args.speed,
+            consumers=2,
+            buffer_seconds=config.audio.buffer_seconds,
+        )
+        agent = AudioAgent(config, audio_source=source)
+        detector = _TimedDetector(agent.wake_word)
+        agent.wake_word_worker.detector = detector
+
+        # Record when the worker turns scores into a detection
+        detection_times: list[float] = []
+        postprocessor = agent.wake_word_worker.postprocessor
+        update = postprocessor.update
+
+        def timed_update(scores: dict[str, float], seconds: float):
+            event = update(scores, seconds)
+            if event:
+                detection_times.append(time.monotonic())
+            return event
+
+        postprocessor.update = timed_update
+
+        task = asyncio.create_task(agent.start())
+        await asyncio.get_running_loop().run_in_executor(None, source.finished.wait)
+        wall = time.monotonic() - source.started_at
+        # Let the worker and the socket finish the last frames
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    worker = agent.wake_word_worker
+    print(f"audio:             {source.duration:.1f} s in {wall:.1f} s (speed {args.speed or 'max'})")
+    print(f"frames/sec:        {worker.frames_processed / wall:.0f} "
+          f"(processed {worker.frames_processed}, dropped {worker.frames_dropped})")
+    print(f"inference p50/p99: {1000 * _percentile(detector.inference_times, 50):.1f} / "
+          f"{1000 * _percentile(detector.inference_times, 99):.1f} ms")
+
+    if args.speed:
+        # With real-time pacing, audio time t was captured at started_at + t / speed
+        events = [(t - source.started_at) * args.speed for t in _group_events(detection_times)]
+        _print_accuracy(events, args.wake_at, args.window, source.duration)
+    else:
+        print(f"detections:        {len(_group_events(detection_times))} "
+              f"(latency needs --speed > 0)")
+
+    # Each wakeword_detected goes with the last detection before it
+    send_latencies = []
+    for sent in sent_times:
+        earlier = [t for t in detection_times if t <= sent]
+        if earlier:
+            send_latencies.append(sent - earlier[-1])
+    print(f"detect->sent p50/p99: {1000 * _percentile(send_latencies, 50):.2f} / "
+          f"{1000 * _percentile(send_latencies, 99):.2f} ms ({len(send_latencies)} sent)")
+
+    ws_stats = agent.ws_client.stats()
+    print(f"send queue:        max depth {ws_stats['max_queue_depth']}, "
+          f"{ws_stats['audio_dropped']} chunks dropped, {ws_stats['batches_sent']} batches")
+    print(f"send latency:      avg {ws_stats['avg_send_latency_ms']:.2f} ms, "
+          f"max {ws_stats['max_send_latency_ms']:.2f} ms")
+
+    print("bytes on the wire:")
+    for kind in sorted(wire_bytes):
+        print(f"  {kind:<18} {wire_messages[kind]:>6} msgs {wire_bytes[kind]:>10} bytes")
+    print(f"  {'total':<18} {sum(wire_messages.values()):>6} msgs {sum(wire_bytes.values()):>10} bytes")
+
+
+def bench_agent(args: argparse.Namespace) -> None:
+    """Run the full AudioAgent on a recording against a local stand-in backend."""
+    if args.input:
+        asyncio.run(_run_agent(args, args.input))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.wav")
+        save_wav(path, synthetic_speech(args.seconds, args.sample_rate), args.sample_rate)
+        asyncio.run(_run_agent(args, path))
+
+
+def bench_models(args: argparse.Namespace) -> None:
+    """Per-frame CPU as wake word models are added to one shared front end."""
+    from .wake_word import WakeWordDetector
+
+    audio = _load_session(args)
+    frames = [audio[start:start + args.frame_size]
+              for start in range(0, len(audio) - args.frame_size + 1, args.frame_size)]
+    frame_seconds = args.frame_size / args.sample_rate
+
+    print(f"{'models':>6} {'us/frame p50':>13} {'us/frame p99':>13} {'cpu %rt':>8} "
+          f"{'vs 1 model':>11} {'per extra model':>16}")
+    baseline = None
+    for count in range(1, len(args.model) + 1):
+        detector = WakeWordDetector(
+            args.model[:count], threshold=1.1,
+            inference_framework=args.inference, threads=args.threads, quantized=args.quantized,
+        )
+        detector.load_model()
+        times = []
+        for frame in frames:
+            t0 = time.perf_counter()
+            detector.detect(frame)
+            times.append(time.perf_counter() - t0)
+
+        p50 = _percentile(times, 50)
+        baseline = baseline or p50
+        extra = (p50 - baseline) / (count - 1) if count > 1 else 0.0
+        print(f"{count:>6} {1e6 * p50:>13.0f} {1e6 * _percentile(times, 99):>13.0f} "
+              f"{100 * sum(times) / (len(frames) * frame_seconds):>8.2f} "
+              f"{p50 / baseline:>10.2f}x {1e6 * extra:>14.0f}us")
+
+
+def bench_latency(args: argparse.Namespace) -> None:
+    """Aggregate interaction traces (LATENCY_TRACE_FILE) by stage."""
+    records = []
+    for path in args.input:
+        with open(path) as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+
+    print(f"interactions: {len(records)}")
+    print(f"{'stage':<20} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for stage, row in summarize(records).items():
+        print(f"{stage:<20} {row['count']:>6} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['max_ms']:>9.1f}")
+
+
+def _add_detector_args(parser: argparse.ArgumentParser) -> None:
+    """Arguments shared by the detector and agent benchmarks."""
+    parser.add_argument("--input", help="16-bit WAV or raw PCM file (synthetic speech if omitted)")
+    parser.add_argument("--wake-at", type=float, action="append", default=[],
+                        help="Time (sec) at which a wake word ends; repeat for each one")
+    parser.add_argument("--window", type=float, default=2.0,
+                        help="Latest detection after --wake-at that still counts as a hit (sec)")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Synthetic session length")
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    _add_model_args(parser)
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("WAKE_WORD_THRESHOLD", "0.5")))
+
+
+def _add_model_args(parser: argparse.ArgumentParser) -> None:
+    """--model (defaulting to the WAKE_WORD_MODEL list) and inference options."""
+    parser.add_argument("--model", action="append",
+                        help="Wake word model; repeat for several (default: WAKE_WORD_MODEL)")
+    parser.set_defaults(default_models=os.getenv("WAKE_WORD_MODEL", "hey_jarvis_v0.1.onnx"))
+    parser.add_argument("--inference", choices=["auto", "tflite", "onnx"],
+                        default=os.getenv("WAKE_WORD_INFERENCE", "auto"),
+                        help="Inference framework (auto benchmarks the installed ones)")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("WAKE_WORD_THREADS", "1")),
+                        help="Threads for the shared feature models")
+    parser.add_argument("--quantized", action="store_true", help="Prefer models/<name>_int8.<ext>")
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(prog="python -m audio_agent.bench", description=__doc__.splitlines()[0])
+    parser.add_argument("--log-level", default="WARNING", help="Logging level while benchmarking")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    codec_parser = subparsers.add_parser("codec", help="Encode CPU and bitrate per session")
+    codec_parser.add_argument("--input", action="append", help="16-bit WAV file, one per session")
+    codec_parser.add_argument("--seconds", type=float, default=10.0, help="Synthetic session length")
+    codec_parser.add_argument("--sample-rate", type=int, default=16000)
+    codec_parser.add_argument("--chunk-size", type=int, default=1024)
+    codec_parser.add_argument("--codecs", nargs="+", default=["pcm", "opus"])
+    codec_parser.add_argument("--bitrate", type=int, default=24000)
+    codec_parser.add_argument("--frame-ms", type=int, default=20)
+    codec_parser.set_defaults(func=bench_codec)
+
+    aec_parser = subparsers.add_parser("aec", help="Echo cancellation ERLE and CPU per frame")
+    aec_parser.add_argument("--mic", help="16-bit WAV recorded at the microphone")
+    aec_parser.add_argument("--ref", help="16-bit WAV of what the speaker played, aligned to --mic")
+    aec_parser.add_argument("--output", help="Write the cancelled signal to this WAV")
+    aec_parser.add_argument("--seconds", type=float, default=10.0, help="Synthetic session length")
+    aec_parser.add_argument("--sample-rate", type=int, default=16000)
+    aec_parser.add_argument("--frame-size", type=int, default=1280)
+    aec_parser.add_argument("--block-size", type=int, default=256)
+    aec_parser.add_argument("--filter-ms", type=int, default=128)
+    aec_parser.add_argument("--step-size", type=float, default=0.5)
+    aec_parser.add_argument("--delay-ms", type=int, default=0)
+    aec_parser.set_defaults(func=bench_aec)
+
+    beamform_parser = subparsers.add_parser("beamform", help="Mic array beamforming CPU and SNR gain")
+    beamform_parser.add_argument("--input", help="Multi-channel 16-bit WAV or raw PCM (synthetic array if omitted)")
+    beamform_parser.add_argument("--output", help="Write the beamformed signal to this WAV")
+    beamform_parser.add_argument("--channels", type=int, default=4, help="Interleaved channels in the input")
+    beamform_parser.add_argument("--mic-channels", type=lambda v: [int(c) for c in v.split(",")],
+                                 help="Comma-separated channels holding raw mics (default all)")
+    beamform_parser.add_argument("--max-delay", type=int, default=4)
+    beamform_parser.add_argument("--delays", type=int, nargs="+",
+                                 help="Synthetic talker delay per channel in samples")
+    beamform_parser.add_argument("--noise", type=float, default=0.05, help="Synthetic noise level per mic")
+    beamform_parser.add_argument("--seconds", type=float, default=10.0, help="Synthetic session length")
+    beamform_parser.add_argument("--sample-rate", type=int, default=16000)
+    beamform_parser.add_argument("--chunk-size", type=int, default=1024)
+    beamform_parser.set_defaults(func=bench_beamform)
+
+    resample_parser = subparsers.add_parser("resample", help="Capture resampler CPU and aliasing vs ALSA plug")
+    resample_parser.add_argument("--rates", type=int, nargs="+", default=[48000, 44100],
+                                 help="Device rates to convert from")
+    resample_parser.add_argument("--sample-rate", type=int, default=16000, help="Pipeline rate")
+    resample_parser.add_argument("--chunk-size", type=int, default=1024, help="Frames per chunk at the pipeline rate")
+    resample_parser.add_argument("--seconds", type=float, default=10.0, help="Synthetic session length")
+    resample_parser.add_argument("--alsa-device", help="Also time arecord on hw:<card,dev> vs plughw:<card,dev>")
+    resample_parser.add_argument("--alsa-rate", type=int, default=48000, help="Native rate of --alsa-device")
+    resample_parser.add_argument("--alsa-channels", type=int, default=1)
+    resample_parser.add_argument("--alsa-seconds", type=float, default=10.0)
+    resample_parser.set_defaults(func=bench_resample)
+
+    dispatch_parser = subparsers.add_parser("dispatch", help="Incoming message decode and dispatch CPU")
+    dispatch_parser.add_argument("--trace", help="Recorded backend messages, one JSON message per line "
+                                                 "(synthetic conversation turns if omitted)")
+    dispatch_parser.add_argument("--turns", type=int, default=20, help="Synthetic conversation turns")
+    dispatch_parser.add_argument("--tts-seconds", type=float, default=3.0, help="Synthetic TTS audio per turn")
+    dispatch_parser.add_argument("--tts-chunk-ms", type=int, default=200)
+    dispatch_parser.add_argument("--tts-rate", type=int, default=24000)
+    dispatch_parser.add_argument("--rounds", type=int, default=20, help="Passes over the trace per parser")
+    dispatch_parser.set_defaults(func=bench_dispatch)
+
+    alloc_parser = subparsers.add_parser("alloc", help="Memory allocated per second on the capture-to-socket path")
+    alloc_parser.add_argument("--seconds", type=float, default=60.0, help="Synthetic audio streamed")
+    alloc_parser.add_argument("--chunk-size", type=int, default=1024, help="Capture and streaming chunk (frames)")
+    alloc_parser.add_argument("--frame-size", type=int, default=1280, help="Wake word frame (frames)")
+    alloc_parser.set_defaults(func=bench_alloc)
+
+    detector_parser = subparsers.add_parser("detector", help="Wake word CPU, latency and false accepts")
+    _add_detector_args(detector_parser)
+    detector_parser.add_argument("--frame-size", type=int, default=1280)
+    detector_parser.add_argument("--raw", action="store_true",
+                                 help="Fixed per-frame threshold instead of the detection post-processor")
+    detector_parser.set_defaults(func=bench_detector)
+
+    agent_parser = subparsers.add_parser("agent", help="Full agent against a local stand-in backend")
+    _add_detector_args(agent_parser)
+    agent_parser.add_argument("--speed", type=float, default=1.0,
+                              help="Replay speed relative to real time (0 = as fast as possible; "
+                                   "the wake word worker then drops frames it cannot keep up with)")
+    agent_parser.add_argument("--codec", choices=["pcm", "opus"], default="pcm",
+                              help="Codec the stand-in backend selects")
+    agent_parser.add_argument("--json-audio", dest="binary", action="store_false",
+                              help="Have the stand-in backend decline binary audio frames")
+    agent_parser.add_argument("--batch", type=int, default=1,
+                              help="Coalesce up to this many queued audio chunks per binary frame")
+    agent_parser.set_defaults(func=bench_agent)
+
+    models_parser = subparsers.add_parser("models", help="CPU per frame as wake word models are added")
+    _add_model_args(models_parser)
+    models_parser.add_argument("--input", help="16-bit WAV or raw PCM file (synthetic speech if omitted)")
+    models_parser.add_argument("--seconds", type=float, default=30.0, help="Synthetic session length")
+    models_parser.add_argument("--sample-rate", type=int, default=16000)
+    models_parser.add_argument("--frame-size", type=int, default=1280)
+    models_parser.set_defaults(func=bench_models)
+
+    latency_parser = subparsers.add_parser("latency", help="Wake-word-to-reply latency by stage from traces")
+    latency_parser.add_argument("--input", action="append", required=True,
+                                help="JSONL trace file written with LATENCY_TRACE_FILE (repeatable)")
+    latency_parser.set_defaults(func=bench_latency)
+
+    args = parser.parse_args()
+    if hasattr(args, "default_models"):
+        args.model = args.model or [m.strip() for m in args.default_models.split(",") if m.strip()]
+    setup_logging(args.log_level)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
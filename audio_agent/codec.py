@@ -0,0 +1,186 @@
+"""Audio codecs for upstream speech streaming."""
+
+import logging
+import numpy as np
+
+from . import framing
+
+try:
+    import opuslib
+except Exception:
+    # opuslib raises a bare Exception when the binding is installed but
+    # libopus itself is missing
+    opuslib = None
+
+logger = logging.getLogger(__name__)
+
+
+class PcmEncoder:
+    """Pass-through encoder producing raw 16-bit little-endian PCM."""
+
+    name = "pcm"
+    codec_id = framing.CODEC_PCM_S16LE
+
+    def __init__(self, sample_rate: int):
+        """
+        Initialize PCM encoder.
+
+        Args:
+            sample_rate: Sample rate in Hz
+        """
+        self.sample_rate = sample_rate
+
+    def encode(self, samples: np.ndarray) -> list[memoryview]:
+        """
+        Encode a chunk of int16 samples.
+
+        The samples (usually a view into the capture ring buffer) are copied
+        once, straight into a framing.payload_buffer(), which the session
+        replay buffer and the socket writer then share.
+
+        Args:
+            samples: Mono int16 samples
+
+        Returns:
+            List of encoded packets (always one for PCM)
+        """
+        packet = framing.payload_buffer(len(samples) * 2)
+        np.frombuffer(packet, dtype=np.int16)[:] = samples
+        return [packet]
+
+    def flush(self) -> list[bytes]:
+        """Return any buffered audio as final packets."""
+        return []
+
+    def reset(self) -> None:
+        """Discard buffered state before a new stream."""
+
+
+class OpusEncoder:
+    """Opus encoder emitting one packet per fixed-length frame."""
+
+    name = "opus"
+    codec_id = framing.CODEC_OPUS
+
+    def __init__(self, sample_rate: int, frame_ms: int = 20, bitrate: int = 24000, complexity: int = 5):
+        """
+        Initialize Opus encoder.
+
+        Args:
+            sample_rate: Sample rate in Hz (8000, 12000, 16000, 24000 or 48000)
+            frame_ms: Opus frame duration in milliseconds (10, 20, 40 or 60)
+            bitrate: Target bitrate in bits per second
+            complexity: Encoder complexity (0-10, lower is cheaper on CPU)
+        """
+        if opuslib is None:
+            raise RuntimeError("Opus encoding requires opuslib and libopus")
+
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.bitrate = bitrate
+
+        self._encoder = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_VOIP)
+        self._encoder.bitrate = bitrate
+        self._encoder.complexity = complexity
+
+        # Capture chunks rarely align with Opus frames; carry the remainder
+        self._pending = np.zeros(0, dtype=np.int16)
+
+    def encode(self, samples: np.ndarray) -> list[bytes]:
+        """
+        Encode a chunk of int16 samples.
+
+        Args:
+            samples: Mono int16 samples of any length
+
+        Returns:
+            Zero or more Opus packets, one per complete frame
+        """
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+
+        n_frames = len(samples) // self.frame_size
+        packets = []
+        for i in range(n_frames):
+            frame = samples[i * self.frame_size:(i + 1) * self.frame_size]
+            packets.append(self._encoder.encode(frame.tobytes(), self.frame_size))
+
+        self._pending = samples[n_frames * self.frame_size:].copy()
+        return packets
+
+    def flush(self) -> list[bytes]:
+        """Zero-pad and encode the buffered partial frame, if any."""
+        if not len(self._pending):
+            return []
+        padded = np.zeros(self.frame_size, dtype=np.int16)
+        padded[:len(self._pending)] = self._pending
+        self._pending = np.zeros(0, dtype=np.int16)
+        return [self._encoder.encode(padded.tobytes(), self.frame_size)]
+
+    def reset(self) -> None:
+        """Discard buffered state before a new stream."""
+        self._pending = np.zeros(0, dtype=np.int16)
+
+
+class OpusDecoder:
+    """Opus decoder, used for loopback measurements."""
+
+    def __init__(self, sample_rate: int, frame_ms: int = 20):
+        """
+        Initialize Opus decoder.
+
+        Args:
+            sample_rate: Sample rate in Hz
+            frame_ms: Opus frame duration in milliseconds
+        """
+        if opuslib is None:
+            raise RuntimeError("Opus decoding requires opuslib and libopus")
+        self.frame_size = sample_rate * frame_ms // 1000
+        self._decoder = opuslib.Decoder(sample_rate, 1)
+
+    def decode(self, packet: bytes) -> np.ndarray:
+        """Decode one packet to int16 samples."""
+        return np.frombuffer(self._decoder.decode(packet, self.frame_size), dtype=np.int16)
+
+
+def available_codecs() -> list[str]:
+    """
+    List codecs this client can encode, most preferred first.
+
+    Returns:
+        Codec names as advertised in connection_ready
+    """
+    if opuslib is not None:
+        return ["opus", "pcm"]
+    return ["pcm"]
+
+
+def create_encoder(
+    name: str,
+    sample_rate: int,
+    frame_ms: int = 20,
+    bitrate: int = 24000,
+    complexity: int = 5,
+) -> "PcmEncoder | OpusEncoder":
+    """
+    Create an encoder by codec name, falling back to PCM.
+
+    Args:
+        name: Codec name ('opus' or 'pcm')
+        sample_rate: Sample rate in Hz
+        frame_ms: Opus frame duration in milliseconds
+        bitrate: Opus target bitrate in bits per second
+        complexity: Opus encoder complexity
+
+    Returns:
+        Encoder instance
+    """
+    if name == "opus":
+        try:
+            return OpusEncoder(sample_rate, frame_ms=frame_ms, bitrate=bitrate, complexity=complexity)
+        except Exception as e:
+            logger.warning(f"Opus encoder unavailable ({e}), falling back to PCM")
+    elif name != "pcm":
+        logger.warning(f"Unknown codec '{name}', falling back to PCM")
+    return PcmEncoder(sample_rate)
+
@@ -1,12 +1,37 @@
 """Configuration management for audio agent."""
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+def _parse_list(value: str) -> list[str]:
+    """Parse a comma-separated list, ignoring blanks."""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parse_thresholds(value: str) -> dict[str, float]:
+    """Parse 'model=threshold' pairs separated by commas."""
+    thresholds = {}
+    for item in _parse_list(value):
+        name, _, threshold = item.partition("=")
+        if not threshold:
+            raise ValueError(f"WAKE_WORD_THRESHOLDS entry '{item}' is not model=threshold")
+        thresholds[name.strip()] = float(threshold)
+    return thresholds
+
+
+def _parse_rate(value: str) -> Optional[int]:
+    """Parse a sample rate that may be blank (unset) or 'auto' (0)."""
+    value = value.strip().lower()
+    if not value:
+        return None
+    return 0 if value == "auto" else int(value)
+
+
 @dataclass
 class AudioConfig:
     """Audio capture configuration."""
@@ -14,13 +39,74 @@ class AudioConfig:
     sample_rate: int
     channels: int
     chunk_size: int
+    capture_mode: str = "callback"
+    buffer_seconds: float = 2.0
+    preroll_ms: int = 500
+    codec: str = "opus"
+    opus_bitrate: int = 24000
+    opus_frame_ms: int = 20
+    opus_complexity: int = 5
+    input_file: Optional[str] = None
+    mic_channels: list[int] = field(default_factory=list)
+    beamformer: str = "delay_and_sum"
+    beamformer_max_delay: int = 4
+    # None: open the device at sample_rate; 0: auto-detect
+    device_sample_rate: Optional[int] = None
 
 
 @dataclass
 class WakeWordConfig:
     """Wake word detection configuration."""
-    model_name: str
+    model_names: list[str]
     threshold: float
+    thresholds: dict[str, float] = field(default_factory=dict)
+    frame_size: int = 1280
+    queue_size: int = 4
+    drop_policy: str = "drop_oldest"
+    inference_framework: str = "auto"
+    threads: int = 1
+    cpu_affinity: list[int] = field(default_factory=list)
+    quantized: bool = False
+    smoothing_frames: int = 3
+    trigger_frames: int = 2
+    trigger_window: int = 4
+    adaptive_gain: float = 1.0
+    release_ms: int = 500
+
+
+@dataclass
+class VadConfig:
+    """Voice activity pre-gate configuration."""
+    gate_enabled: bool
+    threshold_db: float
+    min_level_dbfs: float
+    webrtc_aggressiveness: Optional[int]
+    preroll_ms: int
+    hangover_ms: int
+    silence_decimation: int
+
+
+@dataclass
+class SpeakerConfig:
+    """Speaker control and TTS playback configuration."""
+    control: str
+    sink: str
+    unmute_timeout: float
+    playback_enabled: bool = False
+    output_device_index: Optional[int] = None
+    tts_sample_rate: int = 24000
+    min_prebuffer_ms: int = 60
+    max_prebuffer_ms: int = 300
+
+
+@dataclass
+class AecConfig:
+    """Acoustic echo cancellation configuration."""
+    enabled: bool
+    filter_ms: int
+    step_size: float
+    delay_ms: int
+    double_talk_threshold: float
 
 
 @dataclass
@@ -29,6 +115,29 @@ class SessionConfig:
     silence_timeout: int
     max_duration: int
     heartbeat_interval: int
+    endpointing: bool = True
+    end_of_speech_ms: int = 800
+    trace_file: Optional[str] = None
+
+
+@dataclass
+class ConnectionConfig:
+    """Backend connection configuration."""
+    send_queue_size: int = 64
+    send_queue_policy: str = "drop_oldest"
+    audio_batch_max: int = 1
+    replay_buffer_bytes: int = 2_000_000
+    replay_spill_dir: Optional[str] = None
+    reconnect_base: float = 0.5
+    reconnect_max: float = 30.0
+
+
+@dataclass
+class MetricsConfig:
+    """Prometheus metrics endpoint configuration."""
+    enabled: bool = False
+    host: str = "127.0.0.1"
+    port: int = 9464
 
 
 @dataclass
@@ -36,10 +145,19 @@ class Config:
     """Main application configuration."""
     backend_ws_url: str
     client_id: str
+    binary_audio: bool
     audio: AudioConfig
     wake_word: WakeWordConfig
+    vad: VadConfig
+    speaker: SpeakerConfig
+    aec: AecConfig
     session: SessionConfig
+    connection: ConnectionConfig
+    metrics: MetricsConfig
     log_level: str
+    log_file: Optional[str]
+    log_max_bytes: int
+    log_backup_count: int
 
     @classmethod
     def from_env(cls) -> "Config":
@@ -47,20 +165,98 @@ class Config:
         return cls(
             backend_ws_url=os.getenv("BACKEND_WS_URL", "ws://localhost:8000/api/voice/connect"),
             client_id=os.getenv("CLIENT_ID", "pi-default"),
+            binary_audio=os.getenv("BINARY_AUDIO", "true").lower() in ("1", "true", "yes"),
             audio=AudioConfig(
                 device_index=int(os.getenv("AUDIO_DEVICE_INDEX", "2")),
                 sample_rate=int(os.getenv("AUDIO_SAMPLE_RATE", "16000")),
                 channels=int(os.getenv("AUDIO_CHANNELS", "1")),
                 chunk_size=int(os.getenv("AUDIO_CHUNK_SIZE", "1024")),
+                capture_mode=os.getenv("AUDIO_CAPTURE_MODE", "callback"),
+                buffer_seconds=float(os.getenv("AUDIO_BUFFER_SECONDS", "2.0")),
+                preroll_ms=int(os.getenv("AUDIO_PREROLL_MS", "500")),
+                codec=os.getenv("AUDIO_CODEC", "opus"),
+                opus_bitrate=int(os.getenv("OPUS_BITRATE", "24000")),
+                opus_frame_ms=int(os.getenv("OPUS_FRAME_MS", "20")),
+                opus_complexity=int(os.getenv("OPUS_COMPLEXITY", "5")),
+                input_file=os.getenv("AUDIO_INPUT_FILE") or None,
+                mic_channels=[int(c) for c in _parse_list(os.getenv("AUDIO_MIC_CHANNELS", ""))],
+                beamformer=os.getenv("AUDIO_BEAMFORMER", "delay_and_sum"),
+                beamformer_max_delay=int(os.getenv("AUDIO_BEAMFORMER_MAX_DELAY", "4")),
+                device_sample_rate=_parse_rate(os.getenv("AUDIO_DEVICE_SAMPLE_RATE", "")),
             ),
             wake_word=WakeWordConfig(
-                model_name=os.getenv("WAKE_WORD_MODEL", "hey_jarvis_v0.1.onnx"),
+                model_names=_parse_list(os.getenv("WAKE_WORD_MODEL", "hey_jarvis_v0.1.onnx")),
                 threshold=float(os.getenv("WAKE_WORD_THRESHOLD", "0.5")),
+                thresholds=_parse_thresholds(os.getenv("WAKE_WORD_THRESHOLDS", "")),
+                frame_size=int(os.getenv("WAKE_WORD_FRAME_SIZE", "1280")),
+                queue_size=int(os.getenv("WAKE_WORD_QUEUE_SIZE", "4")),
+                drop_policy=os.getenv("WAKE_WORD_DROP_POLICY", "drop_oldest"),
+                inference_framework=os.getenv("WAKE_WORD_INFERENCE", "auto"),
+                threads=int(os.getenv("WAKE_WORD_THREADS", "1")),
+                cpu_affinity=[int(cpu) for cpu in _parse_list(os.getenv("WAKE_WORD_CPU_AFFINITY", ""))],
+                quantized=os.getenv("WAKE_WORD_QUANTIZED", "false").lower() in ("1", "true", "yes"),
+                smoothing_frames=int(os.getenv("WAKE_WORD_SMOOTHING_FRAMES", "3")),
+                trigger_frames=int(os.getenv("WAKE_WORD_TRIGGER_FRAMES", "2")),
+                trigger_window=int(os.getenv("WAKE_WORD_TRIGGER_WINDOW", "4")),
+                adaptive_gain=float(os.getenv("WAKE_WORD_ADAPTIVE_GAIN", "1.0")),
+                release_ms=int(os.getenv("WAKE_WORD_RELEASE_MS", "500")),
+            ),
+            vad=VadConfig(
+                gate_enabled=os.getenv("VAD_GATE_ENABLED", "true").lower() in ("1", "true", "yes"),
+                threshold_db=float(os.getenv("VAD_THRESHOLD_DB", "9")),
+                min_level_dbfs=float(os.getenv("VAD_MIN_LEVEL_DBFS", "-55")),
+                webrtc_aggressiveness=(
+                    int(os.getenv("VAD_WEBRTC_AGGRESSIVENESS"))
+                    if os.getenv("VAD_WEBRTC_AGGRESSIVENESS") else None
+                ),
+                preroll_ms=int(os.getenv("VAD_PREROLL_MS", "1500")),
+                hangover_ms=int(os.getenv("VAD_HANGOVER_MS", "1000")),
+                silence_decimation=int(os.getenv("VAD_SILENCE_DECIMATION", "0")),
+            ),
+            speaker=SpeakerConfig(
+                control=os.getenv("SPEAKER_CONTROL", "auto"),
+                sink=os.getenv("SPEAKER_SINK", "@DEFAULT_SINK@"),
+                unmute_timeout=float(os.getenv("BARGE_IN_UNMUTE_TIMEOUT", "1.0")),
+                playback_enabled=os.getenv("TTS_PLAYBACK_ENABLED", "false").lower() in ("1", "true", "yes"),
+                output_device_index=(
+                    int(os.getenv("TTS_OUTPUT_DEVICE_INDEX"))
+                    if os.getenv("TTS_OUTPUT_DEVICE_INDEX") else None
+                ),
+                tts_sample_rate=int(os.getenv("TTS_SAMPLE_RATE", "24000")),
+                min_prebuffer_ms=int(os.getenv("TTS_PREBUFFER_MS", "60")),
+                max_prebuffer_ms=int(os.getenv("TTS_MAX_PREBUFFER_MS", "300")),
+            ),
+            aec=AecConfig(
+                enabled=os.getenv("AEC_ENABLED", "false").lower() in ("1", "true", "yes"),
+                filter_ms=int(os.getenv("AEC_FILTER_MS", "128")),
+                step_size=float(os.getenv("AEC_STEP_SIZE", "0.5")),
+                delay_ms=int(os.getenv("AEC_DELAY_MS", "0")),
+                double_talk_threshold=float(os.getenv("AEC_DOUBLE_TALK_THRESHOLD", "2.0")),
             ),
             session=SessionConfig(
                 silence_timeout=int(os.getenv("SILENCE_TIMEOUT", "10")),
                 max_duration=int(os.getenv("MAX_SESSION_DURATION", "60")),
                 heartbeat_interval=int(os.getenv("HEARTBEAT_INTERVAL", "10")),
+                endpointing=os.getenv("ENDPOINTING_ENABLED", "true").lower() in ("1", "true", "yes"),
+                end_of_speech_ms=int(os.getenv("END_OF_SPEECH_MS", "800")),
+                trace_file=os.getenv("LATENCY_TRACE_FILE") or None,
+            ),
+            connection=ConnectionConfig(
+                send_queue_size=int(os.getenv("WS_SEND_QUEUE_SIZE", "64")),
+                send_queue_policy=os.getenv("WS_SEND_QUEUE_POLICY", "drop_oldest"),
+                audio_batch_max=int(os.getenv("WS_AUDIO_BATCH_MAX", "1")),
+                replay_buffer_bytes=int(os.getenv("WS_REPLAY_BUFFER_BYTES", "2000000")),
+                replay_spill_dir=os.getenv("WS_REPLAY_SPILL_DIR") or None,
+                reconnect_base=float(os.getenv("WS_RECONNECT_BASE_SECONDS", "0.5")),
+                reconnect_max=float(os.getenv("WS_RECONNECT_MAX_SECONDS", "30")),
+            ),
+            metrics=MetricsConfig(
+                enabled=os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes"),
+                host=os.getenv("METRICS_HOST", "127.0.0.1"),
+                port=int(os.getenv("METRICS_PORT", "9464")),
             ),
             log_level=os.getenv("LOG_LEVEL", "INFO"),
+            log_file=os.getenv("LOG_FILE", "/tmp/audio_agent.log") or None,
+            log_max_bytes=int(os.getenv("LOG_MAX_BYTES", "5000000")),
+            log_backup_count=int(os.getenv("LOG_BACKUP_COUNT", "3")),
         )
@@ -0,0 +1,203 @@
+"""Replays recorded audio in place of the microphone."""
+
+import logging
+import os
+import threading
+import time
+import wave
+from typing import AsyncIterator, Optional
+
+import numpy as np
+
+from .audio_capture import AudioSource
+from .beamformer import DelayAndSumBeamformer
+from .ring_buffer import RingReader
+
+logger = logging.getLogger(__name__)
+
+# Extensions read as headerless 16-bit little-endian PCM
+RAW_EXTENSIONS = (".raw", ".pcm", ".s16")
+
+
+def load_audio_file(path: str, sample_rate: int, channels: int = 1) -> np.ndarray:
+    """
+    Load a 16-bit WAV or raw PCM file as interleaved int16 samples.
+
+    Args:
+        path: WAV or raw PCM (.raw/.pcm/.s16) file path
+        sample_rate: Expected sample rate in Hz (raw files are assumed to match)
+        channels: Channels wanted; mono takes the first channel of a WAV
+
+    Returns:
+        Interleaved int16 samples
+    """
+    if os.path.splitext(path)[1].lower() in RAW_EXTENSIONS:
+        return np.fromfile(path, dtype="<i2").astype(np.int16)
+
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit samples, got {8 * wav.getsampwidth()}-bit")
+        if wav.getframerate() != sample_rate:
+            raise ValueError(f"{path}: expected {sample_rate} Hz, got {wav.getframerate()} Hz")
+        file_channels = wav.getnchannels()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+    if file_channels == channels:
+        return samples
+    if channels == 1:
+        return samples[::file_channels].copy()
+    raise ValueError(f"{path}: expected {channels} channels, got {file_channels}")
+
+
+class FileAudioSource(AudioSource):
+    """
+    Drop-in for AudioCapture that streams a WAV or raw PCM file.
+
+    A feeder thread writes the file to the ring buffer chunk by chunk,
+    either paced to the wall clock (speed 1.0 is real time) or, with speed
+    0, as fast as the slowest consumer reads. Consumers' chunks() iterators
+    end once the whole file has been read.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: int,
+        channels: int = 1,
+        chunk_size: int = 1024,
+        speed: float = 1.0,
+        loop: bool = False,
+        consumers: int = 1,
+        buffer_seconds: float = 2.0,
+        beamformer: Optional[DelayAndSumBeamformer] = None,
+    ):
+        """
+        Initialize file source.
+
+        Args:
+            path: WAV or raw PCM file path
+            sample_rate: Sample rate in Hz
+            channels: Number of interleaved channels in the file
+            chunk_size: Frames written per chunk (like the hardware buffer size)
+            speed: Playback speed relative to real time (0 = as fast as possible)
+            loop: Start over at the end of the file instead of finishing
+            consumers: Number of chunks() consumers to wait for before feeding,
+                so none of them misses the start of the file
+            buffer_seconds: Capacity of the ring buffer in seconds
+            beamformer: Combines multi-channel recordings into one channel
+        """
+        super().__init__(sample_rate, channels, chunk_size, buffer_seconds, beamformer)
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.consumers = consumers
+        self.samples = load_audio_file(path, sample_rate, channels)
+        if len(self.samples) < channels:
+            raise ValueError(f"{path}: no audio")
+        self.duration = len(self.samples) / channels / sample_rate
+
+        # Monotonic time the first sample was written, and set at end of file
+        self.started_at: Optional[float] = None
+        self.finished = threading.Event()
+        self.input_overflows = 0
+
+        self._readers: list[RingReader] = []
+        self._consumed = threading.Event()
+        self._feeder: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the feeder thread."""
+        logger.info(
+            f"Replaying {self.path} ({self.duration:.1f} s, rate={self.sample_rate}, "
+            f"speed={'max' if not self.speed else f'{self.speed:g}x'})"
+        )
+        self._running = True
+        self.finished.clear()
+        self._feeder = threading.Thread(target=self._feed_loop, name="audio-file", daemon=True)
+        self._feeder.start()
+
+    def stop(self) -> None:
+        """Stop feeding and release consumers."""
+        self._running = False
+        self._consumed.set()
+        if self._feeder and self._feeder is not threading.current_thread():
+            self._feeder.join(timeout=1.0)
+            self._feeder = None
+        self._notify_consumer()
+
+    def list_devices(self) -> None:
+        """Log the replayed file instead of devices."""
+        logger.info(f"Audio input: file {self.path}")
+
+    async def chunks(
+        self, frame_size: Optional[int] = None, reader: Optional[RingReader] = None
+    ) -> AsyncIterator[np.ndarray]:
+        """
+        Async iterator over replayed frames; ends after the last full frame.
+
+        Args:
+            frame_size: Frames per yielded chunk (defaults to chunk_size)
+            reader: Cursor to read with (defaults to a new one at the write position)
+
+        Yields:
+            Audio frames as numpy arrays of int16 samples
+        """
+        reader = reader or self.ring.reader()
+        self._readers.append(reader)
+        self._consumed.set()
+        try:
+            async for frame in super().chunks(frame_size, reader):
+                yield frame
+                self._consumed.set()
+
+            # Drain what was written before the end of the file
+            frame_samples = (frame_size or self.chunk_size) * self.channels
+            while (frame := reader.read(frame_samples)) is not None:
+                yield frame
+        finally:
+            self._readers.remove(reader)
+            self._consumed.set()
+
+    def _wait_for_consumers(self, n: int) -> None:
+        """Block until writing n more samples would not lap any reader."""
+        while self._running:
+            readers = list(self._readers)
+            if len(readers) >= self.consumers:
+                slowest = min(reader.position for reader in readers)
+                if self.ring.write_position + n - slowest <= self.ring.capacity:
+                    return
+            self._consumed.wait(0.05)
+            self._consumed.clear()
+
+    def _feed_loop(self) -> None:
+        """Feeder thread: write the file to the ring buffer chunk by chunk."""
+        step = self.chunk_size * self.device_channels
+        rate = self.sample_rate * self.device_channels * self.speed
+        written = 0
+
+        # Don't start before the consumers are reading
+        while self._running and len(self._readers) < self.consumers:
+            self._consumed.wait(0.05)
+            self._consumed.clear()
+        self.started_at = time.monotonic()
+
+        while self._running:
+            offset = written % len(self.samples)
+            if offset == 0 and written and not self.loop:
+                break
+            chunk = self.samples[offset:offset + step]
+
+            if self.speed:
+                delay = self.started_at + (written + len(chunk)) / rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                self._wait_for_consumers(len(chunk) // self.device_channels)
+
+            self._write(chunk)
+            written += len(chunk)
+            self._notify_consumer()
+
+        self._running = False
+        self.finished.set()
+        self._notify_consumer()
@@ -0,0 +1,188 @@
+"""Binary WebSocket framing for audio payloads."""
+
+import struct
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+# Protocol version advertised in connection_ready
+FRAME_VERSION = 1
+
+# Fixed header, network byte order:
+#   version (u8), kind (u8), codec (u8), flags (u8),
+#   sequence (u32), timestamp in microseconds since the epoch (u64)
+HEADER = struct.Struct("!BBBBIQ")
+HEADER_SIZE = HEADER.size
+
+# Frame kinds
+KIND_AUDIO_CHUNK = 1
+KIND_TTS_AUDIO = 2
+# Several consecutive audio chunks; the header carries the first one's sequence
+KIND_AUDIO_BATCH = 3
+
+# Length prefix of each chunk inside a batch payload
+BATCH_LENGTH = struct.Struct("!H")
+# Largest chunk a batch can carry; bigger ones go in frames of their own
+MAX_BATCH_CHUNK = 0xFFFF
+
+# Codec identifiers
+CODEC_PCM_S16LE = 0
+CODEC_OPUS = 1
+
+CODEC_NAMES = {
+    CODEC_PCM_S16LE: "pcm",
+    CODEC_OPUS: "opus",
+}
+CODEC_IDS = {name: codec_id for codec_id, name in CODEC_NAMES.items()}
+
+
+@dataclass
+class AudioFrame:
+    """A decoded binary audio frame."""
+    kind: int
+    codec: int
+    flags: int
+    sequence: int
+    timestamp_us: int
+    payload: bytes
+
+    @property
+    def codec_name(self) -> str:
+        """Codec name as used in the JSON protocol (e.g. 'pcm')."""
+        return CODEC_NAMES.get(self.codec, f"codec_{self.codec}")
+
+
+def payload_buffer(size: int) -> memoryview:
+    """
+    Writable payload with room for a frame header in front of it.
+
+    encode_frame() writes the header into the reserved bytes instead of
+    concatenating, so audio copied here once goes to the socket as is.
+
+    Args:
+        size: Payload size in bytes
+
+    Returns:
+        View of the last `size` bytes of a new HEADER_SIZE + size bytearray
+    """
+    return memoryview(bytearray(HEADER_SIZE + size))[HEADER_SIZE:]
+
+
+def encode_frame(
+    kind: int,
+    codec: int,
+    sequence: int,
+    payload: bytes | memoryview,
+    timestamp_us: Optional[int] = None,
+    flags: int = 0,
+) -> bytes | bytearray:
+    """
+    Build a binary audio frame.
+
+    Args:
+        kind: Frame kind (KIND_AUDIO_CHUNK, KIND_TTS_AUDIO, KIND_AUDIO_BATCH)
+        codec: Codec identifier (CODEC_PCM_S16LE, ...)
+        sequence: Sequence number for ordering (wraps at 2**32)
+        payload: Encoded audio bytes, or a payload_buffer() view
+        timestamp_us: Capture time in microseconds since the epoch (defaults to now)
+        flags: Reserved bit field
+
+    Returns:
+        Header followed by payload (the payload_buffer() storage itself,
+        header filled in, when given one)
+    """
+    if timestamp_us is None:
+        timestamp_us = time.time_ns() // 1000
+    fields = (FRAME_VERSION, kind, codec, flags, sequence & 0xFFFFFFFF, timestamp_us)
+    if (
+        isinstance(payload, memoryview) and isinstance(payload.obj, bytearray)
+        and len(payload.obj) == HEADER_SIZE + payload.nbytes
+    ):
+        HEADER.pack_into(payload.obj, 0, *fields)
+        return payload.obj
+    return HEADER.pack(*fields) + payload
+
+
+def decode_frame(data: bytes) -> AudioFrame:
+    """
+    Parse a binary audio frame.
+
+    Args:
+        data: Raw WebSocket binary message
+
+    Returns:
+        Decoded frame
+
+    Raises:
+        ValueError: If the frame is truncated or has an unsupported version
+    """
+    if len(data) < HEADER_SIZE:
+        raise ValueError(f"Binary frame too short: {len(data)} bytes")
+
+    version, kind, codec, flags, sequence, timestamp_us = HEADER.unpack_from(data)
+    if version != FRAME_VERSION:
+        raise ValueError(f"Unsupported binary frame version: {version}")
+
+    return AudioFrame(
+        kind=kind,
+        codec=codec,
+        flags=flags,
+        sequence=sequence,
+        timestamp_us=timestamp_us,
+        payload=bytes(data[HEADER_SIZE:]),
+    )
+
+
+def encode_batch(
+    codec: int,
+    first_sequence: int,
+    chunks: list[bytes | memoryview],
+    timestamp_us: Optional[int] = None,
+) -> bytes:
+    """
+    Build one binary frame carrying several consecutive audio chunks.
+
+    Args:
+        codec: Codec identifier shared by all chunks
+        first_sequence: Sequence number of the first chunk (the rest follow on)
+        chunks: Encoded audio chunks, each at most MAX_BATCH_CHUNK bytes
+        timestamp_us: Capture time of the first chunk (defaults to now)
+
+    Returns:
+        Header followed by length-prefixed chunks
+
+    Raises:
+        ValueError: If a chunk is too long for its length prefix
+    """
+    for chunk in chunks:
+        if len(chunk) > MAX_BATCH_CHUNK:
+            raise ValueError(f"Audio chunk of {len(chunk)} bytes is too long for a batch frame")
+    payload = b"".join(BATCH_LENGTH.pack(len(chunk)) + chunk for chunk in chunks)
+    return encode_frame(KIND_AUDIO_BATCH, codec, first_sequence, payload, timestamp_us)
+
+
+def decode_batch(payload: bytes) -> list[bytes]:
+    """
+    Split the payload of a KIND_AUDIO_BATCH frame into its chunks.
+
+    Args:
+        payload: Frame payload
+
+    Returns:
+        Audio chunks in sequence order
+
+    Raises:
+        ValueError: If a chunk runs past the end of the payload
+    """
+    chunks = []
+    offset = 0
+    while offset < len(payload):
+        if offset + BATCH_LENGTH.size > len(payload):
+            raise ValueError("Truncated batch chunk length")
+        (length,) = BATCH_LENGTH.unpack_from(payload, offset)
+        offset += BATCH_LENGTH.size
+        if offset + length > len(payload):
+            raise ValueError(f"Batch chunk of {length} bytes runs past the payload")
+        chunks.append(payload[offset:offset + length])
+        offset += length
+    return chunks
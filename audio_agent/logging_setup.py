@@ -0,0 +1,171 @@
+"""
+Logging that never blocks the audio path: a queue in front of the real handlers.
+
+Records are formatted on the listener thread, after the log call returns.
+Arguments that can't change in the meantime (str, numbers, bytes, None)
+are queued as they are; anything else, like a stats dict or a numpy view
+into the capture ring buffer, is formatted into the message at the call.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Argument types that stay the same until the listener formats the record
+_IMMUTABLE_ARGS = frozenset({str, int, float, bool, bytes, type(None)})
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock prepare() formats the message (and any traceback) in the
+    calling thread; here a record whose arguments are all immutable is
+    queued as is, so the caller only pays for creating it. Other arguments
+    may be changed by the caller (or overwritten by the capture thread)
+    before the listener gets to them, so those messages are formatted
+    right away. Tracebacks are rendered up front too, because the frames
+    they reference may be gone by the time the listener runs.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            return super().prepare(record)
+        args = record.args
+        immutable = isinstance(record.msg, str) and (
+            not args or isinstance(args, tuple) and all(type(arg) in _IMMUTABLE_ARGS for arg in args)
+        )
+        if not immutable:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def setup_logging(
+    level: str = "INFO",
+    log_file: Optional[str] = None,
+    max_bytes: int = 5_000_000,
+    backup_count: int = 3,
+) -> None:
+    """
+    Send all logging through a queue to stdout and an optional rotating file.
+
+    Log calls on the event loop, the capture callback or the inference
+    thread only append the record to an unbounded in-memory queue; a
+    listener thread formats it and does the console and disk I/O. Pending
+    records are flushed at exit. Calling this again replaces the previous
+    setup.
+
+    Args:
+        level: Root log level
+        log_file: File to log to as well (None = stdout only)
+        max_bytes: Size at which the log file is rotated
+        backup_count: Rotated files kept (audio_agent.log.1, .2, ...)
+    """
+    global _listener
+    stop_logging()
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers: list[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        try:
+            handlers.append(
+                logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+            )
+        except OSError as e:
+            print(f"Cannot log to {log_file}: {e}", file=sys.stderr)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(_DeferredQueueHandler(records))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+class RateLimitedLogger:
+    """
+    Wrapper for log calls that can fire on every frame or message.
+
+    Each call site (message template) logs at most once per interval; the
+    next line that gets through says how many were suppressed in between.
+    Use %-style arguments so suppressed calls never format anything; the
+    ones that get through are formatted at the call if an argument is
+    mutable (see _DeferredQueueHandler).
+    """
+
+    def __init__(self, logger: logging.Logger, interval: float = 5.0):
+        """
+        Initialize rate-limited logger.
+
+        Args:
+            logger: Logger to write to
+            interval: Seconds between lines of the same message template
+        """
+        self.logger = logger
+        self.interval = interval
+        self._last: dict[str, float] = {}
+        self._suppressed: dict[str, int] = {}
+        # Call sites on the capture and inference threads share this
+        self._lock = threading.Lock()
+
+    def log(self, level: int, msg: str, *args, _stacklevel: int = 2, **kwargs) -> None:
+        """
+        Log msg % args unless the same template was logged within the interval.
+
+        _stacklevel picks the frame the record's file and line come from;
+        the level wrappers below pass 3 so it is their caller, not them.
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        with self._lock:
+            last = self._last.get(msg)
+            if last is not None and now - last < self.interval:
+                self._suppressed[msg] = self._suppressed.get(msg, 0) + 1
+                return
+            self._last[msg] = now
+            suppressed = self._suppressed.pop(msg, 0)
+        if suppressed:
+            msg, args = msg + " (%d similar messages suppressed)", args + (suppressed,)
+        self.logger.log(level, msg, *args, stacklevel=_stacklevel, **kwargs)
+
+    def debug(self, msg: str, *args, **kwargs) -> None:
+        self.log(logging.DEBUG, msg, *args, _stacklevel=3, **kwargs)
+
+    def info(self, msg: str, *args, **kwargs) -> None:
+        self.log(logging.INFO, msg, *args, _stacklevel=3, **kwargs)
+
+    def warning(self, msg: str, *args, **kwargs) -> None:
+        self.log(logging.WARNING, msg, *args, _stacklevel=3, **kwargs)
+
+    def error(self, msg: str, *args, **kwargs) -> None:
+        self.log(logging.ERROR, msg, *args, _stacklevel=3, **kwargs)
@@ -2,29 +2,31 @@
 
 import logging
 import asyncio
-import sys
+import math
+import time
 from enum import Enum
-from datetime import datetime
 from typing import Optional
 
 import numpy as np
 
 from .config import Config
-from .audio_capture import AudioCapture
-from .wake_word import WakeWordDetector
+from .aec import EchoCanceller, EchoReference
+from .audio_capture import AudioCapture, AudioSource
+from .beamformer import DelayAndSumBeamformer
+from .audio_control import SpeakerControl
+from .playback import TtsPlayer
+from .codec import PcmEncoder, available_codecs, create_encoder
+from .file_source import FileAudioSource
+from .logging_setup import RateLimitedLogger, setup_logging
+from .metrics import MetricsRegistry, MetricsServer, cpu_temperature
+from .reconnect import ConnectionState
+from .tracing import LatencyTracer
+from .vad import EnergyVad, Endpointer, SpeechGate
+from .wake_word import DetectionPostProcessor, WakeWordDetector, WakeWordWorker
 from .websocket_client import WebSocketClient
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('/tmp/audio_agent.log')
-    ]
-)
-
 logger = logging.getLogger(__name__)
+rate_limited = RateLimitedLogger(logger)
 
 
 class AgentState(Enum):
@@ -38,45 +40,204 @@ class AgentState(Enum):
 class AudioAgent:
     """Main audio agent orchestrating wake word detection and audio streaming."""
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, audio_source: Optional[AudioSource] = None):
         """
         Initialize audio agent.
 
         Args:
             config: Application configuration
+            audio_source: Audio input to use instead of the configured one
         """
         self.config = config
-        self.state = AgentState.IDLE
+        self._state = AgentState.IDLE
+        self._state_since = time.monotonic()
+        # Time spent in each state, up to the last transition
+        self.state_seconds = {state: 0.0 for state in AgentState}
         
         # Initialize components
-        self.audio = AudioCapture(
-            device_index=config.audio.device_index,
-            sample_rate=config.audio.sample_rate,
-            channels=config.audio.channels,
-            chunk_size=config.audio.chunk_size,
-        )
+        # Mic arrays are beamformed to one channel on the capture thread
+        self.beamformer: Optional[DelayAndSumBeamformer] = None
+        if audio_source:
+            self.audio = audio_source
+        elif config.audio.input_file:
+            # Replay a recording instead of the microphone
+            self.beamformer = self._create_beamformer(config.audio.sample_rate)
+            self.audio = FileAudioSource(
+                config.audio.input_file,
+                sample_rate=config.audio.sample_rate,
+                channels=config.audio.channels,
+                chunk_size=config.audio.chunk_size,
+                loop=True,
+                consumers=2,
+                buffer_seconds=config.audio.buffer_seconds,
+                beamformer=self.beamformer,
+            )
+        else:
+            self.audio = AudioCapture(
+                device_index=config.audio.device_index,
+                sample_rate=config.audio.sample_rate,
+                channels=config.audio.channels,
+                chunk_size=config.audio.chunk_size,
+                capture_mode=config.audio.capture_mode,
+                buffer_seconds=config.audio.buffer_seconds,
+                device_sample_rate=config.audio.device_sample_rate,
+            )
+            # Beamforming runs before resampling, at the device rate
+            self.beamformer = self._create_beamformer(self.audio.device_sample_rate)
+            self.audio.beamformer = self.beamformer
         
         self.wake_word = WakeWordDetector(
-            model_name=config.wake_word.model_name,
+            model_names=config.wake_word.model_names,
             threshold=config.wake_word.threshold,
+            thresholds=config.wake_word.thresholds,
+            inference_framework=config.wake_word.inference_framework,
+            threads=config.wake_word.threads,
+            quantized=config.wake_word.quantized,
         )
+        self.wake_word_worker = WakeWordWorker(
+            self.wake_word,
+            queue_size=config.wake_word.queue_size,
+            drop_policy=config.wake_word.drop_policy,
+            cpu_affinity=config.wake_word.cpu_affinity,
+            # One event per utterance, so repeated frames of one wake word
+            # (or a TV in the background) don't start extra sessions
+            postprocessor=DetectionPostProcessor(
+                threshold=config.wake_word.threshold,
+                thresholds=config.wake_word.thresholds,
+                smoothing_frames=config.wake_word.smoothing_frames,
+                trigger_frames=config.wake_word.trigger_frames,
+                window_frames=config.wake_word.trigger_window,
+                adaptive_gain=config.wake_word.adaptive_gain,
+                release_ms=config.wake_word.release_ms,
+            ),
+        )
+        self.wake_word_worker.on_detection = self.handle_wake_word
+        self.wake_word_worker.preprocess = self._preprocess_wake_frame
+        
+        # Cheap energy/VAD gate so silent frames skip inference
+        self.speech_gate: Optional[SpeechGate] = None
+        if config.vad.gate_enabled:
+            self.speech_gate = SpeechGate(
+                EnergyVad(
+                    config.audio.sample_rate,
+                    threshold_db=config.vad.threshold_db,
+                    min_level_dbfs=config.vad.min_level_dbfs,
+                    webrtc_aggressiveness=config.vad.webrtc_aggressiveness,
+                ),
+                frame_size=config.wake_word.frame_size,
+                # Pre-roll frames are ring buffer views, so keep them inside its capacity
+                preroll_ms=min(config.vad.preroll_ms, int(800 * config.audio.buffer_seconds)),
+                hangover_ms=config.vad.hangover_ms,
+                silence_decimation=config.vad.silence_decimation,
+            )
         
         self.ws_client = WebSocketClient(
             url=config.backend_ws_url,
             client_id=config.client_id,
             heartbeat_interval=config.session.heartbeat_interval,
+            binary_audio=config.binary_audio,
+            # Opus is only offered when configured; the backend picks the codec
+            audio_codecs=available_codecs() if config.audio.codec == "opus" else ["pcm"],
+            send_queue_size=config.connection.send_queue_size,
+            send_queue_policy=config.connection.send_queue_policy,
+            audio_batch_max=config.connection.audio_batch_max,
+            replay_buffer_bytes=config.connection.replay_buffer_bytes,
+            replay_spill_dir=config.connection.replay_spill_dir,
+            reconnect_base=config.connection.reconnect_base,
+            reconnect_max=config.connection.reconnect_max,
         )
+        # Stage timestamps from the wake word frame to the first TTS audio
+        self.tracer = LatencyTracer(config.session.trace_file)
+        self.ws_client.tracer = self.tracer
+        
+        # Local end-of-speech detection while streaming
+        self.endpoint_vad: Optional[EnergyVad] = None
+        self.endpointer: Optional[Endpointer] = None
+        if config.session.endpointing:
+            self.endpoint_vad = EnergyVad(
+                config.audio.sample_rate,
+                threshold_db=config.vad.threshold_db,
+                min_level_dbfs=config.vad.min_level_dbfs,
+                webrtc_aggressiveness=config.vad.webrtc_aggressiveness,
+            )
+            self.endpointer = Endpointer(
+                end_of_speech_ms=config.session.end_of_speech_ms,
+                silence_timeout=config.session.silence_timeout,
+                max_duration=config.session.max_duration,
+            )
+        
+        # Local speaker muting for barge-in
+        self.speaker = SpeakerControl(backend=config.speaker.control, sink=config.speaker.sink)
+        self.tts_interrupted = asyncio.Event()
+        self.unmute_task: Optional[asyncio.Task] = None
+        
+        # Native TTS playback (otherwise the browser kiosk plays TTS)
+        self.player: Optional[TtsPlayer] = None
+        if config.speaker.playback_enabled:
+            self.player = TtsPlayer(
+                sample_rate=config.speaker.tts_sample_rate,
+                device_index=config.speaker.output_device_index,
+                min_prebuffer_ms=config.speaker.min_prebuffer_ms,
+                max_prebuffer_ms=config.speaker.max_prebuffer_ms,
+                pa=self.audio.pyaudio,
+            )
+            self.ws_client.on_tts_audio = self.player.feed
+        
+        # Echo cancellation of local TTS playback before wake word inference
+        self.echo_reference: Optional[EchoReference] = None
+        self.echo_canceller: Optional[EchoCanceller] = None
+        if config.aec.enabled:
+            if self.player:
+                self.echo_reference = EchoReference(
+                    capture_position=lambda: self.audio.ring.write_position,
+                    capture_rate=config.audio.sample_rate,
+                    playback_rate=config.speaker.tts_sample_rate,
+                    buffer_seconds=config.audio.buffer_seconds,
+                )
+                self.player.on_played = self.echo_reference.write
+                self.echo_canceller = EchoCanceller(
+                    filter_ms=config.aec.filter_ms,
+                    sample_rate=config.audio.sample_rate,
+                    step_size=config.aec.step_size,
+                    delay_ms=config.aec.delay_ms,
+                    double_talk_threshold=config.aec.double_talk_threshold,
+                )
+            else:
+                logger.warning("AEC_ENABLED needs TTS_PLAYBACK_ENABLED for its reference signal, ignoring")
         
         # Streaming state
         self.is_streaming = False
         self.stream_sequence = 0
-        self.last_wake_event = datetime.min
+        self.encoder = PcmEncoder(config.audio.sample_rate)
+        self.preroll_pending = False
         
         # Register WebSocket event handlers
         self.ws_client.on_state_change = self.handle_state_change
         self.ws_client.on_interrupt_tts = self.handle_interrupt_tts
         self.ws_client.on_session_reset = self.handle_session_reset
         self.ws_client.on_tool_status = self.handle_tool_status
+        self.ws_client.on_connection_state = self.handle_connection_state
+
+        self.metrics_server: Optional[MetricsServer] = None
+        if config.metrics.enabled:
+            self.metrics_server = MetricsServer(
+                self._create_metrics(), host=config.metrics.host, port=config.metrics.port
+            )
+
+    @property
+    def state(self) -> AgentState:
+        """Current agent state."""
+        return self._state
+
+    @state.setter
+    def state(self, state: AgentState) -> None:
+        now = time.monotonic()
+        self.state_seconds[self._state] += now - self._state_since
+        self._state = state
+        self._state_since = now
+        if state == AgentState.IDLE:
+            # The interaction is over
+            self.tracer.finish()
 
     async def start(self) -> None:
         """Start the audio agent."""
@@ -90,24 +251,31 @@ class AudioAgent:
         # Load wake word model
         self.wake_word.load_model()
         logger.info(f"Wake word model info: {self.wake_word.get_model_info()}")
+        self.wake_word_worker.start(asyncio.get_running_loop())
+        
+        if self.metrics_server:
+            try:
+                await self.metrics_server.start()
+            except OSError as e:
+                logger.error(f"Failed to start metrics endpoint: {e}")
+        
+        # Open the speaker control connection before it is needed
+        await self.speaker.start()
+        if self.player:
+            self.player.start()
         
         # Start audio capture
         self.audio.start()
         logger.info("Audio capture started")
         
-        # Initial connection to backend
-        try:
-            await self.ws_client.connect()
-        except Exception as e:
-            logger.warning(f"Initial connection failed: {e}, will retry...")
-        
         # Start in IDLE, waiting for wake word
         logger.info("🎤 Listening for wake word...")
         
-        # Start tasks - the connection_manager_loop handles reconnection
+        # Start tasks - the WebSocket client connects and reconnects on its own
         tasks = [
             asyncio.create_task(self.audio_processing_loop()),
-            asyncio.create_task(self.connection_manager_loop()),
+            asyncio.create_task(self.wake_word_loop()),
+            asyncio.create_task(self.ws_client.run_with_reconnect()),
             asyncio.create_task(self.heartbeat_loop()),
         ]
         
@@ -120,128 +288,324 @@ class AudioAgent:
         finally:
             await self.stop()
 
-    async def connection_manager_loop(self) -> None:
-        """Manage WebSocket connection with automatic reconnection."""
-        reconnect_delay = 3  # seconds
-        
-        while True:
-            try:
-                # Ensure we're connected
-                if not self.ws_client.connected:
-                    logger.info("WebSocket not connected, attempting to connect...")
-                    try:
-                        await self.ws_client.connect()
-                        logger.info("✅ WebSocket reconnected successfully")
-                    except Exception as e:
-                        logger.error(f"Failed to connect: {e}")
-                        await asyncio.sleep(reconnect_delay)
-                        continue
-                
-                # Run the receive loop - this will exit when connection closes
-                await self.ws_client.receive_messages()
-                
-                # If we get here, connection was closed
-                logger.warning("WebSocket connection lost, will reconnect...")
-                self.ws_client.connected = False
-                
-            except Exception as e:
-                logger.error(f"Connection manager error: {e}")
-                self.ws_client.connected = False
-            
-            # Wait before reconnecting
-            await asyncio.sleep(reconnect_delay)
+    def _create_metrics(self) -> MetricsRegistry:
+        """
+        Create the metrics registry and attach its histograms to the components.
+
+        Returns:
+            Registry served by the metrics endpoint
+        """
+        registry = MetricsRegistry()
+        if isinstance(self.audio, AudioCapture):
+            self.audio.jitter_histogram = registry.histogram(
+                "audio_agent_capture_jitter_seconds",
+                "Deviation of each capture buffer's arrival from the buffer period",
+                [0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1],
+            )
+        self.wake_word_worker.latency_histogram = registry.histogram(
+            "audio_agent_wake_word_inference_seconds",
+            "Wake word model inference time per call",
+            [0.005, 0.01, 0.02, 0.03, 0.05, 0.08, 0.12, 0.2, 0.5],
+        )
+        self.wake_word_worker.score_histogram = registry.histogram(
+            "audio_agent_wake_word_score",
+            "Wake word model scores per inference",
+            [0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9, 1.0],
+            labelnames=("model",),
+        )
+        self.tracer.stage_histogram = registry.histogram(
+            "audio_agent_interaction_stage_seconds",
+            "Time from the wake word frame to each interaction stage",
+            [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0],
+            labelnames=("stage",),
+        )
+        self.ws_client.rtt_histogram = registry.histogram(
+            "audio_agent_websocket_rtt_seconds",
+            "WebSocket ping round trip to the backend",
+            [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+        )
+
+        state_seconds = registry.counter(
+            "audio_agent_state_seconds_total", "Time spent in each agent state", ("state",)
+        )
+        current_state = registry.gauge("audio_agent_state", "1 for the current agent state", ("state",))
+        connected = registry.gauge("audio_agent_websocket_connected", "1 while connected to the backend")
+        reconnects = registry.counter("audio_agent_websocket_reconnects_total", "Reconnections to the backend")
+        bytes_sent = registry.counter("audio_agent_websocket_sent_bytes_total", "Bytes sent to the backend")
+        bytes_received = registry.counter(
+            "audio_agent_websocket_received_bytes_total", "Bytes received from the backend"
+        )
+        queue_depth = registry.gauge("audio_agent_send_queue_depth", "Messages waiting in the send queue")
+        audio_dropped = registry.counter(
+            "audio_agent_send_queue_dropped_total", "Audio chunks dropped from a full send queue"
+        )
+        overflows = registry.counter("audio_agent_capture_overflows_total", "Capture input overflows")
+        frames_dropped = registry.counter(
+            "audio_agent_wake_word_dropped_frames_total", "Frames dropped by a backed-up inference queue"
+        )
+        detections = registry.counter("audio_agent_wake_word_detections_total", "Wake word events")
+        temperature = registry.gauge("audio_agent_cpu_temperature_celsius", "SoC temperature")
+
+        def collect() -> None:
+            now = time.monotonic()
+            for state in AgentState:
+                elapsed = now - self._state_since if state == self._state else 0.0
+                state_seconds.set(self.state_seconds[state] + elapsed, state=state.value)
+                current_state.set(state == self._state, state=state.value)
+            connected.set(self.ws_client.connected)
+            reconnects.set(self.ws_client.reconnects)
+            bytes_sent.set(self.ws_client.bytes_sent)
+            bytes_received.set(self.ws_client.bytes_received)
+            queue_depth.set(self.ws_client.queue_depth)
+            audio_dropped.set(self.ws_client.audio_dropped)
+            overflows.set(getattr(self.audio, "input_overflows", 0))
+            frames_dropped.set(self.wake_word_worker.frames_dropped)
+            detections.set(self.wake_word_worker.postprocessor.events)
+            celsius = cpu_temperature()
+            if celsius is not None:
+                temperature.set(celsius)
+
+        registry.add_collector(collect)
+        return registry
+
+    def _create_beamformer(self, rate: int) -> Optional[DelayAndSumBeamformer]:
+        """
+        Create the mic array beamformer, if configured.
+
+        Args:
+            rate: Sample rate the beamformer runs at
+
+        Returns:
+            Beamformer, or None for single-channel capture
+        """
+        audio = self.config.audio
+        if audio.channels <= 1 or audio.beamformer != "delay_and_sum":
+            return None
+        beamformer = DelayAndSumBeamformer(
+            audio.channels,
+            mic_channels=audio.mic_channels or None,
+            # Configured in samples at sample_rate
+            max_delay=math.ceil(audio.beamformer_max_delay * rate / audio.sample_rate),
+        )
+        logger.info(
+            f"🎯 Beamforming mic channels {beamformer.mic_channels} "
+            f"of {audio.channels} (max delay {beamformer.max_delay} samples)"
+        )
+        return beamformer
 
     async def stop(self) -> None:
         """Stop the audio agent."""
         logger.info("Stopping Audio Agent...")
         self.audio.stop()
+        self.wake_word_worker.stop()
+        logger.info(f"Wake word worker stats: {self.wake_word_worker.stats()}")
+        logger.info(f"Wake word detection stats: {self.wake_word_worker.postprocessor.stats()}")
+        if self.speech_gate:
+            logger.info(f"Speech gate stats: {self.speech_gate.stats()}")
+        if self.beamformer:
+            logger.info(f"Beamformer stats: {self.beamformer.stats()}")
+        if self.audio.resampler:
+            logger.info(f"Capture resampler stats: {self.audio.resampler.stats()}")
         await self.ws_client.disconnect()
+        logger.info(f"WebSocket send stats: {self.ws_client.stats()}")
+        if self.ws_client.session:
+            logger.info(f"Session replay buffer stats: {self.ws_client.session.stats()}")
+        self.speaker.close()
+        if self.player:
+            self.player.stop()
+            logger.info(f"TTS playback stats: {self.player.stats()}")
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        self.tracer.close()
+        if self.tracer.traces_finished:
+            logger.info(f"Interaction latency, ms after the wake word frame: {self.tracer.report()}")
         logger.info("Audio Agent stopped")
 
     async def audio_processing_loop(self) -> None:
-        """Main loop: process audio chunks for wake word and streaming."""
+        """Main loop: stream audio chunks to the backend while listening."""
         logger.info("Audio processing loop started")
         
-        while True:
+        # Chunks arrive from the capture thread via the ring buffer, so awaiting
+        # the next one yields to WebSocket I/O instead of blocking on the device
+        chunk_seconds = self.config.audio.chunk_size / self.config.audio.sample_rate
+        preroll_samples = (
+            self.config.audio.preroll_ms * self.config.audio.sample_rate // 1000 * self.audio.channels
+        )
+        reader = self.audio.ring.reader()
+        async for audio_chunk in self.audio.chunks(reader=reader):
             try:
-                # Read audio chunk
-                audio_chunk = self.audio.read_chunk()
-                
-                # Always run wake word detection (even during streaming/speaking)
-                detected, confidence = self.wake_word.detect(audio_chunk)
-                
-                if detected:
-                    await self.handle_wake_word(confidence)
+                # Classify every chunk, not just streamed ones, so the VAD's
+                # noise floor is settled before the session starts
+                is_speech = self.endpoint_vad.is_speech(audio_chunk) if self.endpoint_vad else True
                 
                 # Stream audio to backend if in LISTENING state
                 if self.is_streaming:
-                    # Get raw bytes directly from audio chunk
-                    # audio_chunk is numpy array - convert to bytes properly for Deepgram
-                    audio_bytes = audio_chunk.astype(np.int16).tobytes()
-                    await self.ws_client.send_audio_chunk(audio_bytes, self.stream_sequence)
-                    self.stream_sequence += 1
-                
-                # Small delay to prevent CPU overload
-                await asyncio.sleep(0.001)
+                    pieces = [audio_chunk]
+                    if self.preroll_pending:
+                        # First chunk of a session: extend it backwards with the
+                        # audio already in the ring buffer, so words spoken right
+                        # after the wake word go out at once. The history goes
+                        # out in chunk-sized pieces (the oldest may be shorter),
+                        # like live audio, so no frame outgrows what the
+                        # transport carries however long the pre-roll
+                        self.preroll_pending = False
+                        history = self.audio.ring.history(
+                            reader.position, preroll_samples + len(audio_chunk)
+                        )
+                        step = len(audio_chunk)
+                        pieces = [
+                            history[max(0, end - step):end]
+                            for end in range(len(history), 0, -step)
+                        ][::-1]
+                    
+                    # Codec stage: PCM yields one packet per chunk, Opus one
+                    # per complete 20 ms frame
+                    for piece in pieces:
+                        for packet in self.encoder.encode(piece):
+                            await self.ws_client.send_audio_chunk(
+                                packet, self.stream_sequence, self.encoder.name
+                            )
+                            self.stream_sequence += 1
+                    
+                    if self.endpointer:
+                        reason = self.endpointer.update(is_speech, chunk_seconds)
+                        if reason:
+                            await self.end_stream(reason)
                 
             except Exception as e:
-                logger.error(f"Error in audio processing loop: {e}")
-                await asyncio.sleep(1)
+                rate_limited.error("Error in audio processing loop: %s", e)
+        
+        logger.info("Audio processing loop stopped")
 
-    async def handle_wake_word(self, confidence: float) -> None:
+    async def wake_word_loop(self) -> None:
+        """Feed model-aligned frames to the wake word worker."""
+        frame_size = self.config.wake_word.frame_size
+        logger.info(f"Wake word loop started (frame size: {frame_size})")
+        
+        # Reads its own cursor over the capture ring buffer, so frames line up
+        # with the model's 80 ms windows whatever the hardware chunk size is.
+        # Frames are zero-copy views; the worker's bounded queue releases them
+        # long before the ring buffer wraps
+        reader = self.audio.ring.reader()
+        async for frame in self.audio.chunks(frame_size, reader=reader):
+            # Always run wake word detection (even during streaming/speaking).
+            # Echo cancellation, the speech gate and inference run on the
+            # worker thread, which calls handle_wake_word back on this loop
+            # when it fires
+            self.wake_word_worker.submit(frame, reader.position, self.audio.capture_time(reader.position))
+        
+        logger.info("Wake word loop stopped")
+
+    def _preprocess_wake_frame(self, frame: np.ndarray, position: int) -> list[np.ndarray]:
         """
-        Handle wake word detection.
+        Prepare one frame for wake word inference (runs on the inference thread).
 
         Args:
-            confidence: Detection confidence score
+            frame: Mono int16 samples
+            position: Capture position just past the frame
+
+        Returns:
+            Frames to run inference on (none to skip this one)
         """
-        # Cooldown check to prevent spamming from single utterance
-        if (datetime.now() - self.last_wake_event).total_seconds() < 1.0:
-            return
+        # Subtract the echo of our own TTS while it may still be audible
+        if self.echo_canceller and self.echo_reference.active(position):
+            reference = self.echo_reference.read(position, len(frame))
+            frame = self.echo_canceller.process(frame, reference)
+        
+        # Skip inference on silence; the gate hands back its pre-roll
+        # frames ahead of the first speech frame
+        if self.speech_gate:
+            return self.speech_gate.process(frame)
+        return [frame]
 
-        self.last_wake_event = datetime.now()
+    async def handle_wake_word(self, confidence: float, model: str = "") -> None:
+        """
+        Handle wake word detection.
 
+        Args:
+            confidence: Detection confidence score
+            model: Name of the model that fired
+        """
         if self.state == AgentState.IDLE:
             # Wake word detected - immediately start listening (don't wait for backend)
-            logger.info(f"🎙️ Wake word detected! (confidence: {confidence:.3f})")
+            logger.info(f"🎙️ Wake word detected! (model: {model}, confidence: {confidence:.3f})")
             
             # Start listening immediately (Pi controls its own state)
+            detected_at = self._begin_trace(confidence, model, barge_in=False)
             self.state = AgentState.LISTENING
             self.start_streaming()
             
             # Notify backend (for transcript processing)
-            await self.ws_client.send_wake_word_detected(confidence)
+            await self.ws_client.send_wake_word_detected(confidence, model, detected_at)
             
         elif self.state == AgentState.SPEAKING:
             # Barge-in: wake word during TTS playback
-            logger.info(f"🛑 Wake word BARGE-IN detected during SPEAKING (confidence: {confidence:.3f})")
-            
-            # IMMEDIATELY mute the speaker at OS level - no network latency!
-            import subprocess
-            try:
-                subprocess.run(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "1"], 
-                              timeout=0.1, check=False, capture_output=True)
-                logger.info("🔇 Speaker muted locally")
-            except Exception as e:
-                logger.warning(f"Failed to mute speaker: {e}")
-            
-            # Notify backend (so it can send interrupt_tts to frontend)
-            await self.ws_client.send_wake_word_barge_in(confidence)
+            logger.info(f"🛑 Wake word BARGE-IN detected during SPEAKING (model: {model}, confidence: {confidence:.3f})")
             
-            # Small delay for the mute to take effect and any residual audio to clear
-            await asyncio.sleep(0.3)
+            # Drop local TTS audio at once, then mute the speaker at OS level
+            # and notify the backend (so it can send interrupt_tts to the
+            # frontend) at the same time
+            detected_at = self._begin_trace(confidence, model, barge_in=True)
+            if self.player:
+                self.player.flush()
+            self.tts_interrupted.clear()
+            await asyncio.gather(
+                self.speaker.mute(),
+                self.ws_client.send_wake_word_barge_in(confidence, model, detected_at),
+            )
             
-            # Unmute speaker (TTS should be stopped by now)
-            try:
-                subprocess.run(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "0"], 
-                              timeout=0.1, check=False, capture_output=True)
-                logger.info("🔊 Speaker unmuted")
-            except Exception as e:
-                logger.warning(f"Failed to unmute speaker: {e}")
-            
-            # Now start listening
+            # Start listening right away; the speaker is unmuted once the
+            # backend confirms TTS has stopped
             self.state = AgentState.LISTENING
             self.start_streaming()
+            self.unmute_task = asyncio.create_task(self.unmute_after_interrupt())
+
+    def _begin_trace(self, confidence: float, model: str, barge_in: bool) -> float:
+        """
+        Start the latency trace of a new interaction.
+
+        Args:
+            confidence: Detection confidence score
+            model: Name of the model that fired
+            barge_in: Whether the wake word interrupted TTS
+
+        Returns:
+            Monotonic time the detection fired
+        """
+        frame_at, detected_at = self.wake_word_worker.last_detection
+        self.tracer.begin(model=model, confidence=round(float(confidence), 3), barge_in=barge_in)
+        self.tracer.mark("frame_captured", frame_at)
+        self.tracer.mark("wake_word_detected", detected_at)
+        return detected_at
+
+    async def unmute_after_interrupt(self) -> None:
+        """Unmute the speaker once interrupt_tts arrives (or after a timeout)."""
+        timeout = self.config.speaker.unmute_timeout
+        try:
+            await asyncio.wait_for(self.tts_interrupted.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"No interrupt_tts within {timeout}s of barge-in, unmuting anyway")
+        await self.speaker.unmute()
+
+    async def end_stream(self, reason: str) -> None:
+        """
+        End the current stream locally and hand over to the backend.
+
+        Args:
+            reason: Why the stream ended ('silence' or 'max_duration')
+        """
+        if not self.is_streaming:
+            return
+        
+        logger.info(f"🔚 End of speech detected locally (reason: {reason})")
+        self.tracer.mark("end_of_speech")
+        for packet in self.encoder.flush():
+            await self.ws_client.send_audio_chunk(packet, self.stream_sequence, self.encoder.name)
+            self.stream_sequence += 1
+        
+        self.stop_streaming()
+        self.state = AgentState.PROCESSING
+        await self.ws_client.send_stream_end(reason)
 
     def handle_state_change(self, new_state: str) -> None:
         """
@@ -269,15 +633,16 @@ class AudioAgent:
     def handle_interrupt_tts(self) -> None:
         """Handle TTS interrupt command from backend."""
         logger.info("TTS interrupt received")
-        # In a full implementation, this would stop audio playback
-        # For now, just acknowledge
-        pass
+        if self.player:
+            self.player.flush()
+        # Releases a pending barge-in unmute
+        self.tts_interrupted.set()
 
     def handle_session_reset(self) -> None:
         """Handle session reset command from backend."""
         logger.info("Session reset received")
         self.stop_streaming()
-        self.wake_word.reset()
+        self.wake_word_worker.reset()
         self.state = AgentState.IDLE
 
     def handle_tool_status(self, status: str, name: str) -> None:
@@ -289,12 +654,29 @@ class AudioAgent:
         elif status == "error":
             logger.warning(f"❌ Tool error: {name}")
 
+    def handle_connection_state(self, state: ConnectionState) -> None:
+        """Log backend connection state changes."""
+        if state == ConnectionState.CONNECTED:
+            logger.info("✅ Connected to backend")
+        elif state == ConnectionState.BACKING_OFF:
+            logger.info("🔌 Backend unreachable, backing off")
+
     def start_streaming(self) -> None:
         """Start streaming audio to backend."""
         if not self.is_streaming:
-            logger.info("🔴 Starting audio streaming to backend")
+            self.encoder = create_encoder(
+                self.ws_client.audio_codec,
+                self.config.audio.sample_rate,
+                frame_ms=self.config.audio.opus_frame_ms,
+                bitrate=self.config.audio.opus_bitrate,
+                complexity=self.config.audio.opus_complexity,
+            )
+            logger.info(f"🔴 Starting audio streaming to backend (codec: {self.encoder.name})")
             self.is_streaming = True
             self.stream_sequence = 0
+            self.preroll_pending = self.config.audio.preroll_ms > 0
+            if self.endpointer:
+                self.endpointer.reset()
 
     def stop_streaming(self) -> None:
         """Stop streaming audio to backend."""
@@ -317,6 +699,12 @@ class AudioAgent:
             
             if self.ws_client.connected:
                 await self.ws_client.send_heartbeat()
+                await self.ws_client.measure_rtt()
+            
+            if self.speech_gate:
+                logger.debug(
+                    "Speech gate skipped %.1f%% of frames", 100 * self.speech_gate.skip_fraction
+                )
 
 
 async def main():
@@ -324,8 +712,8 @@ async def main():
     # Load configuration
     config = Config.from_env()
     
-    # Set log level
-    logging.getLogger().setLevel(config.log_level)
+    # Log through a background thread so disk I/O never stalls the event loop
+    setup_logging(config.log_level, config.log_file, config.log_max_bytes, config.log_backup_count)
     
     # Create and start agent
     agent = AudioAgent(config)
@@ -0,0 +1,274 @@
+"""Prometheus text-format metrics and a small HTTP endpoint serving them."""
+
+import asyncio
+import logging
+import math
+from bisect import bisect_left
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# SoC temperature on the Raspberry Pi (and most Linux boards)
+THERMAL_ZONE = "/sys/class/thermal/thermal_zone0/temp"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value (integers without a trailing .0)."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    """Render {name="value",...} (empty string without labels)."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def cpu_temperature(path: str = THERMAL_ZONE) -> Optional[float]:
+    """
+    SoC temperature, to tell thermal throttling from other slowdowns.
+
+    Args:
+        path: sysfs thermal zone file (millidegrees Celsius)
+
+    Returns:
+        Degrees Celsius, or None where the file doesn't exist
+    """
+    try:
+        with open(path) as f:
+            return int(f.read().strip()) / 1000
+    except (OSError, ValueError):
+        return None
+
+
+class Metric:
+    """A named value per label combination, set or incremented by the owner."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        """
+        Initialize metric.
+
+        Args:
+            name: Metric name (e.g. 'audio_agent_reconnects_total')
+            help: One-line description
+            labelnames: Names of the labels every sample carries
+        """
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def set(self, value: float, **labels) -> None:
+        """Set the value for a label combination."""
+        self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        """Add to the value for a label combination."""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> Iterator[str]:
+        """Exposition lines of this metric."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for key, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Counter(Metric):
+    """Monotonic total (mirrors a component counter or is incremented directly)."""
+
+    kind = "counter"
+
+
+class Gauge(Metric):
+    """Value that goes up and down."""
+
+    kind = "gauge"
+
+
+class Histogram(Metric):
+    """
+    Distribution of observations over fixed buckets.
+
+    observe() is a bisect and two increments, cheap enough for the audio and
+    inference threads. Each label combination should be observed from one
+    thread only.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: list[float], labelnames: tuple[str, ...] = ()):
+        """
+        Initialize histogram.
+
+        Args:
+            name: Metric name (e.g. 'audio_agent_websocket_rtt_seconds')
+            help: One-line description
+            buckets: Upper bounds of the buckets (+Inf is added)
+            labelnames: Names of the labels every sample carries
+        """
+        super().__init__(name, help, labelnames)
+        self.buckets = sorted(buckets)
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        """Record one observation."""
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def render(self) -> Iterator[str]:
+        """Exposition lines: cumulative buckets, sum and count per label combination."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for key, counts in list(self._counts.items()):
+            counts = list(counts)
+            total = 0
+            for bound, count in zip(self.buckets + [math.inf], counts):
+                total += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {total}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(self._sums[key])}"
+            yield f"{self.name}_count{labels} {total}"
+
+
+class MetricsRegistry:
+    """
+    Set of metrics rendered together.
+
+    Most values already exist as component counters (see each stats());
+    collectors copy them into metrics right before a scrape instead of
+    touching the hot paths.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics: list[Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        """Create and register a counter."""
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        """Create and register a gauge."""
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, buckets: list[float], labelnames: tuple[str, ...] = ()
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self._register(Histogram(name, help, buckets, labelnames))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """
+        Run a function before every scrape.
+
+        Args:
+            collector: Updates metrics from component state
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Run the collectors and render every metric in the text format."""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {e}")
+        lines = [line for metric in self._metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        if any(existing.name == metric.name for existing in self._metrics):
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics.append(metric)
+        return metric
+
+
+class MetricsServer:
+    """Minimal asyncio HTTP server answering GET /metrics for a scraper."""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464):
+        """
+        Initialize metrics server.
+
+        Args:
+            registry: Metrics to serve
+            host: Interface to listen on (0.0.0.0 exposes it to the network)
+            port: TCP port (0 picks a free one)
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+        # Counters
+        self.scrapes = 0
+
+    async def start(self) -> None:
+        """Start listening."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"📈 Metrics at http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer one HTTP request and close the connection."""
+        try:
+            request = await asyncio.wait_for(reader.readline(), timeout=5.0)
+            # Skip the headers
+            while (line := await asyncio.wait_for(reader.readline(), timeout=5.0)) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) > 1 else ""
+            if parts and parts[0] == "GET" and path in ("/metrics", "/"):
+                self.scrapes += 1
+                status, body, content_type = "200 OK", self.registry.render().encode(), CONTENT_TYPE
+            else:
+                status, body, content_type = "404 Not Found", b"Not found\n", "text/plain"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
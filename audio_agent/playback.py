@@ -0,0 +1,231 @@
+"""Local low-latency TTS playback with an adaptive jitter buffer."""
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+import pyaudio
+
+logger = logging.getLogger(__name__)
+
+# tts_audio formats that carry raw 16-bit little-endian PCM
+PCM_FORMATS = ("pcm", "pcm_s16le", "linear16")
+
+
+class TtsPlayer:
+    """
+    Streams TTS chunks to a PyAudio output stream as they arrive.
+
+    Chunks are appended to a jitter buffer that the PortAudio callback
+    drains. Playback starts as soon as the buffer holds the target
+    pre-buffer (normally the first chunk), not after the full utterance.
+    The target grows after an underrun and decays back after clean
+    utterances, so it settles at the smallest delay the network allows.
+    flush() drops everything buffered, taking effect on the next callback.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 24000,
+        channels: int = 1,
+        device_index: Optional[int] = None,
+        frames_per_buffer: int = 480,
+        min_prebuffer_ms: int = 60,
+        max_prebuffer_ms: int = 300,
+        pa: Optional[pyaudio.PyAudio] = None,
+    ):
+        """
+        Initialize TTS player.
+
+        Args:
+            sample_rate: Sample rate of incoming TTS audio in Hz
+            channels: Number of channels of incoming TTS audio
+            device_index: Output device index (None for the default device)
+            frames_per_buffer: Frames per output callback (20 ms at 24 kHz)
+            min_prebuffer_ms: Smallest amount buffered before playback starts
+            max_prebuffer_ms: Largest pre-buffer the adaptation may grow to
+            pa: Shared PyAudio instance (a new one is created if None)
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.device_index = device_index
+        self.frames_per_buffer = frames_per_buffer
+        self.bytes_per_ms = sample_rate * channels * 2 / 1000
+        self.min_prebuffer = int(min_prebuffer_ms * self.bytes_per_ms)
+        self.max_prebuffer = int(max_prebuffer_ms * self.bytes_per_ms)
+        self.target_prebuffer = self.min_prebuffer
+
+        self.pyaudio = pa or pyaudio.PyAudio()
+        self.stream = None
+
+        # Called on the PortAudio thread with every block sent to the speaker
+        # (e.g. to feed the echo canceller's reference)
+        self.on_played: Optional[Callable[[np.ndarray], None]] = None
+
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._playing = False
+        self._dry_since: Optional[float] = None
+        self._utterance_start: Optional[float] = None
+        self._first_audio_pending = False
+        self._utterance_underruns = 0
+        self._flush_time: Optional[float] = None
+        self._last_feed = 0.0
+        self._warned_formats: set[str] = set()
+
+        # Counters
+        self.underruns = 0
+        self.chunks_received = 0
+        self.last_time_to_first_audio_ms: Optional[float] = None
+        self.last_interrupt_latency_ms: Optional[float] = None
+
+    @property
+    def playing(self) -> bool:
+        """True while TTS audio is being played."""
+        return self._playing
+
+    def start(self) -> None:
+        """Open the output stream; it plays silence until audio arrives."""
+        logger.info(
+            f"Opening TTS output stream: device={self.device_index}, "
+            f"rate={self.sample_rate}, channels={self.channels}"
+        )
+        self.stream = self.pyaudio.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.sample_rate,
+            output=True,
+            output_device_index=self.device_index,
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=self._on_output,
+        )
+        self.stream.start_stream()
+
+    def stop(self) -> None:
+        """Close the output stream."""
+        if self.stream:
+            logger.info("Closing TTS output stream")
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+
+    def feed(self, audio: bytes, audio_format: str = "pcm") -> None:
+        """
+        Queue a TTS chunk for playback.
+
+        Args:
+            audio: Raw audio bytes
+            audio_format: Format reported by the backend
+        """
+        if audio_format not in PCM_FORMATS:
+            if audio_format not in self._warned_formats:
+                self._warned_formats.add(audio_format)
+                logger.warning(f"Cannot play TTS format '{audio_format}' locally, ignoring")
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            self.chunks_received += 1
+            if self._dry_since is not None:
+                if now - self._dry_since < self._underrun_window:
+                    # Ran dry mid-utterance: the network is burstier than
+                    # the pre-buffer, so buffer more next time
+                    self.underruns += 1
+                    self._utterance_underruns += 1
+                    self.target_prebuffer = min(int(self.target_prebuffer * 1.5), self.max_prebuffer)
+                    logger.debug("TTS underrun, pre-buffer now %.0f ms", self.target_prebuffer / self.bytes_per_ms)
+                else:
+                    self._end_utterance()
+                self._dry_since = None
+
+            if self._utterance_start is None:
+                self._utterance_start = now
+                self._first_audio_pending = True
+
+            self._buffer += audio
+            self._last_feed = now
+            if not self._playing and len(self._buffer) >= self.target_prebuffer:
+                self._playing = True
+
+    def flush(self) -> None:
+        """Stop playback immediately and discard buffered audio."""
+        with self._lock:
+            had_audio = self._playing or bool(self._buffer)
+            self._buffer.clear()
+            self._playing = False
+            self._dry_since = None
+            self._utterance_start = None
+            self._first_audio_pending = False
+            if had_audio:
+                self._flush_time = time.monotonic()
+        if had_audio:
+            logger.info("⏹️ TTS playback flushed")
+
+    def stats(self) -> dict:
+        """Get playback counters and latencies."""
+        return {
+            "chunks_received": self.chunks_received,
+            "underruns": self.underruns,
+            "buffered_ms": len(self._buffer) / self.bytes_per_ms,
+            "target_prebuffer_ms": self.target_prebuffer / self.bytes_per_ms,
+            "last_time_to_first_audio_ms": self.last_time_to_first_audio_ms,
+            "last_interrupt_latency_ms": self.last_interrupt_latency_ms,
+        }
+
+    @property
+    def _underrun_window(self) -> float:
+        """Gap after running dry within which new audio counts as an underrun."""
+        return max(0.2, 2 * self.max_prebuffer / self.bytes_per_ms / 1000)
+
+    def _end_utterance(self) -> None:
+        """Decay the pre-buffer target after an utterance without underruns."""
+        if self._utterance_underruns == 0:
+            self.target_prebuffer = max(int(self.target_prebuffer * 0.9), self.min_prebuffer)
+        self._utterance_underruns = 0
+        self._utterance_start = None
+
+    def _output_latency(self) -> float:
+        """Output latency reported by the device, in seconds."""
+        try:
+            return self.stream.get_output_latency() if self.stream else 0.0
+        except Exception:
+            return 0.0
+
+    def _on_output(self, in_data, frame_count, time_info, status):
+        """PyAudio output callback; runs on the PortAudio thread."""
+        needed = frame_count * self.channels * 2
+        now = time.monotonic()
+
+        with self._lock:
+            if self._flush_time is not None:
+                self.last_interrupt_latency_ms = (now - self._flush_time + self._output_latency()) * 1000
+                self._flush_time = None
+
+            if not self._playing and self._buffer:
+                # A short tail below the pre-buffer target: play it once no
+                # more audio has arrived for a pre-buffer's worth of time
+                if now - self._last_feed >= self.target_prebuffer / self.bytes_per_ms / 1000:
+                    self._playing = True
+
+            if not self._playing:
+                return (bytes(needed), pyaudio.paContinue)
+
+            if self._first_audio_pending:
+                self._first_audio_pending = False
+                self.last_time_to_first_audio_ms = (
+                    now - self._utterance_start + self._output_latency()
+                ) * 1000
+
+            out = bytes(self._buffer[:needed])
+            del self._buffer[:needed]
+            if len(out) < needed:
+                # Buffer ran dry: pad with silence and wait for more audio
+                out += bytes(needed - len(out))
+                self._playing = False
+                self._dry_since = now
+
+        if self.on_played:
+            self.on_played(np.frombuffer(out, dtype=np.int16))
+        return (out, pyaudio.paContinue)
@@ -0,0 +1,77 @@
+"""Reconnection timing for the backend WebSocket."""
+
+import random
+from enum import Enum
+from typing import Optional
+
+
+class ConnectionState(Enum):
+    """Backend connection states, reported through on_connection_state."""
+    CONNECTING = "connecting"
+    CONNECTED = "connected"
+    DISCONNECTED = "disconnected"
+    BACKING_OFF = "backing_off"
+
+
+class ReconnectBackoff:
+    """
+    Exponential backoff with full jitter.
+
+    The first retry after a connection drops is immediate, so a brief blip
+    costs only the reconnect itself. Each further attempt waits a uniformly
+    random time between zero and base * 2**n seconds (capped), so a fleet
+    of clients that lost the same server spreads its reconnects out instead
+    of arriving in waves. A connection that stays up for stable_seconds
+    resets the sequence.
+    """
+
+    def __init__(
+        self,
+        base: float = 0.5,
+        cap: float = 30.0,
+        stable_seconds: float = 10.0,
+        rng: Optional[random.Random] = None,
+    ):
+        """
+        Initialize backoff.
+
+        Args:
+            base: Upper bound of the first jittered delay in seconds
+            cap: Largest upper bound in seconds
+            stable_seconds: Connection lifetime after which attempts reset
+            rng: Random source (for reproducible delays)
+        """
+        self.base = base
+        self.cap = cap
+        self.stable_seconds = stable_seconds
+        self.rng = rng or random.Random()
+        self.attempt = 0
+
+    def next_delay(self) -> float:
+        """
+        Delay before the next connection attempt.
+
+        Returns:
+            Seconds to wait (0 for the first retry)
+        """
+        attempt = self.attempt
+        self.attempt += 1
+        if attempt == 0:
+            return 0.0
+        # The exponent is clamped: the cap is reached long before, and an
+        # outage of a few hours would otherwise overflow the float
+        return self.rng.uniform(0, min(self.cap, self.base * 2 ** min(attempt - 1, 32)))
+
+    def connected(self, lifetime: float) -> None:
+        """
+        Record how long a connection lasted once it ends.
+
+        Args:
+            lifetime: Seconds the connection was up
+        """
+        if lifetime >= self.stable_seconds:
+            self.attempt = 0
+
+    def reset(self) -> None:
+        """Make the next retry immediate again."""
+        self.attempt = 0
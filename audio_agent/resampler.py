@@ -0,0 +1,127 @@
+"""Streaming sample rate conversion between capture/playback devices and the pipeline."""
+
+import logging
+import math
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+
+class PolyphaseResampler:
+    """
+    Stateful rational-ratio polyphase resampler for int16 mono audio.
+
+    The rate ratio is reduced to up/down (48 kHz -> 16 kHz is 1/3,
+    44.1 kHz -> 16 kHz is 160/441). A Kaiser-windowed sinc low-pass,
+    designed at the upsampled rate, is split into `up` phases; every output
+    sample is one dot product of a phase with the most recent input
+    samples, so no zero-stuffed signal is ever built. The input tail and
+    the position of the next output sample carry over between calls, so
+    resampling a stream chunk by chunk gives exactly the same samples as
+    resampling it in one piece.
+    """
+
+    def __init__(
+        self,
+        in_rate: int,
+        out_rate: int,
+        filter_width: int = 10,
+        rolloff: float = 0.9,
+        kaiser_beta: float = 6.0,
+    ):
+        """
+        Initialize resampler.
+
+        Args:
+            in_rate: Input sample rate in Hz
+            out_rate: Output sample rate in Hz
+            filter_width: Sinc zero crossings on each side of the filter
+                centre, counted at the lower of the two rates (quality vs CPU)
+            rolloff: Cutoff as a fraction of the lower Nyquist frequency
+            kaiser_beta: Kaiser window shape (higher = more stopband rejection)
+        """
+        g = math.gcd(in_rate, out_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = out_rate // g
+        self.down = in_rate // g
+        self.taps_per_phase = math.ceil(2 * filter_width * max(self.up, self.down) / self.up)
+
+        # Low-pass at the upsampled rate, scaled by up to undo zero-stuffing
+        length = self.up * self.taps_per_phase
+        cutoff = rolloff * 0.5 / max(self.up, self.down)
+        m = np.arange(length) - (length - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * m) * np.kaiser(length, kaiser_beta) * self.up
+
+        # bank[p, j] multiplies the j-th oldest of the last taps_per_phase inputs
+        self._bank = h.reshape(self.taps_per_phase, self.up).T[:, ::-1].astype(np.float32)
+        self._history = np.zeros(self.taps_per_phase - 1, dtype=np.float32)
+        # Upsampled-rate time of the next output sample, relative to the next input
+        self._t = 0
+
+        # Counters
+        self.chunks_processed = 0
+        self.last_process_us = 0.0
+        self.max_process_us = 0.0
+        self.total_process_us = 0.0
+
+    @property
+    def latency_ms(self) -> float:
+        """Group delay of the filter in milliseconds."""
+        return 1000 * (self.taps_per_phase - 1 / self.up) / 2 / self.in_rate
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Resample one chunk.
+
+        Args:
+            samples: Mono int16 samples at in_rate
+
+        Returns:
+            Mono int16 samples at out_rate (length varies by at most one
+            sample between equally sized chunks)
+        """
+        start = time.perf_counter()
+
+        x = samples.astype(np.float32)
+        n_in = len(x)
+        span = n_in * self.up
+        n_out = max(0, -(-(span - self._t) // self.down))
+
+        buffer = np.concatenate((self._history, x))
+        if n_out:
+            t = self._t + self.down * np.arange(n_out)
+            # Row i of the windows holds inputs i - taps + 1 .. i
+            windows = sliding_window_view(buffer, self.taps_per_phase)[t // self.up]
+            out = np.einsum("nj,nj->n", self._bank[t % self.up], windows)
+        else:
+            out = np.zeros(0, dtype=np.float32)
+
+        self._t += n_out * self.down - span
+        self._history = buffer[len(buffer) - (self.taps_per_phase - 1):]
+        result = np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        self.chunks_processed += 1
+        self.last_process_us = elapsed_us
+        self.max_process_us = max(self.max_process_us, elapsed_us)
+        self.total_process_us += elapsed_us
+        return result
+
+    def reset(self) -> None:
+        """Forget the input history (e.g. after a gap in the stream)."""
+        self._history[:] = 0
+        self._t = 0
+
+    def stats(self) -> dict:
+        """Get CPU counters."""
+        return {
+            "ratio": f"{self.up}/{self.down}",
+            "chunks_processed": self.chunks_processed,
+            "last_process_us": self.last_process_us,
+            "max_process_us": self.max_process_us,
+            "avg_process_us": self.total_process_us / self.chunks_processed if self.chunks_processed else 0.0,
+        }
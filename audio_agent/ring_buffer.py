@@ -0,0 +1,179 @@
+"""Preallocated ring buffer for captured audio samples."""
+
+import logging
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class RingBuffer:
+    """
+    Single-producer, multi-reader int16 ring buffer.
+
+    The producer (PyAudio callback or reader thread) only ever advances the
+    write position and each RingReader only ever advances its own read
+    position, so no lock is needed: a position update is a single store
+    under the GIL and is published after the samples it covers are in place.
+
+    Storage is mirrored (every sample is written at i and i + capacity), so
+    any window of up to `capacity` samples is contiguous and readers get
+    zero-copy numpy views instead of copies. A view stays valid until the
+    producer has written another `capacity - len(view)` samples.
+
+    Positions are absolute sample counts that never wrap; the storage index
+    is the position modulo the capacity.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Initialize ring buffer.
+
+        Args:
+            capacity: Number of int16 samples the buffer can hold
+        """
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+
+        self.capacity = capacity
+        self._buffer = np.zeros(2 * capacity, dtype=np.int16)
+        self._write_pos = 0
+
+    @property
+    def write_position(self) -> int:
+        """Total number of samples written since creation."""
+        return self._write_pos
+
+    def write(self, samples: np.ndarray) -> None:
+        """
+        Append samples, overwriting the oldest data.
+
+        Args:
+            samples: int16 samples to append
+        """
+        n = len(samples)
+        if n == 0:
+            return
+
+        # Only the newest `capacity` samples can survive the write
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+
+        m = len(samples)
+        start = (self._write_pos + n - m) % self.capacity
+        first = min(m, self.capacity - start)
+        for offset in (0, self.capacity):
+            self._buffer[offset + start:offset + start + first] = samples[:first]
+            if first < m:
+                self._buffer[offset:offset + m - first] = samples[first:]
+
+        self._write_pos += n
+
+    def write_silence(self, n: int) -> None:
+        """
+        Append n zero samples without allocating them.
+
+        Args:
+            n: Number of samples to append
+        """
+        if n <= 0:
+            return
+        m = min(n, self.capacity)
+        start = (self._write_pos + n - m) % self.capacity
+        first = min(m, self.capacity - start)
+        for offset in (0, self.capacity):
+            self._buffer[offset + start:offset + start + first] = 0
+            if first < m:
+                self._buffer[offset:offset + m - first] = 0
+
+        self._write_pos += n
+
+    def view(self, position: int, n: int) -> np.ndarray:
+        """
+        Read-only view of n samples starting at an absolute position.
+
+        Args:
+            position: Absolute sample position (must still be buffered)
+            n: Number of samples, at most the capacity
+
+        Returns:
+            Contiguous int16 view into the shared storage
+        """
+        start = position % self.capacity
+        window = self._buffer[start:start + n]
+        window.flags.writeable = False
+        return window
+
+    def history(self, end: int, n: int) -> np.ndarray:
+        """
+        Read-only view of up to n samples ending at an absolute position.
+
+        Args:
+            end: Absolute position just past the last sample wanted
+            n: Number of samples wanted; fewer are returned if not buffered
+
+        Returns:
+            Contiguous int16 view into the shared storage
+        """
+        start = max(end - n, self._write_pos - self.capacity, 0)
+        return self.view(start, end - start)
+
+    def reader(self, position: Optional[int] = None) -> "RingReader":
+        """
+        Create an independent read cursor.
+
+        Args:
+            position: Absolute start position (defaults to the write position)
+
+        Returns:
+            New reader
+        """
+        return RingReader(self, self._write_pos if position is None else position)
+
+
+class RingReader:
+    """Independent read cursor over a RingBuffer."""
+
+    def __init__(self, ring: RingBuffer, position: int):
+        """
+        Initialize reader.
+
+        Args:
+            ring: Ring buffer to read from
+            position: Absolute start position
+        """
+        self.ring = ring
+        self.position = position
+        self.overruns = 0
+
+    @property
+    def available(self) -> int:
+        """Number of buffered samples not yet read."""
+        return min(self.ring.write_position - self.position, self.ring.capacity)
+
+    def read(self, n: int) -> Optional[np.ndarray]:
+        """
+        Take the next n samples as a zero-copy view.
+
+        Args:
+            n: Number of samples to read
+
+        Returns:
+            Read-only int16 view of length n, or None if fewer are buffered
+        """
+        write_pos = self.ring.write_position
+
+        if write_pos - self.position > self.ring.capacity:
+            # Producer lapped the reader; skip to the oldest intact sample
+            lost = write_pos - self.position - self.ring.capacity
+            self.overruns += 1
+            logger.warning(f"Audio ring buffer overrun, dropped {lost} samples")
+            self.position = write_pos - self.ring.capacity
+
+        if write_pos - self.position < n:
+            return None
+
+        window = self.ring.view(self.position, n)
+        self.position += n
+        return window
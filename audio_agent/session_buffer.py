@@ -0,0 +1,151 @@
+"""Keeps the current session's upstream audio so it can be replayed after a reconnect."""
+
+import logging
+import struct
+import tempfile
+from collections import deque
+from typing import IO, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Spill file record header: sequence (u32), codec name length (u8), audio length (u32)
+RECORD = struct.Struct("!IBI")
+
+
+class SessionAudioBuffer:
+    """
+    Bounded record of one session: its start event, audio chunks and end event.
+
+    Every chunk of the session is kept whether or not it reached the
+    backend, since a chunk handed to the socket may still be lost with the
+    connection. When the chunks outgrow max_bytes, the oldest ones move to
+    an unlinked temporary file in spill_dir if one is set; otherwise they
+    are dropped and a replay starts late.
+    """
+
+    def __init__(self, max_bytes: int = 2_000_000, spill_dir: Optional[str] = None):
+        """
+        Initialize session buffer.
+
+        Args:
+            max_bytes: Audio bytes kept in memory
+            spill_dir: Directory for audio beyond max_bytes (None drops it)
+        """
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+
+        self.start_event: Optional[tuple[str, dict]] = None
+        self.end_event: Optional[tuple[str, dict]] = None
+        self._chunks: deque[tuple[int, str, bytes | memoryview]] = deque()
+        self._bytes = 0
+        self._spill: Optional[IO[bytes]] = None
+        self._warned = False
+
+        # Counters
+        self.chunks_added = 0
+        self.chunks_spilled = 0
+        self.chunks_dropped = 0
+        self.replays = 0
+
+    @property
+    def active(self) -> bool:
+        """True while a session is being recorded."""
+        return self.start_event is not None
+
+    def start(self, event_type: str, data: dict) -> None:
+        """
+        Begin a new session, forgetting the previous one.
+
+        Args:
+            event_type: Event that opened the session (e.g. 'wakeword_detected')
+            data: Its payload
+        """
+        self.clear()
+        self.start_event = (event_type, data)
+
+    def add(self, sequence: int, codec: str, audio: bytes | memoryview) -> None:
+        """
+        Record one audio chunk of the session.
+
+        Args:
+            sequence: Chunk sequence number
+            codec: Codec name
+            audio: Encoded audio
+        """
+        self._chunks.append((sequence, codec, audio))
+        self._bytes += len(audio)
+        self.chunks_added += 1
+        while self._bytes > self.max_bytes and len(self._chunks) > 1:
+            sequence, codec, audio = self._chunks.popleft()
+            self._bytes -= len(audio)
+            if self._spill_chunk(sequence, codec, audio):
+                self.chunks_spilled += 1
+            else:
+                self.chunks_dropped += 1
+
+    def end(self, event_type: str, data: dict) -> None:
+        """
+        Record the event that closed the session's stream.
+
+        Args:
+            event_type: Closing event (e.g. 'stream_end')
+            data: Its payload
+        """
+        if self.active:
+            self.end_event = (event_type, data)
+
+    def clear(self) -> None:
+        """Forget the session (the backend has it, or a new one started)."""
+        self.start_event = None
+        self.end_event = None
+        self._chunks.clear()
+        self._bytes = 0
+        self._warned = False
+        if self._spill:
+            self._spill.close()
+            self._spill = None
+
+    def chunks(self) -> Iterator[tuple[int, str, bytes | memoryview]]:
+        """
+        Iterate over the session's chunks in order.
+
+        Yields:
+            (sequence, codec, audio) tuples
+        """
+        if self._spill:
+            self._spill.flush()
+            self._spill.seek(0)
+            while header := self._spill.read(RECORD.size):
+                sequence, codec_length, audio_length = RECORD.unpack(header)
+                codec = self._spill.read(codec_length).decode()
+                yield sequence, codec, self._spill.read(audio_length)
+            self._spill.seek(0, 2)
+        yield from list(self._chunks)
+
+    def stats(self) -> dict:
+        """Get buffer counters."""
+        return {
+            "buffered_chunks": len(self._chunks),
+            "buffered_bytes": self._bytes,
+            "chunks_added": self.chunks_added,
+            "chunks_spilled": self.chunks_spilled,
+            "chunks_dropped": self.chunks_dropped,
+            "replays": self.replays,
+        }
+
+    def _spill_chunk(self, sequence: int, codec: str, audio: bytes | memoryview) -> bool:
+        """Append a chunk to the spill file; False if spilling is off or failed."""
+        if not self.spill_dir:
+            if not self._warned:
+                self._warned = True
+                logger.warning("Session audio buffer full, a replay will miss the start of the session")
+            return False
+        try:
+            if not self._spill:
+                self._spill = tempfile.TemporaryFile(dir=self.spill_dir)
+            name = codec.encode()
+            self._spill.write(RECORD.pack(sequence & 0xFFFFFFFF, len(name), len(audio)) + name + audio)
+            return True
+        except OSError as e:
+            logger.error(f"Failed to spill session audio to {self.spill_dir}: {e}")
+            return False
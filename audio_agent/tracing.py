@@ -0,0 +1,224 @@
+"""Per-interaction latency traces, from the wake word frame to the first TTS audio."""
+
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Iterable, Optional
+
+from .metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Interaction stages in the order they normally happen
+STAGES = (
+    "frame_captured",      # last device buffer of the wake word frame arrived
+    "wake_word_detected",  # inference fired on it
+    "wakeword_sent",       # wakeword_detected / wakeword_barge_in written to the socket
+    "first_audio_sent",    # first audio chunk written to the socket
+    "end_of_speech",       # local endpointing ended the stream
+    "stream_end_sent",     # stream_end written to the socket
+    "first_transcript",    # first transcript from the backend
+    "first_tts_audio",     # first TTS audio from the backend
+)
+
+# Interactions kept for the aggregate report
+REPORT_WINDOW = 1000
+
+
+def iso_timestamp(at: Optional[float] = None) -> str:
+    """
+    Wall-clock ISO 8601 timestamp of a monotonic time.
+
+    The monotonic/wall offset is taken on every call, so a clock step (NTP
+    setting the time of a Pi without an RTC) is followed right away.
+
+    Args:
+        at: time.monotonic() value (defaults to now)
+
+    Returns:
+        UTC timestamp like '2024-05-01T12:00:00.123456Z'
+    """
+    now = time.monotonic()
+    wall = time.time() + ((now if at is None else at) - now)
+    seconds = int(wall)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + f".{int((wall - seconds) * 1e6):06d}Z"
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of a list, 0.0 if empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def summarize(records: Iterable[dict]) -> dict:
+    """
+    Aggregate interaction records by stage.
+
+    Args:
+        records: Trace records (see InteractionTrace.record)
+
+    Returns:
+        Per stage: count, p50/p95/max milliseconds after the wake word frame
+    """
+    offsets: dict[str, list[float]] = {}
+    for record in records:
+        for stage, ms in record["stages_ms"].items():
+            offsets.setdefault(stage, []).append(ms)
+    order = {stage: i for i, stage in enumerate(STAGES)}
+    return {
+        stage: {
+            "count": len(values),
+            "p50_ms": _percentile(values, 50),
+            "p95_ms": _percentile(values, 95),
+            "max_ms": max(values),
+        }
+        for stage, values in sorted(offsets.items(), key=lambda item: order.get(item[0], len(order)))
+    }
+
+
+class InteractionTrace:
+    """Monotonic stage stamps of one interaction (the first stamp of a stage wins)."""
+
+    def __init__(self, attributes: dict):
+        """
+        Initialize trace.
+
+        Args:
+            attributes: Details recorded with the trace (model, confidence, ...)
+        """
+        self.trace_id = os.urandom(8).hex()
+        self.attributes = attributes
+        self.stamps: dict[str, float] = {}
+
+    def mark(self, stage: str, at: Optional[float] = None) -> None:
+        """
+        Stamp a stage.
+
+        Args:
+            stage: Stage name (see STAGES)
+            at: time.monotonic() value (defaults to now)
+        """
+        if stage not in self.stamps:
+            self.stamps[stage] = time.monotonic() if at is None else at
+
+    def record(self) -> dict:
+        """
+        Trace as a JSON-serializable record.
+
+        Returns:
+            trace_id, wall-clock start, attributes and each stage's offset in
+            milliseconds from the first stamp
+        """
+        start = min(self.stamps.values())
+        return {
+            "trace_id": self.trace_id,
+            "start": iso_timestamp(start),
+            "attributes": self.attributes,
+            "stages_ms": {
+                stage: round((at - start) * 1000, 3)
+                for stage, at in sorted(self.stamps.items(), key=lambda item: item[1])
+            },
+        }
+
+
+class LatencyTracer:
+    """
+    Collects one trace per interaction and writes it out when it ends.
+
+    Stamping is a dict insert, so components mark stages unconditionally;
+    with no interaction in progress marks are ignored. Finished traces are
+    appended to a JSONL file (if configured) by a writer thread, observed
+    in a metrics histogram (if attached) and kept for the aggregate report.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize tracer.
+
+        Args:
+            path: JSONL file to append finished traces to (None = report only)
+        """
+        self.path = path
+        self.current: Optional[InteractionTrace] = None
+        # Seconds from the wake word frame to each stage, by stage
+        self.stage_histogram: Optional[Histogram] = None
+        self._file: Optional[IO[str]] = None
+        # File I/O stays off the event loop
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._records: deque[dict] = deque(maxlen=REPORT_WINDOW)
+
+        # Counters
+        self.traces_finished = 0
+
+    def begin(self, **attributes) -> InteractionTrace:
+        """
+        Start a new interaction, finishing the one in progress.
+
+        Args:
+            **attributes: Details recorded with the trace
+
+        Returns:
+            The new trace
+        """
+        self.finish()
+        self.current = InteractionTrace(attributes)
+        return self.current
+
+    def mark(self, stage: str, at: Optional[float] = None) -> None:
+        """
+        Stamp a stage of the interaction in progress.
+
+        Args:
+            stage: Stage name (see STAGES)
+            at: time.monotonic() value (defaults to now)
+        """
+        if self.current:
+            self.current.mark(stage, at)
+
+    def finish(self) -> None:
+        """Write out the interaction in progress, if any."""
+        trace, self.current = self.current, None
+        if not trace or not trace.stamps:
+            return
+
+        record = trace.record()
+        self._records.append(record)
+        self.traces_finished += 1
+        if self.stage_histogram:
+            for stage, ms in record["stages_ms"].items():
+                self.stage_histogram.observe(ms / 1000, stage=stage)
+        if self.path:
+            if not self._writer:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-writer")
+            self._writer.submit(self._write, record)
+        logger.debug(f"Interaction trace: {record['stages_ms']}")
+
+    def report(self) -> dict:
+        """Per-stage latency percentiles over recent interactions (see summarize)."""
+        return summarize(self._records)
+
+    def close(self) -> None:
+        """Finish the interaction in progress, wait for pending writes and close the trace file."""
+        self.finish()
+        if self._writer:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write(self, record: dict) -> None:
+        """Append a record to the trace file (runs on the writer thread)."""
+        try:
+            if not self._file:
+                self._file = open(self.path, "a", buffering=1)
+            self._file.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logger.error(f"Failed to write interaction trace to {self.path}: {e}")
+            self.path = None
+
@@ -0,0 +1,243 @@
+"""Voice activity detection for wake word gating and end-of-speech detection."""
+
+import logging
+import math
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+logger = logging.getLogger(__name__)
+
+
+class EnergyVad:
+    """
+    RMS energy voice activity detector with an adaptive noise floor.
+
+    The noise floor follows the frame level quickly downwards and slowly
+    upwards, so steady background noise (fans, a TV) raises the bar while
+    speech onsets still stand out.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        threshold_db: float = 9.0,
+        min_level_dbfs: float = -55.0,
+        floor_rise_seconds: float = 30.0,
+        floor_fall_seconds: float = 0.5,
+        webrtc_aggressiveness: Optional[int] = None,
+    ):
+        """
+        Initialize energy VAD.
+
+        Args:
+            sample_rate: Sample rate in Hz
+            threshold_db: How far above the noise floor counts as speech
+            min_level_dbfs: Absolute level below which a frame is never speech
+            floor_rise_seconds: Time constant for the noise floor to rise
+            floor_fall_seconds: Time constant for the noise floor to fall
+            webrtc_aggressiveness: If set (0-3), frames that pass the energy
+                check must also be confirmed by webrtcvad
+        """
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.min_level_dbfs = min_level_dbfs
+        self.floor_rise_seconds = floor_rise_seconds
+        self.floor_fall_seconds = floor_fall_seconds
+        self.noise_floor_dbfs: Optional[float] = None
+        self.last_level_dbfs = -120.0
+
+        self._webrtc = None
+        if webrtc_aggressiveness is not None:
+            if webrtcvad is None:
+                logger.warning("webrtcvad not installed, using energy VAD only")
+            else:
+                self._webrtc = webrtcvad.Vad(webrtc_aggressiveness)
+                # webrtcvad only accepts 10, 20 or 30 ms frames
+                self._webrtc_frame = sample_rate * 20 // 1000
+
+    def level_dbfs(self, frame: np.ndarray) -> float:
+        """RMS level of an int16 frame in dB relative to full scale."""
+        samples = frame.astype(np.float32)
+        mean_square = float(np.dot(samples, samples)) / max(len(samples), 1)
+        return 10 * math.log10(mean_square / (32768.0 ** 2) + 1e-12)
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        """
+        Classify a frame and update the noise floor.
+
+        Args:
+            frame: Mono int16 samples
+
+        Returns:
+            True if the frame likely contains speech
+        """
+        level = self.level_dbfs(frame)
+        self.last_level_dbfs = level
+
+        if self.noise_floor_dbfs is None:
+            self.noise_floor_dbfs = level
+        frame_seconds = len(frame) / self.sample_rate
+        tau = self.floor_fall_seconds if level < self.noise_floor_dbfs else self.floor_rise_seconds
+        self.noise_floor_dbfs += (level - self.noise_floor_dbfs) * (1 - math.exp(-frame_seconds / tau))
+
+        speech = level >= max(self.noise_floor_dbfs + self.threshold_db, self.min_level_dbfs)
+        if speech and self._webrtc is not None:
+            speech = self._webrtc_confirms(frame)
+        return speech
+
+    def _webrtc_confirms(self, frame: np.ndarray) -> bool:
+        """True if any 20 ms slice of the frame is speech according to webrtcvad."""
+        step = self._webrtc_frame
+        for start in range(0, len(frame) - step + 1, step):
+            if self._webrtc.is_speech(frame[start:start + step].tobytes(), self.sample_rate):
+                return True
+        return False
+
+
+class SpeechGate:
+    """
+    Pre-gate that skips wake word inference on silent frames.
+
+    Skipped frames are kept as pre-roll; when speech starts they are passed
+    on, frame by frame, ahead of the current one, so the model and the
+    detection post-processor see the same frames they would have seen
+    without the gate.
+    """
+
+    def __init__(
+        self,
+        vad: EnergyVad,
+        frame_size: int,
+        preroll_ms: int = 1500,
+        hangover_ms: int = 1000,
+        silence_decimation: int = 0,
+    ):
+        """
+        Initialize speech gate.
+
+        Args:
+            vad: Voice activity detector
+            frame_size: Samples per frame passed to process()
+            preroll_ms: Audio kept from before a speech onset
+            hangover_ms: How long the gate stays open after the last speech frame
+            silence_decimation: Run inference on every Nth silent frame (0 = never)
+        """
+        frame_ms = 1000 * frame_size / vad.sample_rate
+        self.vad = vad
+        self.hangover_frames = max(0, math.ceil(hangover_ms / frame_ms))
+        self.silence_decimation = silence_decimation
+        self._preroll: deque[np.ndarray] = deque(maxlen=max(0, math.ceil(preroll_ms / frame_ms)))
+        self._hangover = 0
+        self._silent_run = 0
+
+        # Counters
+        self.frames_total = 0
+        self.frames_skipped = 0
+
+    @property
+    def skip_fraction(self) -> float:
+        """Fraction of frames for which inference was skipped."""
+        return self.frames_skipped / self.frames_total if self.frames_total else 0.0
+
+    def process(self, frame: np.ndarray) -> list[np.ndarray]:
+        """
+        Decide whether a frame needs inference.
+
+        Args:
+            frame: Mono int16 samples
+
+        Returns:
+            Frames to run inference on, in order (the pre-roll frames and
+            this one when the gate opens; empty to skip this frame)
+        """
+        self.frames_total += 1
+
+        if self.vad.is_speech(frame):
+            self._hangover = self.hangover_frames + 1
+        if self._hangover > 0:
+            self._hangover -= 1
+            self._silent_run = 0
+            frames = [*self._preroll, frame]
+            self._preroll.clear()
+            return frames
+
+        self._silent_run += 1
+        if self.silence_decimation and self._silent_run % self.silence_decimation == 0:
+            self._preroll.clear()
+            return [frame]
+
+        self._preroll.append(frame)
+        self.frames_skipped += 1
+        return []
+
+    def stats(self) -> dict:
+        """Get gate counters."""
+        return {
+            "frames_total": self.frames_total,
+            "frames_skipped": self.frames_skipped,
+            "skip_fraction": self.skip_fraction,
+            "noise_floor_dbfs": self.vad.noise_floor_dbfs,
+        }
+
+
+class Endpointer:
+    """
+    Client-side end-of-speech detection for a streamed session.
+
+    Fed one speech/silence decision per streamed chunk, it reports why the
+    stream should end: trailing silence after speech, no speech at all
+    within the silence timeout, or the maximum session duration.
+    """
+
+    def __init__(self, end_of_speech_ms: int = 800, silence_timeout: float = 10.0, max_duration: float = 60.0):
+        """
+        Initialize endpointer.
+
+        Args:
+            end_of_speech_ms: Trailing silence after speech that ends the utterance
+            silence_timeout: Seconds without any speech before giving up
+            max_duration: Maximum session length in seconds
+        """
+        self.end_of_speech = end_of_speech_ms / 1000
+        self.silence_timeout = silence_timeout
+        self.max_duration = max_duration
+        self.reset()
+
+    def reset(self) -> None:
+        """Start tracking a new session."""
+        self.elapsed = 0.0
+        self.trailing_silence = 0.0
+        self.heard_speech = False
+
+    def update(self, is_speech: bool, seconds: float) -> Optional[str]:
+        """
+        Account for one streamed chunk.
+
+        Args:
+            is_speech: VAD decision for the chunk
+            seconds: Chunk duration in seconds
+
+        Returns:
+            'silence' or 'max_duration' if the stream should end, else None
+        """
+        self.elapsed += seconds
+        if is_speech:
+            self.heard_speech = True
+            self.trailing_silence = 0.0
+        else:
+            self.trailing_silence += seconds
+
+        if self.elapsed >= self.max_duration:
+            return "max_duration"
+        if self.heard_speech and self.trailing_silence >= self.end_of_speech:
+            return "silence"
+        if not self.heard_speech and self.elapsed >= self.silence_timeout:
+            return "silence"
+        return None
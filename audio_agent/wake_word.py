@@ -1,84 +1,224 @@
 """Wake word detection using openwakeword."""
 
 import logging
+import asyncio
+import importlib.util
+import os
+import threading
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
 import numpy as np
 from openwakeword.model import Model as WakeWordModel
 
+from .logging_setup import RateLimitedLogger
+from .metrics import Histogram
+
 logger = logging.getLogger(__name__)
+rate_limited = RateLimitedLogger(logger)
+
+
+# openwakeword inference frameworks and the runtime module each one needs
+INFERENCE_FRAMEWORKS = {"tflite": "tflite_runtime", "onnx": "onnxruntime"}
+
+# openwakeword models expect 16 kHz audio
+SAMPLE_RATE = 16000
+
+# File name suffix of int8-quantized model variants ('hey_jarvis_v0.1_int8.onnx')
+QUANTIZED_SUFFIX = "_int8"
+
+
+def model_key(model_name: str) -> str:
+    """Model name without path, extension or int8 suffix ('models/hey_jarvis_v0.1_int8.onnx' -> 'hey_jarvis_v0.1')."""
+    key = os.path.basename(model_name)
+    # Only strip real extensions: version numbers like 'v0.1' look like one too
+    stem, extension = os.path.splitext(key)
+    if extension.lstrip(".") in INFERENCE_FRAMEWORKS:
+        key = stem
+    return key[:-len(QUANTIZED_SUFFIX)] if key.endswith(QUANTIZED_SUFFIX) else key
+
+
+def available_frameworks() -> list[str]:
+    """Inference frameworks whose runtime is installed."""
+    return [name for name, module in INFERENCE_FRAMEWORKS.items() if importlib.util.find_spec(module)]
 
 
 class WakeWordDetector:
-    """Detects wake words in audio stream using openwakeword."""
+    """
+    Detects wake words in audio stream using openwakeword.
 
-    def __init__(self, model_name: str, threshold: float = 0.5):
+    All models are loaded into one openwakeword Model, which computes the
+    melspectrogram and speech embedding once per frame and feeds them to
+    every classifier head, so each extra keyword only adds its small head.
+    """
+
+    def __init__(
+        self,
+        model_names: str | list[str],
+        threshold: float = 0.5,
+        thresholds: Optional[dict[str, float]] = None,
+        inference_framework: str = "auto",
+        threads: int = 1,
+        quantized: bool = False,
+    ):
         """
         Initialize wake word detector.
 
         Args:
-            model_name: Name of the wake word model (e.g., 'hey_jarvis_v0.1.onnx')
+            model_names: Wake word model name(s) (e.g., 'hey_jarvis_v0.1.onnx')
             threshold: Detection confidence threshold (0.0 to 1.0)
+            thresholds: Per-model thresholds overriding `threshold`, keyed by
+                model name with or without extension
+            inference_framework: 'tflite', 'onnx', or 'auto' to benchmark the
+                installed ones at load time and keep the fastest
+            threads: Threads for the shared melspectrogram/embedding models
+            quantized: Prefer int8 variants (models/<name>_int8.<ext>) when present
         """
-        self.model_name = model_name
+        if inference_framework != "auto" and inference_framework not in INFERENCE_FRAMEWORKS:
+            raise ValueError(f"Unknown inference framework: {inference_framework}")
+
+        self.model_names = [model_names] if isinstance(model_names, str) else list(model_names)
         self.threshold = threshold
+        self.thresholds = {model_key(name): value for name, value in (thresholds or {}).items()}
+        self.inference_framework = inference_framework
+        self.threads = max(1, threads)
+        self.quantized = quantized
         self.model = None
+        self.frame_latency_ms: Optional[float] = None
+
+    def threshold_for(self, key: str) -> float:
+        """Detection threshold of one model."""
+        return self.thresholds.get(key, self.threshold)
 
     def load_model(self) -> None:
-        """Load the wake word model."""
+        """Load the wake word models on the configured (or fastest) framework."""
         try:
-            logger.info(f"Loading wake word model: {self.model_name}")
-            
-            # Check if it's a path to a local file
-            import os
-            local_path = os.path.join(os.getcwd(), "models", self.model_name)
-            logger.info(f"Checking for model at: {local_path}")
+            logger.info(f"Loading wake word models: {', '.join(self.model_names)}")
             
-            if os.path.exists(local_path):
-                logger.info(f"Found local model file: {local_path}")
-                self.model = WakeWordModel(wakeword_models=[local_path])
+            if self.inference_framework == "auto":
+                candidates = available_frameworks()
+                if not candidates:
+                    raise RuntimeError("Neither tflite_runtime nor onnxruntime is installed")
             else:
-                logger.info(f"Local model not found, trying built-in models")
-                # openwakeword will auto-download models if not found
-                self.model = WakeWordModel(wakeword_models=[self.model_name])
+                candidates = [self.inference_framework]
+
+            # Time every candidate on the same frames and keep the fastest
+            best_model, best_latency, best_framework = None, float("inf"), ""
+            for framework in candidates:
+                try:
+                    model = self._create_model(framework)
+                except Exception as e:
+                    if len(candidates) == 1:
+                        raise
+                    logger.warning(f"Could not load wake word models with {framework}: {e}")
+                    continue
+                latency = self._measure_latency(model)
+                logger.info(f"Wake word inference on {framework}: {latency:.2f} ms/frame")
+                if latency < best_latency:
+                    best_model, best_latency, best_framework = model, latency, framework
+
+            if best_model is None:
+                raise RuntimeError("No inference framework could load the wake word models")
+            best_model.reset()
+            self.model = best_model
+            self.inference_framework = best_framework
+            self.frame_latency_ms = best_latency
             
-            logger.info(f"Wake word model loaded successfully with threshold {self.threshold}")
+            for key in self.model.models:
+                logger.info(f"Wake word model {key} loaded with threshold {self.threshold_for(model_key(key))}")
+            logger.info(
+                f"Using {best_framework} ({self.threads} thread(s)) for wake word inference, "
+                f"{best_latency:.2f} ms/frame"
+            )
         except Exception as e:
             logger.error(f"Failed to load wake word model: {e}")
             raise
 
-    def detect(self, audio_chunk: np.ndarray) -> tuple[bool, float]:
+    def _create_model(self, framework: str) -> WakeWordModel:
+        """Load all models into one openwakeword Model on one framework."""
+        paths = [self._resolve_model(name, framework) for name in self.model_names]
+        return WakeWordModel(wakeword_models=paths, inference_framework=framework, ncpu=self.threads)
+
+    def _resolve_model(self, name: str, framework: str) -> str:
+        """Local file for a model on a framework, or its built-in name."""
+        stem = model_key(name)
+        candidates = [f"{stem}{QUANTIZED_SUFFIX}.{framework}"] if self.quantized else []
+        candidates.append(f"{stem}.{framework}")
+
+        for candidate in candidates:
+            local_path = os.path.join(os.getcwd(), "models", candidate)
+            if os.path.exists(local_path):
+                logger.info(f"Found local model file: {local_path}")
+                return local_path
+
+        if self.quantized:
+            logger.warning(f"No int8 {framework} variant of {stem} in models/, using the float model")
+        # openwakeword resolves built-in names to its own (or auto-downloaded) files
+        logger.info(f"Local model not found for {stem}.{framework}, trying built-in models")
+        return stem
+
+    @staticmethod
+    def _measure_latency(model: WakeWordModel, frames: int = 20) -> float:
+        """Median milliseconds per 80 ms frame on low-level noise."""
+        rng = np.random.default_rng(0)
+        audio = (rng.standard_normal(1280 * (frames + 5)) * 300).astype(np.int16)
+        times = []
+        for i in range(frames + 5):
+            start = time.perf_counter()
+            model.predict(audio[i * 1280:(i + 1) * 1280])
+            # The first frames warm up caches and the feature buffers
+            if i >= 5:
+                times.append((time.perf_counter() - start) * 1000)
+        return float(np.median(times))
+
+    def detect(self, audio_chunk: np.ndarray) -> tuple[bool, float, str]:
         """
-        Process audio chunk and detect wake word.
+        Process audio chunk and detect wake words.
 
         Args:
             audio_chunk: Audio data as numpy array of int16 samples
 
         Returns:
-            Tuple of (detected: bool, confidence: float)
+            Tuple of (detected, confidence, model): the highest-scoring model
+            that crossed its threshold, or the highest-scoring model overall
+            if none did
         """
-        if self.model is None:
-            raise RuntimeError("Wake word model not loaded")
+        best_name, best_score = "", 0.0
+        fired_name, fired_score = "", 0.0
+        for model_name, score in self.predict(audio_chunk).items():
+            if score > best_score:
+                best_name, best_score = model_name, score
+            if score >= self.threshold_for(model_name) and score > fired_score:
+                fired_name, fired_score = model_name, score
 
-        try:
-            # openwakeword expects audio as numpy array
-            prediction = self.model.predict(audio_chunk)
-            
-            # Get the highest confidence score from all models
-            # prediction is a dict with model names as keys
-            max_confidence = 0.0
-            for model_name, score in prediction.items():
-                if score > max_confidence:
-                    max_confidence = score
+        if fired_name:
+            rate_limited.info("Wake word %s detected! Confidence: %.3f", fired_name, fired_score)
+            return True, fired_score, fired_name
+        return False, best_score, best_name
 
-            detected = max_confidence >= self.threshold
+    def predict(self, audio_chunk: np.ndarray) -> dict[str, float]:
+        """
+        Raw scores of every model for an audio chunk.
 
-            if detected:
-                logger.info(f"Wake word detected! Confidence: {max_confidence:.3f}")
+        Args:
+            audio_chunk: Audio data as numpy array of int16 samples
 
-            return detected, max_confidence
+        Returns:
+            Score per model name (empty if inference failed)
+        """
+        if self.model is None:
+            raise RuntimeError("Wake word model not loaded")
 
+        try:
+            # openwakeword expects audio as numpy array; prediction is a dict
+            # with model names as keys
+            prediction = self.model.predict(audio_chunk)
+            return {model_key(name): float(score) for name, score in prediction.items()}
         except Exception as e:
-            logger.error(f"Error during wake word detection: {e}")
-            return False, 0.0
+            rate_limited.error("Error during wake word detection: %s", e)
+            return {}
 
     def reset(self) -> None:
         """Reset the wake word model state."""
@@ -91,7 +231,407 @@ class WakeWordDetector:
         if not self.model:
             return {}
         
+        models = [model_key(key) for key in self.model.models] if hasattr(self.model, 'models') else []
+        return {
+            "models": models,
+            "thresholds": {key: self.threshold_for(key) for key in models},
+            "inference_framework": self.inference_framework,
+            "threads": self.threads,
+            "frame_latency_ms": self.frame_latency_ms,
+        }
+
+
+class DetectionPostProcessor:
+    """
+    Turns per-frame wake word scores into one event per utterance.
+
+    Each model's raw score is averaged over a short sliding window, and a
+    model triggers once its smoothed score crosses its threshold in N of
+    the last M frames. Thresholds adapt to the room: a slow noise-floor
+    estimate of each model's score (e.g. a TV that keeps scoring 0.2) is
+    added to the base threshold. After an event, further triggers are
+    suppressed until every score has stayed low for the release time, so
+    one utterance yields one event carrying the peak confidence seen.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        thresholds: Optional[dict[str, float]] = None,
+        smoothing_frames: int = 3,
+        trigger_frames: int = 2,
+        window_frames: int = 4,
+        adaptive_gain: float = 1.0,
+        max_threshold: float = 0.95,
+        floor_rise_seconds: float = 30.0,
+        floor_fall_seconds: float = 5.0,
+        release_ms: int = 500,
+    ):
+        """
+        Initialize post-processor.
+
+        Args:
+            threshold: Base detection threshold (0.0 to 1.0)
+            thresholds: Per-model base thresholds overriding `threshold`
+            smoothing_frames: Frames in the score moving average (1 = off)
+            trigger_frames: Frames above threshold needed to trigger (N)
+            window_frames: Frames those N must fall within (M)
+            adaptive_gain: How much of the score noise floor is added to the
+                threshold (0 = fixed threshold)
+            max_threshold: Upper bound for the adapted threshold
+            floor_rise_seconds: Time constant for the noise floor to rise
+            floor_fall_seconds: Time constant for the noise floor to fall
+            release_ms: Time all scores must stay low before the next event
+        """
+        self.threshold = threshold
+        self.thresholds = {model_key(name): value for name, value in (thresholds or {}).items()}
+        self.smoothing_frames = max(1, smoothing_frames)
+        self.trigger_frames = max(1, trigger_frames)
+        self.window_frames = max(self.trigger_frames, window_frames)
+        self.adaptive_gain = adaptive_gain
+        self.max_threshold = max_threshold
+        self.floor_rise_seconds = floor_rise_seconds
+        self.floor_fall_seconds = floor_fall_seconds
+        self.release = release_ms / 1000
+
+        # Counters
+        self.events = 0
+        self.suppressed_triggers = 0
+
+        self.noise_floor: dict[str, float] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget recent scores and any event in progress (keeps the noise floors)."""
+        self._scores: dict[str, deque[float]] = {}
+        self._hits: dict[str, deque[bool]] = {}
+        self._holding = False
+        self._quiet_for = 0.0
+
+    def threshold_for(self, model: str) -> float:
+        """Current adapted threshold of one model."""
+        base = self.thresholds.get(model, self.threshold)
+        adapted = base + self.adaptive_gain * self.noise_floor.get(model, 0.0)
+        return min(max(adapted, base), max(self.max_threshold, base))
+
+    def update(self, scores: dict[str, float], seconds: float) -> Optional[tuple[str, float]]:
+        """
+        Account for one inference.
+
+        Args:
+            scores: Raw score per model
+            seconds: Audio duration the inference covered
+
+        Returns:
+            (model, peak confidence) when an utterance triggers, else None
+        """
+        triggered: Optional[tuple[str, float]] = None
+        any_high = False
+
+        if self._holding and self._quiet_for >= self.release:
+            # Scores stayed low for the release time: this frame is judged
+            # like any other, so a trigger right at the boundary counts
+            self._holding = False
+            for hits in self._hits.values():
+                hits.clear()
+
+        for model, score in scores.items():
+            recent = self._scores.setdefault(model, deque(maxlen=self.window_frames))
+            hits = self._hits.setdefault(model, deque(maxlen=self.window_frames))
+            recent.append(score)
+            smoothed = sum(list(recent)[-self.smoothing_frames:]) / min(len(recent), self.smoothing_frames)
+            threshold = self.threshold_for(model)
+
+            above = smoothed >= threshold
+            hits.append(above)
+            # Hysteresis: an utterance lasts until scores drop well below threshold
+            if smoothed >= threshold / 2:
+                any_high = True
+            if not above and not self._holding:
+                self._update_floor(model, smoothed, seconds)
+
+            if above and sum(hits) >= self.trigger_frames:
+                peak = max(recent)
+                if triggered is None or peak > triggered[1]:
+                    triggered = (model, peak)
+
+        if self._holding:
+            self._quiet_for = 0.0 if any_high else self._quiet_for + seconds
+            if triggered:
+                self.suppressed_triggers += 1
+            return None
+
+        if triggered:
+            self.events += 1
+            self._holding = True
+            self._quiet_for = 0.0
+            model, peak = triggered
+            logger.info(
+                f"Wake word {model} detected! Confidence: {peak:.3f} "
+                f"(threshold {self.threshold_for(model):.3f})"
+            )
+        return triggered
+
+    def stats(self) -> dict:
+        """Get event counters and current thresholds."""
         return {
-            "models": list(self.model.models.keys()) if hasattr(self.model, 'models') else [],
-            "threshold": self.threshold,
+            "events": self.events,
+            "suppressed_triggers": self.suppressed_triggers,
+            "noise_floor": dict(self.noise_floor),
+            "thresholds": {model: self.threshold_for(model) for model in self._scores},
         }
+
+    def _update_floor(self, model: str, score: float, seconds: float) -> None:
+        """Track the typical score of a model outside utterances."""
+        floor = self.noise_floor.get(model)
+        if floor is None:
+            self.noise_floor[model] = score
+            return
+        tau = self.floor_fall_seconds if score < floor else self.floor_rise_seconds
+        self.noise_floor[model] = floor + (score - floor) * (1 - math.exp(-seconds / tau))
+
+
+class WakeWordWorker:
+    """
+    Runs wake word inference on a dedicated thread fed by a bounded queue.
+
+    The event loop only ever enqueues frames, so a slow inference (e.g. a
+    thermally throttled CPU) delays detection but never audio streaming or
+    socket I/O. Per-frame DSP ahead of the model (echo cancellation, the
+    speech gate) runs here too, through the preprocess hook. When the queue
+    is full the oldest frame is dropped.
+
+    Drop policies:
+        drop_oldest: one inference per frame
+        coalesce: each inference consumes every queued frame at once, so a
+            backlog is caught up in a single model call instead of being dropped
+    """
+
+    DROP_POLICIES = ("drop_oldest", "coalesce")
+
+    def __init__(
+        self,
+        detector: WakeWordDetector,
+        queue_size: int = 4,
+        drop_policy: str = "drop_oldest",
+        cpu_affinity: Optional[list[int]] = None,
+        postprocessor: Optional[DetectionPostProcessor] = None,
+    ):
+        """
+        Initialize inference worker.
+
+        Args:
+            detector: Loaded wake word detector
+            queue_size: Maximum number of frames waiting for inference
+            drop_policy: 'drop_oldest' or 'coalesce'
+            cpu_affinity: CPU cores to pin the inference thread to (None = any)
+            postprocessor: Turns frame scores into utterance events (None =
+                every frame above the detector's threshold is a detection)
+        """
+        if drop_policy not in self.DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+
+        self.detector = detector
+        self.queue_size = max(1, queue_size)
+        self.drop_policy = drop_policy
+        self.cpu_affinity = cpu_affinity
+        self.postprocessor = postprocessor
+
+        # Called on the event loop with the confidence and model name of each detection
+        self.on_detection: Optional[Callable[[float, str], Awaitable[None]]] = None
+        # Inference time (seconds) and score per model, observed on the inference thread
+        self.latency_histogram: Optional[Histogram] = None
+        self.score_histogram: Optional[Histogram] = None
+        # Called on the inference thread with each frame and the capture
+        # position just past it; returns the frames to run inference on
+        # (none to skip it, several when a gate releases its pre-roll)
+        self.preprocess: Optional[Callable[[np.ndarray, int], list[np.ndarray]]] = None
+        # Monotonic times of the last detection: (its frame was captured, inference fired)
+        self.last_detection: tuple[float, float] = (0.0, 0.0)
+
+        # (frame, queued at, capture position just past it, captured at)
+        self._queue: deque[tuple[np.ndarray, float, int, float]] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = False
+        self._reset_requested = False
+
+        # Counters
+        self.frames_submitted = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.max_queue_depth = 0
+        self.inference_count = 0
+        self.last_inference_ms = 0.0
+        self.max_inference_ms = 0.0
+        self.total_inference_ms = 0.0
+        self.last_queue_wait_ms = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of frames currently waiting for inference."""
+        return len(self._queue)
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Start the inference thread.
+
+        Args:
+            loop: Event loop on which on_detection is scheduled
+        """
+        self._loop = loop
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="wake-word", daemon=True)
+        self._thread.start()
+        logger.info(f"Wake word worker started (queue={self.queue_size}, policy={self.drop_policy})")
+
+    def stop(self) -> None:
+        """Stop the inference thread."""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def submit(self, audio_chunk: np.ndarray, position: int = 0, captured_at: Optional[float] = None) -> None:
+        """
+        Queue a frame for inference without blocking.
+
+        Args:
+            audio_chunk: Audio data as numpy array of int16 samples
+            position: Capture ring buffer position just past the frame
+            captured_at: Monotonic time the frame's last sample was captured
+                (defaults to now)
+        """
+        with self._cond:
+            self.frames_submitted += 1
+            if len(self._queue) >= self.queue_size:
+                self._queue.popleft()
+                self.frames_dropped += 1
+                if self.frames_dropped == 1 or self.frames_dropped % 100 == 0:
+                    logger.warning(
+                        f"Wake word inference falling behind, dropped {self.frames_dropped} frames"
+                    )
+            now = time.monotonic()
+            self._queue.append((audio_chunk, now, position, now if captured_at is None else captured_at))
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+            self._cond.notify()
+
+    def reset(self) -> None:
+        """Reset model state before the next inference (thread-safe)."""
+        with self._cond:
+            self._queue.clear()
+            self._reset_requested = True
+
+    def stats(self) -> dict:
+        """Get queue and latency counters."""
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "frames_submitted": self.frames_submitted,
+            "frames_processed": self.frames_processed,
+            "frames_dropped": self.frames_dropped,
+            "inference_count": self.inference_count,
+            "last_inference_ms": self.last_inference_ms,
+            "max_inference_ms": self.max_inference_ms,
+            "avg_inference_ms": self.total_inference_ms / self.inference_count if self.inference_count else 0.0,
+            "last_queue_wait_ms": self.last_queue_wait_ms,
+        }
+
+    def _take_batch(self) -> Optional[list[tuple[np.ndarray, float, int, float]]]:
+        """Block until frames are queued; return the next batch or None on stop."""
+        with self._cond:
+            while self._running and not self._queue:
+                self._cond.wait()
+            if not self._running:
+                return None
+
+            if self._reset_requested:
+                self._reset_requested = False
+                self.detector.reset()
+                if self.postprocessor:
+                    self.postprocessor.reset()
+
+            if self.drop_policy == "coalesce":
+                batch = list(self._queue)
+                self._queue.clear()
+            else:
+                batch = [self._queue.popleft()]
+            return batch
+
+    def _pin_thread(self) -> None:
+        """Restrict the inference thread to the configured cores (Linux only)."""
+        if not self.cpu_affinity:
+            return
+        try:
+            # pid 0 is the calling thread
+            os.sched_setaffinity(0, self.cpu_affinity)
+            logger.info(f"Wake word inference pinned to CPU(s) {self.cpu_affinity}")
+        except (AttributeError, OSError, ValueError) as e:
+            logger.warning(f"Could not pin wake word inference to CPU(s) {self.cpu_affinity}: {e}")
+
+    def _run(self) -> None:
+        """Inference thread main loop."""
+        self._pin_thread()
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                break
+
+            frames = [item[0] for item in batch]
+            if self.preprocess:
+                frames = [frame for chunk, _, position, _ in batch for frame in self.preprocess(chunk, position)]
+            self.frames_processed += len(batch)
+            if self.drop_policy == "coalesce" and len(frames) > 1:
+                frames = [np.concatenate(frames)]
+
+            # One inference per frame, so the post-processor's N-of-M window
+            # counts frames whether or not they waited in a pre-roll
+            for audio in frames:
+                if not self._infer(audio, batch):
+                    return
+
+    def _infer(self, audio: np.ndarray, batch: list[tuple[np.ndarray, float, int, float]]) -> bool:
+        """
+        Run one inference and report a detection to the event loop.
+
+        Args:
+            audio: Samples to score
+            batch: Queued frames the audio came from
+
+        Returns:
+            False once the event loop is gone
+        """
+        start = time.monotonic()
+        if self.postprocessor:
+            scores = self.detector.predict(audio)
+            event = self.postprocessor.update(scores, len(audio) / SAMPLE_RATE)
+            detected = event is not None
+            model, confidence = event if event else ("", 0.0)
+        else:
+            detected, confidence, model = self.detector.detect(audio)
+            scores = {model: confidence} if model else {}
+        elapsed_ms = (time.monotonic() - start) * 1000
+
+        if self.latency_histogram:
+            self.latency_histogram.observe(elapsed_ms / 1000)
+        if self.score_histogram:
+            for name, score in scores.items():
+                self.score_histogram.observe(score, model=name)
+
+        self.inference_count += 1
+        self.last_inference_ms = elapsed_ms
+        self.max_inference_ms = max(self.max_inference_ms, elapsed_ms)
+        self.total_inference_ms += elapsed_ms
+        self.last_queue_wait_ms = (start - batch[0][1]) * 1000
+
+        if detected and self.on_detection and self._loop:
+            self.last_detection = (batch[-1][3], start + elapsed_ms / 1000)
+            try:
+                asyncio.run_coroutine_threadsafe(self.on_detection(confidence, model), self._loop)
+            except RuntimeError:
+                # Event loop already closed during shutdown
+                return False
+        return True
@@ -4,17 +4,129 @@ import logging
 import asyncio
 import json
 import base64
+import time
+from collections import deque
+from dataclasses import dataclass
 from typing import Callable, Optional
 import websockets
 from websockets.client import WebSocketClientProtocol
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from . import framing
+from .metrics import Histogram
+from .reconnect import ConnectionState, ReconnectBackoff
+from .logging_setup import RateLimitedLogger
+from .session_buffer import SessionAudioBuffer
+from .tracing import LatencyTracer, iso_timestamp
+
 logger = logging.getLogger(__name__)
+# For lines that can repeat on every chunk or message
+rate_limited = RateLimitedLogger(logger)
+
+# Send queue lanes, highest priority first. Control events (wake word,
+# heartbeat) overtake queued audio; stream_end goes in the audio lane so it
+# still follows the last chunk of its stream.
+PRIORITY_CONTROL = 0
+PRIORITY_AUDIO = 1
+
+# What happens to a new audio chunk when the send queue is full
+QUEUE_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+# How long a resumed connection waits for connection_ack before replaying
+# the whole session
+RESUME_ACK_TIMEOUT = 2.0
+
+# JSON parser for incoming messages (orjson is several times faster)
+JSON_BACKEND = "orjson" if orjson else "json"
+json_loads: Callable[[str | bytes], object] = orjson.loads if orjson else json.loads
+
+# Text messages at least this long get their base64 'data' string cut out
+# before parsing (see decode_message)
+LAZY_DECODE_BYTES = 1024
+
+
+def decode_message(
+    message: str,
+    loads: Optional[Callable[[str | bytes], object]] = None,
+    lazy_bytes: Optional[int] = None,
+) -> dict:
+    """
+    Parse an incoming JSON text message.
+
+    In long messages (tts_audio), a top-level "data" string is sliced out
+    with str.find and only the small remainder goes through the JSON
+    parser; base64 never contains quotes or escapes, so the slice equals
+    what the parser would have returned. Anything unexpected falls back to
+    parsing the whole message.
+
+    Args:
+        message: Message text
+        loads: JSON parser (defaults to json_loads)
+        lazy_bytes: Shortest message to slice (defaults to LAZY_DECODE_BYTES;
+            0 = always, a huge value = never)
+
+    Returns:
+        Parsed message (a dict for any well-formed event)
+    """
+    loads = loads or json_loads
+    if len(message) >= (LAZY_DECODE_BYTES if lazy_bytes is None else lazy_bytes):
+        key = message.find('"data"')
+        start = message.find('"', key + 6) + 1 if key >= 0 else 0
+        end = message.find('"', start) if start else -1
+        # Only a string value ('"data": "...'), and one without escapes
+        if (
+            end > start and message[key + 6:start - 1].strip() == ":"
+            and message.find("\\", start, end) < 0
+        ):
+            data = loads(message[:start] + message[end:])
+            if isinstance(data, dict) and data.get("data") == "":
+                data["data"] = message[start:end]
+                return data
+    return loads(message)
+
+
+def _field(data: dict, payload: dict, key: str, default=None):
+    """A message field that backends send either at the root or inside 'data'."""
+    value = data.get(key)
+    return value if value is not None else payload.get(key, default)
+
+
+@dataclass
+class OutgoingMessage:
+    """A queued outbound message (audio chunks are framed when sent)."""
+    enqueued: float
+    message: Optional[str | bytes] = None
+    audio: Optional[bytes | memoryview] = None
+    sequence: int = 0
+    codec: str = "pcm"
+    # Replayed session audio: never dropped and not counted against the bound
+    pinned: bool = False
+    # Interaction stage stamped once the message is written to the socket
+    stage: Optional[str] = None
 
 
 class WebSocketClient:
     """WebSocket client for communicating with backend server."""
 
-    def __init__(self, url: str, client_id: str, heartbeat_interval: int = 10):
+    def __init__(
+        self,
+        url: str,
+        client_id: str,
+        heartbeat_interval: int = 10,
+        binary_audio: bool = True,
+        audio_codecs: Optional[list[str]] = None,
+        send_queue_size: int = 64,
+        send_queue_policy: str = "drop_oldest",
+        audio_batch_max: int = 1,
+        replay_buffer_bytes: int = 2_000_000,
+        replay_spill_dir: Optional[str] = None,
+        reconnect_base: float = 0.5,
+        reconnect_max: float = 30.0,
+    ):
         """
         Initialize WebSocket client.
 
@@ -22,14 +134,81 @@ class WebSocketClient:
             url: WebSocket server URL (e.g., ws://192.168.1.100:8000/api/voice/connect)
             client_id: Unique identifier for this client
             heartbeat_interval: Seconds between heartbeat messages
+            binary_audio: Offer binary audio framing in the connection handshake
+            audio_codecs: Upstream codecs to offer, most preferred first
+            send_queue_size: Audio messages that may wait for the socket
+            send_queue_policy: 'drop_oldest', 'drop_newest' or 'block' (wait for
+                room) when the queue is full; control events are never dropped
+            audio_batch_max: Most queued audio chunks coalesced into one binary
+                frame when the backend accepts batches (1 disables batching)
+            replay_buffer_bytes: Session audio kept in memory for replay after
+                a reconnect (0 disables replay)
+            replay_spill_dir: Directory for session audio beyond replay_buffer_bytes
+            reconnect_base: Upper bound of the first jittered reconnect delay (the
+                very first retry is immediate)
+            reconnect_max: Largest reconnect delay in seconds
         """
+        if send_queue_policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown send queue policy: {send_queue_policy}")
+
         self.url = url
         self.client_id = client_id
         self.heartbeat_interval = heartbeat_interval
+        self.binary_audio_offered = binary_audio
+        self.audio_codecs = audio_codecs or ["pcm"]
+        self.send_queue_size = send_queue_size
+        self.send_queue_policy = send_queue_policy
+        self.audio_batch_max = max(1, audio_batch_max)
+        # The current session, replayed with its original sequence numbers
+        # if the connection drops before the backend has all of it
+        self.session = (
+            SessionAudioBuffer(replay_buffer_bytes, replay_spill_dir) if replay_buffer_bytes > 0 else None
+        )
 
         self.websocket: Optional[WebSocketClientProtocol] = None
         self.connected = False
-        self.reconnect_delay = 3
+        self.state = ConnectionState.DISCONNECTED
+        self.backoff = ReconnectBackoff(reconnect_base, reconnect_max)
+        # Issued by the backend in connection_ack and offered back on
+        # reconnect, so it can restore the session instead of starting over
+        self.resume_token: Optional[str] = None
+
+        # Negotiated per connection via connection_ack
+        self.binary_audio = False
+        self.audio_batching = False
+        self.audio_codec = "pcm"
+
+        # Outbound messages are written by one task, so a slow socket never
+        # stalls the caller
+        self._queues: tuple[deque[OutgoingMessage], ...] = (deque(), deque())
+        self._queue_ready = asyncio.Event()
+        self._queue_space = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._sending = False
+        self._pinned = 0
+        # Audio is held back until the backend says what it kept of a session
+        self._replay_pending = False
+        self._replay_timer: Optional[asyncio.TimerHandle] = None
+
+        # Counters
+        self.messages_sent = 0
+        self.audio_chunks_sent = 0
+        self.batches_sent = 0
+        self.audio_dropped = 0
+        self.max_queue_depth = 0
+        self.last_send_latency_ms = 0.0
+        self.max_send_latency_ms = 0.0
+        self._total_send_latency_ms = 0.0
+        self.reconnects = 0
+        self.sessions_resumed = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.last_rtt_ms = 0.0
+        self.max_rtt_ms = 0.0
+        # Ping round trips (seconds), see measure_rtt
+        self.rtt_histogram: Optional[Histogram] = None
+        # Stamps when interaction stages reach or leave the socket
+        self.tracer: Optional[LatencyTracer] = None
 
         # Event handlers
         self.on_state_change: Optional[Callable[[str], None]] = None
@@ -38,10 +217,25 @@ class WebSocketClient:
         self.on_session_reset: Optional[Callable[[], None]] = None
         self.on_transcript: Optional[Callable[[str, bool], None]] = None
         self.on_tool_status: Optional[Callable[[str, str], None]] = None  # (status, name)
+        self.on_connection_state: Optional[Callable[[ConnectionState], None]] = None
+
+        # Incoming event handlers by type; see register_handler
+        self._handlers: dict[str, Callable[[dict, dict], None]] = {
+            "connection_ack": self._on_connection_ack,
+            "set_state": self._on_set_state,
+            "state": self._on_state,
+            "interrupt_tts": self._on_interrupt_tts,
+            "tts_audio": self._on_tts_audio,
+            "session_reset": self._on_session_reset,
+            "transcript": self._on_transcript,
+            "assistant_response": self._on_assistant_response,
+            "tool_status": self._on_tool_status,
+        }
 
     async def connect(self) -> None:
         """Establish WebSocket connection to backend."""
         # Clean up any existing connection first
+        await self._stop_writer()
         if self.websocket:
             try:
                 await self.websocket.close()
@@ -49,28 +243,73 @@ class WebSocketClient:
                 pass
             self.websocket = None
             self.connected = False
+        self._cancel_replay()
         
         try:
             logger.info(f"Connecting to backend: {self.url}")
+            self._set_state(ConnectionState.CONNECTING)
             self.websocket = await websockets.connect(self.url)
             self.connected = True
+            self.binary_audio = False
+            self.audio_batching = False
+            self.audio_codec = "pcm"
             logger.info("WebSocket connected successfully")
+            self._set_state(ConnectionState.CONNECTED)
+
+            # Whatever was queued for the old connection is stale
+            self._clear_queues()
+            self._writer = asyncio.create_task(self._writer_loop(self.websocket))
 
-            # Send connection ready message
-            await self.send_event("connection_ready", {
+            # Send connection ready message. Backends that understand the
+            # offers reply with connection_ack; older ones ignore them and we
+            # stay on base64 JSON PCM
+            ready = {
                 "client_id": self.client_id,
-                "timestamp": self._get_timestamp()
-            })
+                "timestamp": iso_timestamp(),
+                "audio_codecs": self.audio_codecs,
+            }
+            if self.binary_audio_offered:
+                ready["binary_audio"] = {
+                    "version": framing.FRAME_VERSION,
+                    "batch": self.audio_batch_max > 1,
+                }
+            if self.resume_token:
+                ready["resume_token"] = self.resume_token
+            await self.send_event("connection_ready", ready)
+
+            if self.session and self.session.active:
+                if self.resume_token:
+                    # connection_ack tells what the backend kept of the session
+                    self._replay_pending = True
+                    self._replay_timer = asyncio.get_running_loop().call_later(
+                        RESUME_ACK_TIMEOUT, self._replay_session
+                    )
+                else:
+                    self._replay_session()
 
         except Exception as e:
             logger.error(f"Failed to connect to backend: {e}")
             self.connected = False
             self.websocket = None
+            self._set_state(ConnectionState.DISCONNECTED)
             raise
 
-    async def disconnect(self) -> None:
-        """Close WebSocket connection."""
+    async def disconnect(self, drain_timeout: float = 0.5) -> None:
+        """
+        Close WebSocket connection.
+
+        Args:
+            drain_timeout: Seconds to let queued messages go out first
+        """
+        if self.connected and self._writer:
+            await self.drain(drain_timeout)
+        await self._stop_writer()
+        self._cancel_replay()
         self.connected = False
+        self.binary_audio = False
+        self.audio_batching = False
+        self.audio_codec = "pcm"
+        self._set_state(ConnectionState.DISCONNECTED)
         if self.websocket:
             logger.info("Disconnecting from backend")
             try:
@@ -80,72 +319,369 @@ class WebSocketClient:
             finally:
                 self.websocket = None
 
-    async def send_event(self, event_type: str, data: dict) -> None:
+    async def send_event(
+        self, event_type: str, data: dict, priority: int = PRIORITY_CONTROL, stage: Optional[str] = None
+    ) -> None:
         """
-        Send an event to the backend.
+        Queue an event for the backend.
 
         Args:
             event_type: Type of event (e.g., 'wakeword_detected', 'audio_chunk')
             data: Event payload
+            priority: PRIORITY_CONTROL to overtake queued audio, or
+                PRIORITY_AUDIO to stay in order with it
+            stage: Interaction stage to stamp when it is sent (see tracing.STAGES)
         """
         if not self.connected or not self.websocket:
-            logger.warning(f"Cannot send event {event_type}: not connected")
+            rate_limited.warning("Cannot send event %s: not connected", event_type)
             return
 
         message = {
             "type": event_type,
             "data": data
         }
+        self._enqueue(OutgoingMessage(time.monotonic(), message=json.dumps(message), stage=stage), priority)
 
-        try:
-            await self.websocket.send(json.dumps(message))
-            logger.debug(f"Sent event: {event_type}")
-        except Exception as e:
-            logger.error(f"Failed to send event {event_type}: {e}")
-            self.connected = False
-
-    async def send_wake_word_detected(self, confidence: float) -> None:
-        """Send wake word detection event."""
-        await self.send_event("wakeword_detected", {
+    async def send_wake_word_detected(
+        self, confidence: float, model: str = "", detected_at: Optional[float] = None
+    ) -> None:
+        """Send wake word detection event (starts a session); detected_at is a monotonic time."""
+        await self._send_session_start("wakeword_detected", {
             "confidence": float(confidence),  # Convert numpy float32 to Python float
-            "timestamp": self._get_timestamp()
+            "model": model,
+            "timestamp": iso_timestamp(detected_at)
         })
 
-    async def send_wake_word_barge_in(self, confidence: float) -> None:
-        """Send wake word barge-in event (during speaking)."""
-        await self.send_event("wakeword_barge_in", {
+    async def send_wake_word_barge_in(
+        self, confidence: float, model: str = "", detected_at: Optional[float] = None
+    ) -> None:
+        """Send wake word barge-in event (during speaking; starts a session)."""
+        await self._send_session_start("wakeword_barge_in", {
             "confidence": float(confidence),  # Convert numpy float32 to Python float
-            "timestamp": self._get_timestamp()
+            "model": model,
+            "timestamp": iso_timestamp(detected_at)
         })
 
-    async def send_audio_chunk(self, audio_data: bytes, sequence: int) -> None:
+    async def _send_session_start(self, event_type: str, data: dict) -> None:
+        """Send the event that opens a session, and start recording it for replay."""
+        if self.session:
+            self.session.start(event_type, data)
+        await self.send_event(event_type, data, stage="wakeword_sent")
+
+    async def send_audio_chunk(self, audio_data: bytes | memoryview, sequence: int, codec: str = "pcm") -> None:
         """
         Send audio chunk to backend.
 
+        Uses a binary frame when the backend accepted binary audio in the
+        handshake, otherwise falls back to base64 inside JSON. The chunk is
+        queued and framed when the writer gets to it, so chunks backed up
+        behind a slow socket can be coalesced into one batch frame. A
+        framing.payload_buffer() packet is framed in place, without a copy.
+
         Args:
-            audio_data: Raw audio bytes (PCM 16-bit)
+            audio_data: Encoded audio bytes (PCM 16-bit or one Opus packet)
             sequence: Sequence number for ordering
+            codec: Codec of audio_data ('pcm' or 'opus')
         """
-        # Convert audio to base64 for JSON transmission
-        audio_b64 = base64.b64encode(audio_data).decode('utf-8')
+        recorded = bool(self.session and self.session.active)
+        if recorded:
+            self.session.add(sequence, codec, audio_data)
 
-        await self.send_event("audio_chunk", {
-            "audio": audio_b64,
-            "seq": sequence
-        })
+        if recorded and self._replay_pending:
+            # Goes out with the replay once the backend acknowledges the resume
+            return
+        if not self.connected or not self.websocket:
+            if not recorded:
+                rate_limited.warning("Cannot send event audio_chunk: not connected")
+            # Otherwise it goes out with the session replay after reconnecting
+            return
+
+        if self.send_queue_policy == "block":
+            await self._wait_for_space()
+        self._enqueue(
+            OutgoingMessage(time.monotonic(), audio=audio_data, sequence=sequence, codec=codec),
+            PRIORITY_AUDIO,
+        )
+
+    async def send_binary(self, frame: bytes) -> None:
+        """
+        Queue a raw binary frame for the backend (in order with audio).
+
+        Args:
+            frame: Encoded frame (see framing.encode_frame)
+        """
+        if not self.connected or not self.websocket:
+            rate_limited.warning("Cannot send binary frame: not connected")
+            return
+
+        self._enqueue(OutgoingMessage(time.monotonic(), message=frame), PRIORITY_AUDIO)
 
     async def send_stream_end(self, reason: str) -> None:
-        """Send stream end notification."""
-        await self.send_event("stream_end", {
-            "reason": reason
-        })
+        """Send stream end notification (after the stream's queued audio)."""
+        data = {"reason": reason}
+        if self.session and self.session.active:
+            self.session.end("stream_end", data)
+            if not self.connected or self._replay_pending:
+                # Goes out with the session replay after reconnecting
+                return
+        await self.send_event("stream_end", data, priority=PRIORITY_AUDIO, stage="stream_end_sent")
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Wait for the send queue to empty and the last message to go out.
+
+        Args:
+            timeout: Seconds to wait at most
+
+        Returns:
+            True if everything queued was sent
+        """
+        deadline = time.monotonic() + timeout
+        while (self.queue_depth or self._sending) and self.connected and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        return not (self.queue_depth or self._sending)
+
+    @property
+    def queue_depth(self) -> int:
+        """Messages waiting to be sent."""
+        return sum(len(queue) for queue in self._queues)
+
+    def stats(self) -> dict:
+        """Get send queue counters and latencies."""
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "messages_sent": self.messages_sent,
+            "audio_chunks_sent": self.audio_chunks_sent,
+            "batches_sent": self.batches_sent,
+            "audio_dropped": self.audio_dropped,
+            "last_send_latency_ms": self.last_send_latency_ms,
+            "max_send_latency_ms": self.max_send_latency_ms,
+            "avg_send_latency_ms": (
+                self._total_send_latency_ms / self.messages_sent if self.messages_sent else 0.0
+            ),
+            "connection_state": self.state.value,
+            "reconnects": self.reconnects,
+            "sessions_resumed": self.sessions_resumed,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "last_rtt_ms": self.last_rtt_ms,
+            "max_rtt_ms": self.max_rtt_ms,
+        }
+
+    def _set_state(self, state: ConnectionState) -> None:
+        """Record a connection state change and notify the handler."""
+        if state == self.state:
+            return
+        self.state = state
+        if self.on_connection_state:
+            self.on_connection_state(state)
+
+    def _enqueue(self, item: OutgoingMessage, priority: int) -> None:
+        """Add a message to its lane, applying the full-queue policy to audio."""
+        audio = self._queues[PRIORITY_AUDIO]
+        if item.pinned:
+            self._pinned += 1
+        elif item.audio is not None and len(audio) - self._pinned >= self.send_queue_size:
+            if self.send_queue_policy == "drop_newest":
+                self.audio_dropped += 1
+                return
+            # drop_oldest (or block that timed out): make room by dropping
+            # the oldest queued chunk; queued events like stream_end stay
+            for i, queued in enumerate(audio):
+                if queued.audio is not None and not queued.pinned:
+                    del audio[i]
+                    self.audio_dropped += 1
+                    break
+
+        self._queues[priority].append(item)
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        self._queue_ready.set()
+
+    async def _wait_for_space(self) -> None:
+        """Block until the audio lane has room (or the connection is gone)."""
+        while self.connected and len(self._queues[PRIORITY_AUDIO]) - self._pinned >= self.send_queue_size:
+            self._queue_space.clear()
+            try:
+                await asyncio.wait_for(self._queue_space.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                return
+
+    def _clear_queues(self) -> None:
+        """Drop everything queued."""
+        for queue in self._queues:
+            queue.clear()
+        self._pinned = 0
+        self._queue_space.set()
+
+    def _replay_session(self, last_sequence: Optional[int] = None) -> None:
+        """
+        Queue the interrupted session again, chunks with their original sequence numbers.
+
+        Args:
+            last_sequence: Last chunk the backend kept of a session it resumed
+                (None replays the whole session, opening event included)
+        """
+        self._cancel_replay()
+        if not self.session or not self.session.active or not self.connected:
+            return
+
+        resumed = last_sequence is not None
+        chunks = [chunk for chunk in self.session.chunks() if not resumed or chunk[0] > last_sequence]
+        logger.info(
+            f"🔁 Replaying {len(chunks)} audio chunks of the interrupted session"
+            f"{f' after seq {last_sequence}' if resumed else ''}"
+        )
+        self.session.replays += 1
+
+        now = time.monotonic()
+        if not resumed:
+            event_type, data = self.session.start_event
+            message = json.dumps({"type": event_type, "data": {**data, "resumed": True}})
+            self._enqueue(OutgoingMessage(now, message=message), PRIORITY_CONTROL)
+
+        for sequence, codec, audio in chunks:
+            self._enqueue(
+                OutgoingMessage(now, audio=audio, sequence=sequence, codec=codec, pinned=True),
+                PRIORITY_AUDIO,
+            )
+        if self.session.end_event:
+            event_type, data = self.session.end_event
+            message = json.dumps({"type": event_type, "data": data})
+            self._enqueue(OutgoingMessage(now, message=message, pinned=True), PRIORITY_AUDIO)
+
+    def _cancel_replay(self) -> None:
+        """Stop waiting for connection_ack to replay the session."""
+        self._replay_pending = False
+        if self._replay_timer:
+            self._replay_timer.cancel()
+            self._replay_timer = None
+
+    def _next_message(self) -> tuple[str | bytes, list[OutgoingMessage]]:
+        """Pop the next message to send, coalescing consecutive audio chunks."""
+        for queue in self._queues:
+            if queue:
+                break
+        item = queue.popleft()
+        if item.pinned:
+            self._pinned -= 1
+        if item.audio is None:
+            return item.message, [item]
+
+        if not self.binary_audio:
+            # Convert audio to base64 for JSON transmission
+            data = {"audio": base64.b64encode(item.audio).decode("utf-8"), "seq": item.sequence}
+            if item.codec != "pcm":
+                # Omitted for PCM so old backends see the original payload
+                data["codec"] = item.codec
+            return json.dumps({"type": "audio_chunk", "data": data}), [item]
+
+        items = [item]
+        # Chunks too long for a batch length prefix go out on their own
+        if self.audio_batching and len(item.audio) <= framing.MAX_BATCH_CHUNK:
+            while (
+                len(items) < self.audio_batch_max and queue and queue[0].audio is not None
+                and queue[0].codec == item.codec and queue[0].sequence == items[-1].sequence + 1
+                and len(queue[0].audio) <= framing.MAX_BATCH_CHUNK
+            ):
+                items.append(queue.popleft())
+                if items[-1].pinned:
+                    self._pinned -= 1
+
+        codec = framing.CODEC_IDS[item.codec]
+        if len(items) == 1:
+            return framing.encode_frame(framing.KIND_AUDIO_CHUNK, codec, item.sequence, item.audio), items
+        return framing.encode_batch(codec, item.sequence, [queued.audio for queued in items]), items
+
+    async def _writer_loop(self, websocket: WebSocketClientProtocol) -> None:
+        """Writer task: send queued messages in priority order until the socket fails."""
+        while True:
+            if not self.queue_depth:
+                self._queue_ready.clear()
+                await self._queue_ready.wait()
+                continue
+
+            try:
+                message, items = self._next_message()
+            except Exception as e:
+                # The message is lost; reconnect (and replay the session)
+                # rather than leave a dead writer behind an open socket
+                logger.error(f"Failed to build message, dropping it and reconnecting: {e}")
+                self._queue_space.set()
+                self.connected = False
+                await websocket.close(1011, "client failed to frame a message")
+                return
+            self._queue_space.set()
+            self._sending = True
+            try:
+                await websocket.send(message)
+            except Exception as e:
+                rate_limited.error("Failed to send message: %s", e)
+                self.connected = False
+                return
+            finally:
+                self._sending = False
+
+            latency_ms = (time.monotonic() - items[0].enqueued) * 1000
+            self.messages_sent += 1
+            self.bytes_sent += len(message)
+            self.last_send_latency_ms = latency_ms
+            self.max_send_latency_ms = max(self.max_send_latency_ms, latency_ms)
+            self._total_send_latency_ms += latency_ms
+            if items[0].audio is not None:
+                self.audio_chunks_sent += len(items)
+                if len(items) > 1:
+                    self.batches_sent += 1
+            stage = items[0].stage or ("first_audio_sent" if items[0].audio is not None else None)
+            if self.tracer and stage:
+                self.tracer.mark(stage)
+
+    async def _stop_writer(self) -> None:
+        """Cancel the writer task."""
+        if self._writer:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._writer = None
 
     async def send_heartbeat(self) -> None:
         """Send heartbeat to keep connection alive."""
         await self.send_event("heartbeat", {
-            "timestamp": self._get_timestamp()
+            "timestamp": iso_timestamp()
         })
 
+    async def measure_rtt(self, timeout: float = 5.0) -> Optional[float]:
+        """
+        Time a WebSocket ping/pong round trip.
+
+        The ping is a control frame written directly to the socket, so queued
+        audio doesn't inflate the result.
+
+        Args:
+            timeout: Seconds to wait for the pong
+
+        Returns:
+            Round trip in seconds, or None if not connected or no pong arrived
+        """
+        if not self.connected or not self.websocket:
+            return None
+        try:
+            start = time.monotonic()
+            pong = await self.websocket.ping()
+            await asyncio.wait_for(pong, timeout)
+        except Exception as e:
+            logger.debug("Ping failed: %s", e)
+            return None
+
+        rtt = time.monotonic() - start
+        self.last_rtt_ms = rtt * 1000
+        self.max_rtt_ms = max(self.max_rtt_ms, self.last_rtt_ms)
+        if self.rtt_histogram:
+            self.rtt_histogram.observe(rtt)
+        return rtt
+
     async def receive_messages(self) -> None:
         """Listen for messages from backend and dispatch to handlers."""
         if not self.websocket:
@@ -153,6 +689,7 @@ class WebSocketClient:
 
         try:
             async for message in self.websocket:
+                self.bytes_received += len(message)
                 await self._handle_message(message)
         except websockets.exceptions.ConnectionClosed as e:
             logger.warning(f"WebSocket connection closed - Code: {e.code}, Reason: '{e.reason}'")
@@ -161,93 +698,184 @@ class WebSocketClient:
             logger.error(f"Error receiving messages: {type(e).__name__}: {e}")
             self.connected = False
 
-    async def _handle_message(self, message: str) -> None:
+    async def _handle_message(self, message: str | bytes) -> None:
         """Process incoming message from backend."""
+        if isinstance(message, bytes):
+            self._handle_binary_message(message)
+            return
+
         try:
-            data = json.loads(message)
+            data = decode_message(message)
             event_type = data.get("type")
             # Some messages have payload in 'data', others have it at root level
-            payload = data.get("data", {})
-            # Handle case where payload itself is a string (not a dict)
-            if isinstance(payload, str):
+            # (and for tts_audio 'data' is the audio itself)
+            payload = data.get("data")
+            if not isinstance(payload, dict):
                 payload = {}
 
-            logger.debug(f"Received event: {event_type}")
-
-            if event_type == "set_state":
-                state = payload.get("state") if isinstance(payload, dict) else None
-                if self.on_state_change and state:
-                    self.on_state_change(state)
-
-            elif event_type == "state":
-                # Handle state message format: {type: 'state', state: 'LISTENING'}
-                state = data.get("state")
-                if self.on_state_change and state:
-                    self.on_state_change(state.lower())
-
-            elif event_type == "interrupt_tts":
-                if self.on_interrupt_tts:
-                    self.on_interrupt_tts()
-
-            elif event_type == "tts_audio":
-                # Audio is in 'data' key at root level, base64 encoded
-                audio_b64 = data.get("data")
-                audio_format = payload.get("format", "pcm") if isinstance(payload, dict) else "pcm"
-                if self.on_tts_audio and audio_b64:
-                    audio_bytes = base64.b64decode(audio_b64)
-                    self.on_tts_audio(audio_bytes, audio_format)
-
-            elif event_type == "session_reset":
-                if self.on_session_reset:
-                    self.on_session_reset()
-
-            elif event_type == "transcript":
-                # Transcript message: {type: 'transcript', text: '...', is_final: bool}
-                text = data.get("text") or (payload.get("text") if isinstance(payload, dict) else None)
-                is_final = data.get("is_final", False) or (payload.get("is_final", False) if isinstance(payload, dict) else False)
-                if self.on_transcript and text:
-                    self.on_transcript(text, is_final)
-
-            elif event_type == "assistant_response":
-                # Assistant response message: {type: 'assistant_response', text: '...'}
-                text = data.get("text")
-                logger.info(f"Assistant says: {text}")
-                # Could add an on_assistant_response handler here if needed
-
-            elif event_type == "tool_status":
-                # Tool status message: {type: 'tool_status', status: '...', name: '...'}
-                status = data.get("status")
-                name = data.get("name")
-                if self.on_tool_status and status and name:
-                    self.on_tool_status(status, name)
+            logger.debug("Received event: %s", event_type)
 
+            handler = self._handlers.get(event_type)
+            if handler:
+                handler(data, payload)
             else:
-                logger.debug(f"Ignoring unhandled event type: {event_type}")
+                logger.debug("Ignoring unhandled event type: %s", event_type)
 
         except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON received: {e}")
+            rate_limited.error("Invalid JSON received: %s", e)
         except Exception as e:
-            logger.error(f"Error handling message: {e}")
+            rate_limited.error("Error handling message: %s", e)
+
+    def register_handler(self, event_type: str, handler: Callable[[dict, dict], None]) -> None:
+        """
+        Handle another backend event type, or replace a built-in handler.
+
+        Args:
+            event_type: Value of the message's 'type'
+            handler: Called with the whole message and its 'data' dict ({} if
+                'data' is missing or not an object)
+        """
+        self._handlers[event_type] = handler
+
+    def _on_connection_ack(self, data: dict, payload: dict) -> None:
+        """Apply the backend's handshake choices (and resume the session)."""
+        accepted = bool(payload.get("binary_audio"))
+        self.binary_audio = self.binary_audio_offered and accepted
+        self.audio_batching = (
+            self.binary_audio and self.audio_batch_max > 1 and bool(payload.get("audio_batch"))
+        )
+        codec = payload.get("audio_codec", "pcm")
+        self.audio_codec = codec if codec in self.audio_codecs else "pcm"
+        self.resume_token = payload.get("resume_token") or self.resume_token
+        if self._replay_pending:
+            if payload.get("resumed"):
+                # The backend restored the session; send only what it lacks
+                self.sessions_resumed += 1
+                self._replay_session(last_sequence=int(payload.get("last_seq", -1)))
+            else:
+                self._replay_session()
+        logger.info(
+            f"Backend acknowledged connection "
+            f"(binary audio: {self.binary_audio}, batching: {self.audio_batching}, "
+            f"codec: {self.audio_codec})"
+        )
+
+    def _on_set_state(self, data: dict, payload: dict) -> None:
+        """Handle {type: 'set_state', data: {state}}."""
+        state = payload.get("state")
+        self._session_progress(state)
+        if self.on_state_change and state:
+            self.on_state_change(state)
+
+    def _on_state(self, data: dict, payload: dict) -> None:
+        """Handle {type: 'state', state: 'LISTENING'}."""
+        state = data.get("state")
+        self._session_progress(state)
+        if self.on_state_change and state:
+            self.on_state_change(state.lower())
+
+    def _on_interrupt_tts(self, data: dict, payload: dict) -> None:
+        """Stop TTS playback."""
+        if self.on_interrupt_tts:
+            self.on_interrupt_tts()
+
+    def _on_tts_audio(self, data: dict, payload: dict) -> None:
+        """Play a JSON tts_audio chunk."""
+        if self.tracer:
+            self.tracer.mark("first_tts_audio")
+        # Audio is in 'data' key at root level, base64 encoded
+        audio_b64 = data.get("data")
+        if self.on_tts_audio and isinstance(audio_b64, str) and audio_b64:
+            self.on_tts_audio(base64.b64decode(audio_b64), payload.get("format", "pcm"))
+
+    def _on_session_reset(self, data: dict, payload: dict) -> None:
+        """Forget the session and return to IDLE."""
+        if self.session:
+            self.session.clear()
+        if self.on_session_reset:
+            self.on_session_reset()
+
+    def _on_transcript(self, data: dict, payload: dict) -> None:
+        """Pass on a partial or final transcript."""
+        # Transcript message: {type: 'transcript', text: '...', is_final: bool}
+        if self.tracer:
+            self.tracer.mark("first_transcript")
+        text = _field(data, payload, "text")
+        is_final = bool(_field(data, payload, "is_final", False))
+        if self.on_transcript and text:
+            self.on_transcript(text, is_final)
+
+    def _on_assistant_response(self, data: dict, payload: dict) -> None:
+        """Log the assistant's reply."""
+        # Assistant response message: {type: 'assistant_response', text: '...'}
+        logger.info(f"Assistant says: {data.get('text')}")
+
+    def _on_tool_status(self, data: dict, payload: dict) -> None:
+        """Pass on a tool call update."""
+        # Tool status message: {type: 'tool_status', status: '...', name: '...'}
+        status = data.get("status")
+        name = data.get("name")
+        if self.on_tool_status and status and name:
+            self.on_tool_status(status, name)
+
+    def _session_progress(self, state: Optional[str]) -> None:
+        """Stop recording the session once the backend has moved past it."""
+        if not self.session or not self.session.active or not state:
+            return
+        # After stream_end any state change means the utterance arrived;
+        # leaving listening on its own (backend endpointing) means the same
+        if self.session.end_event or state.lower() != "listening":
+            self.session.clear()
+
+    def _handle_binary_message(self, message: bytes) -> None:
+        """Process an incoming binary audio frame from backend."""
+        try:
+            frame = framing.decode_frame(message)
+        except ValueError as e:
+            rate_limited.error("Invalid binary frame received: %s", e)
+            return
+
+        if frame.kind == framing.KIND_TTS_AUDIO:
+            if self.tracer:
+                self.tracer.mark("first_tts_audio")
+            if self.on_tts_audio and frame.payload:
+                self.on_tts_audio(frame.payload, frame.codec_name)
+        else:
+            logger.debug("Ignoring binary frame of kind %s", frame.kind)
 
-    async def run_with_reconnect(self, receive_handler: Callable) -> None:
+    async def run_with_reconnect(self, receive_handler: Optional[Callable] = None) -> None:
         """
-        Run WebSocket client with automatic reconnection.
+        Keep the connection up: connect, receive until it drops, back off, repeat.
 
         Args:
             receive_handler: Async function to handle incoming messages
+                (defaults to receive_messages)
         """
+        receive_handler = receive_handler or self.receive_messages
+        ever_connected = False
         while True:
+            delay = self.backoff.next_delay()
+            if delay:
+                self._set_state(ConnectionState.BACKING_OFF)
+                logger.info(f"Reconnecting in {delay:.1f} seconds (attempt {self.backoff.attempt})...")
+                await asyncio.sleep(delay)
+
             try:
                 await self.connect()
+            except Exception:
+                # connect() already logged the error
+                continue
+
+            if ever_connected:
+                self.reconnects += 1
+            ever_connected = True
+            connected_at = time.monotonic()
+            try:
                 await receive_handler()
             except Exception as e:
                 logger.error(f"WebSocket error: {e}")
 
+            self.backoff.connected(time.monotonic() - connected_at)
             self.connected = False
-            logger.info(f"Reconnecting in {self.reconnect_delay} seconds...")
-            await asyncio.sleep(self.reconnect_delay)
-
-    def _get_timestamp(self) -> str:
-        """Get current timestamp in ISO format."""
-        from datetime import datetime
-        return datetime.utcnow().isoformat() + "Z"
+            self._set_state(ConnectionState.DISCONNECTED)
+            logger.warning("WebSocket connection lost, will reconnect...")
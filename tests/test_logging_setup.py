@@ -0,0 +1,21 @@
+import logging
+
+from audio_agent.logging_setup import RateLimitedLogger
+
+
+def test_records_point_at_the_call_site(caplog):
+    limited = RateLimitedLogger(logging.getLogger("test.rate_limited"))
+    with caplog.at_level(logging.DEBUG, logger="test.rate_limited"):
+        limited.warning("through a wrapper %d", 1)
+        limited.log(logging.INFO, "direct")
+    assert [record.funcName for record in caplog.records] == ["test_records_point_at_the_call_site"] * 2
+    assert all(record.filename == "test_logging_setup.py" for record in caplog.records)
+
+
+def test_repeats_within_the_interval_are_counted(caplog):
+    limited = RateLimitedLogger(logging.getLogger("test.rate_limited"), interval=60.0)
+    with caplog.at_level(logging.INFO, logger="test.rate_limited"):
+        for _ in range(3):
+            limited.info("tick")
+    assert len(caplog.records) == 1
+    assert limited._suppressed == {"tick": 2}
@@ -0,0 +1,28 @@
+import random
+
+from audio_agent.reconnect import ReconnectBackoff
+
+
+def test_first_retry_is_immediate():
+    backoff = ReconnectBackoff(rng=random.Random(0))
+    assert backoff.next_delay() == 0.0
+    assert 0 <= backoff.next_delay() <= backoff.base
+
+
+def test_delays_stay_within_cap_through_a_long_outage():
+    backoff = ReconnectBackoff(base=0.5, cap=30.0, rng=random.Random(1))
+    delays = [backoff.next_delay() for _ in range(2500)]
+    assert backoff.attempt == 2500
+    assert all(0 <= delay <= 30.0 for delay in delays)
+    # Jittered over the whole capped range, not stuck near zero
+    assert max(delays[-100:]) > 15.0
+
+
+def test_stable_connection_resets_attempts():
+    backoff = ReconnectBackoff(stable_seconds=10.0, rng=random.Random(2))
+    for _ in range(5):
+        backoff.next_delay()
+    backoff.connected(3.0)
+    assert backoff.attempt == 5
+    backoff.connected(10.0)
+    assert backoff.next_delay() == 0.0
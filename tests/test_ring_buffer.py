@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from audio_agent.ring_buffer import RingBuffer
+
+
+def ramp(start, n):
+    return np.arange(start, start + n, dtype=np.int16)
+
+
+def test_read_across_the_wrap_point_is_one_contiguous_view():
+    ring = RingBuffer(10)
+    reader = ring.reader()
+    ring.write(ramp(0, 7))
+    assert reader.read(7).tolist() == list(range(7))
+
+    ring.write(ramp(7, 6))  # storage indices 7, 8, 9, 0, 1, 2
+    window = reader.read(6)
+    assert window.tolist() == list(range(7, 13))
+    assert window.flags.c_contiguous
+    assert not window.flags.writeable
+    assert reader.position == 13
+
+
+def test_read_waits_for_a_full_window():
+    ring = RingBuffer(8)
+    reader = ring.reader()
+    ring.write(ramp(0, 3))
+    assert reader.read(4) is None
+    assert reader.position == 0
+    ring.write(ramp(3, 1))
+    assert reader.read(4).tolist() == [0, 1, 2, 3]
+
+
+def test_write_longer_than_capacity_keeps_the_newest_samples():
+    ring = RingBuffer(4)
+    ring.write(ramp(0, 10))
+    assert ring.write_position == 10
+    assert ring.history(10, 4).tolist() == [6, 7, 8, 9]
+
+
+def test_overrun_reader_skips_to_the_oldest_intact_sample():
+    ring = RingBuffer(8)
+    reader = ring.reader()
+    ring.write(ramp(0, 5))
+    ring.write(ramp(5, 8))  # 13 written, only 5..12 still buffered
+
+    assert reader.available == 8
+    window = reader.read(4)
+    assert reader.overruns == 1
+    assert window.tolist() == [5, 6, 7, 8]
+    assert reader.read(4).tolist() == [9, 10, 11, 12]
+    assert reader.overruns == 1
+
+
+def test_readers_at_different_positions_are_independent():
+    ring = RingBuffer(16)
+    early = ring.reader()
+    ring.write(ramp(0, 6))
+    late = ring.reader()
+    replay = ring.reader(position=2)
+    ring.write(ramp(6, 6))
+
+    assert early.read(4).tolist() == [0, 1, 2, 3]
+    assert late.read(4).tolist() == [6, 7, 8, 9]
+    assert replay.read(8).tolist() == list(range(2, 10))
+    assert (early.position, late.position, replay.position) == (4, 10, 10)
+    assert early.available == 8 and late.available == 2 and replay.available == 2
+
+
+def test_write_silence_wraps_like_write():
+    ring = RingBuffer(6)
+    ring.write(ramp(1, 4))
+    ring.write_silence(4)
+    assert ring.history(ring.write_position, 6).tolist() == [3, 4, 0, 0, 0, 0]
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
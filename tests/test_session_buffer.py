@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+
+from audio_agent.session_buffer import SessionAudioBuffer
+from audio_agent.websocket_client import WebSocketClient
+
+
+class FakeWebSocket:
+    """Records what the writer sends."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+def record(buffer, sequences, size=10):
+    for sequence in sequences:
+        buffer.add(sequence, "pcm", bytes([sequence]) * size)
+
+
+def test_chunks_beyond_the_limit_spill_to_disk_in_order(tmp_path):
+    buffer = SessionAudioBuffer(max_bytes=25, spill_dir=str(tmp_path))
+    buffer.start("wakeword_detected", {})
+    record(buffer, range(6))
+
+    assert buffer.chunks_spilled == 4 and buffer.chunks_dropped == 0
+    assert buffer.stats()["buffered_bytes"] <= 25
+    assert [(sequence, codec, bytes(audio)) for sequence, codec, audio in buffer.chunks()] == [
+        (sequence, "pcm", bytes([sequence]) * 10) for sequence in range(6)
+    ]
+    # Reading the spill file doesn't disturb later appends
+    record(buffer, [6])
+    assert [sequence for sequence, _, _ in buffer.chunks()] == list(range(7))
+
+
+def test_without_a_spill_dir_the_oldest_chunks_are_dropped():
+    buffer = SessionAudioBuffer(max_bytes=25)
+    buffer.start("wakeword_detected", {})
+    record(buffer, range(6))
+
+    assert buffer.chunks_dropped == 4 and buffer.chunks_spilled == 0
+    assert [sequence for sequence, _, _ in buffer.chunks()] == [4, 5]
+
+
+def test_the_newest_chunk_is_kept_even_if_it_alone_exceeds_the_limit():
+    buffer = SessionAudioBuffer(max_bytes=5)
+    buffer.start("wakeword_detected", {})
+    record(buffer, [0, 1])
+    assert [sequence for sequence, _, _ in buffer.chunks()] == [1]
+
+
+def test_spill_file_is_removed_when_the_session_ends(tmp_path):
+    buffer = SessionAudioBuffer(max_bytes=10, spill_dir=str(tmp_path))
+    buffer.start("wakeword_detected", {})
+    record(buffer, range(3))
+    spill = buffer._spill
+    assert spill is not None
+    # Unlinked on creation, so nothing is left behind after a crash
+    assert os.listdir(tmp_path) == []
+
+    buffer.clear()
+    assert spill.closed and buffer._spill is None
+    assert list(buffer.chunks()) == [] and not buffer.active
+
+
+def test_session_end_reported_by_the_backend_closes_the_spill_file(tmp_path):
+    client = WebSocketClient(
+        "ws://backend.test/ws", "test-client", replay_buffer_bytes=10, replay_spill_dir=str(tmp_path)
+    )
+
+    async def scenario():
+        await client.send_wake_word_detected(0.9, "test")
+        for sequence in range(3):
+            await client.send_audio_chunk(bytes(10), sequence)
+        await client.send_stream_end("silence")
+
+    asyncio.run(scenario())
+    spill = client.session._spill
+    assert spill is not None
+
+    client._on_state({"state": "PROCESSING"}, {})
+    assert spill.closed and not client.session.active
+
+
+def test_resumed_ack_replays_only_the_missing_chunks_in_order():
+    client = WebSocketClient("ws://backend.test/ws", "test-client", binary_audio=False)
+
+    async def scenario():
+        # Recorded while the connection is down
+        await client.send_wake_word_detected(0.9, "test")
+        for sequence in range(5):
+            await client.send_audio_chunk(bytes(4), sequence)
+        await client.send_stream_end("silence")
+
+        client.websocket = FakeWebSocket()
+        client.connected = True
+        client._replay_pending = True
+        # Audio arriving before the ack waits for the replay
+        await client.send_audio_chunk(bytes(4), 5)
+        client._on_connection_ack({}, {"resumed": True, "last_seq": 1})
+
+        writer = asyncio.create_task(client._writer_loop(client.websocket))
+        while client.queue_depth or client._sending:
+            await asyncio.sleep(0)
+        writer.cancel()
+        return [json.loads(message) for message in client.websocket.sent]
+
+    sent = asyncio.run(scenario())
+    assert [(message["type"], message["data"].get("seq")) for message in sent] == [
+        ("audio_chunk", 2),
+        ("audio_chunk", 3),
+        ("audio_chunk", 4),
+        ("audio_chunk", 5),
+        ("stream_end", None),
+    ]
+    assert client.sessions_resumed == 1
+
+
+def test_ack_without_resume_replays_the_whole_session():
+    client = WebSocketClient("ws://backend.test/ws", "test-client", binary_audio=False)
+
+    async def scenario():
+        await client.send_wake_word_detected(0.9, "test")
+        for sequence in range(2):
+            await client.send_audio_chunk(bytes(4), sequence)
+
+        client.websocket = FakeWebSocket()
+        client.connected = True
+        client._replay_pending = True
+        client._on_connection_ack({}, {})
+
+        writer = asyncio.create_task(client._writer_loop(client.websocket))
+        while client.queue_depth or client._sending:
+            await asyncio.sleep(0)
+        writer.cancel()
+        return [json.loads(message) for message in client.websocket.sent]
+
+    sent = asyncio.run(scenario())
+    assert [message["type"] for message in sent] == ["wakeword_detected", "audio_chunk", "audio_chunk"]
+    assert sent[0]["data"]["resumed"] is True
+    assert [message["data"]["seq"] for message in sent[1:]] == [0, 1]
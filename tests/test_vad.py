@@ -0,0 +1,25 @@
+import numpy as np
+
+from audio_agent.vad import EnergyVad, SpeechGate
+
+FRAME = 1280
+
+
+def frame(level: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(FRAME) * level).astype(np.int16)
+
+
+def test_gate_releases_preroll_one_frame_at_a_time():
+    gate = SpeechGate(EnergyVad(16000), FRAME, preroll_ms=400, hangover_ms=0)
+    quiet = [frame(30) for _ in range(10)]
+    for silent in quiet:
+        assert gate.process(silent) == []
+
+    speech = frame(8000)
+    frames = gate.process(speech)
+    # 400 ms of pre-roll is five 80 ms frames, then the speech frame itself
+    assert [len(f) for f in frames] == [FRAME] * 6
+    assert all(a is b for a, b in zip(frames[:5], quiet[-5:]))
+    assert frames[-1] is speech
+    assert gate.frames_skipped == 10
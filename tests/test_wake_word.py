@@ -0,0 +1,42 @@
+from audio_agent.wake_word import DetectionPostProcessor
+
+FRAME_SECONDS = 0.08
+
+
+def feed(processor, scores):
+    return [processor.update({"hey_jarvis": score}, FRAME_SECONDS) for score in scores]
+
+
+def processor(**kwargs) -> DetectionPostProcessor:
+    defaults = dict(threshold=0.5, smoothing_frames=1, trigger_frames=1, window_frames=1,
+                    adaptive_gain=0.0, release_ms=240)
+    return DetectionPostProcessor(**{**defaults, **kwargs})
+
+
+def test_one_event_per_utterance():
+    events = feed(processor(), [0.9, 0.95, 0.8, 0.1])
+    assert [e for e in events if e] == [("hey_jarvis", 0.9)]
+
+
+def test_trigger_on_release_frame_is_detected():
+    post = processor()
+    # Event, then exactly the release time (3 x 80 ms) of low scores; the
+    # next frame ends the hold and crosses the threshold itself
+    events = feed(post, [0.9, 0.1, 0.1, 0.1, 0.85])
+    assert events[0] == ("hey_jarvis", 0.9)
+    assert events[-1] == ("hey_jarvis", 0.85)
+    assert post.events == 2
+    assert post.suppressed_triggers == 0
+
+
+def test_trigger_before_release_is_suppressed():
+    post = processor()
+    events = feed(post, [0.9, 0.1, 0.1, 0.85])
+    assert events[-1] is None
+    assert post.suppressed_triggers == 1
+
+
+def test_n_of_m_needs_consecutive_evidence_after_release():
+    post = processor(trigger_frames=2, window_frames=3)
+    events = feed(post, [0.9, 0.9, 0.1, 0.1, 0.1, 0.9, 0.9])
+    assert [i for i, e in enumerate(events) if e] == [1, 6]
@@ -0,0 +1,120 @@
+import asyncio
+import json
+
+from audio_agent import framing
+from audio_agent.websocket_client import PRIORITY_AUDIO, WebSocketClient
+
+
+class FakeWebSocket:
+    """Records what the writer sends."""
+
+    def __init__(self):
+        self.sent = []
+        self.closed = None
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=""):
+        self.closed = (code, reason)
+
+
+def make_client(**kwargs):
+    client = WebSocketClient("ws://backend.test/ws", "test-client", replay_buffer_bytes=0, **kwargs)
+    client.websocket = FakeWebSocket()
+    client.connected = True
+    return client
+
+
+async def write_queued(client):
+    """Run the writer until the queue is empty."""
+    writer = asyncio.create_task(client._writer_loop(client.websocket))
+    while client.queue_depth or client._sending:
+        await asyncio.sleep(0)
+    writer.cancel()
+    return client.websocket.sent
+
+
+def json_sequences(sent):
+    return [json.loads(message)["data"].get("seq") for message in sent]
+
+
+def test_control_events_overtake_queued_audio():
+    async def scenario():
+        client = make_client(binary_audio=False)
+        await client.send_audio_chunk(b"\x00" * 4, 0)
+        await client.send_audio_chunk(b"\x00" * 4, 1)
+        await client.send_stream_end("silence")
+        await client.send_event("wakeword_detected", {"model": "test"})
+        return await write_queued(client)
+
+    sent = [json.loads(message)["type"] for message in asyncio.run(scenario())]
+    # stream_end stays behind the audio it ends
+    assert sent == ["wakeword_detected", "audio_chunk", "audio_chunk", "stream_end"]
+
+
+def test_drop_oldest_makes_room_for_new_audio():
+    async def scenario():
+        client = make_client(binary_audio=False, send_queue_size=3)
+        await client.send_audio_chunk(b"\x00" * 4, 0)
+        await client.send_event("note", {}, priority=PRIORITY_AUDIO)
+        for sequence in (1, 2, 3):
+            await client.send_audio_chunk(b"\x00" * 4, sequence)
+        return client, await write_queued(client)
+
+    client, sent = asyncio.run(scenario())
+    assert client.audio_dropped == 2
+    # Queued events are never dropped to make room
+    assert [json.loads(message)["type"] for message in sent] == ["note", "audio_chunk", "audio_chunk"]
+    assert json_sequences(sent)[1:] == [2, 3]
+
+
+def test_drop_newest_keeps_what_is_queued():
+    async def scenario():
+        client = make_client(binary_audio=False, send_queue_size=2, send_queue_policy="drop_newest")
+        for sequence in range(4):
+            await client.send_audio_chunk(b"\x00" * 4, sequence)
+        return client, await write_queued(client)
+
+    client, sent = asyncio.run(scenario())
+    assert client.audio_dropped == 2
+    assert json_sequences(sent) == [0, 1]
+
+
+def test_oversized_chunks_are_sent_outside_batches():
+    big = bytes(framing.MAX_BATCH_CHUNK + 1)
+
+    async def scenario():
+        client = make_client(audio_batch_max=8)
+        client.binary_audio = client.audio_batching = True
+        for sequence, chunk in enumerate([b"a" * 10, b"b" * 10, big, b"c" * 10, b"d" * 10]):
+            await client.send_audio_chunk(chunk, sequence)
+        return client, await write_queued(client)
+
+    client, sent = asyncio.run(scenario())
+    frames = [framing.decode_frame(message) for message in sent]
+    assert [(frame.kind, frame.sequence) for frame in frames] == [
+        (framing.KIND_AUDIO_BATCH, 0),
+        (framing.KIND_AUDIO_CHUNK, 2),
+        (framing.KIND_AUDIO_BATCH, 3),
+    ]
+    assert framing.decode_batch(frames[0].payload) == [b"a" * 10, b"b" * 10]
+    assert frames[1].payload == big
+    assert framing.decode_batch(frames[2].payload) == [b"c" * 10, b"d" * 10]
+    assert client.audio_chunks_sent == 5 and client.batches_sent == 2
+    assert client.websocket.closed is None
+
+
+def test_batches_stop_at_a_sequence_gap():
+    async def scenario():
+        client = make_client(audio_batch_max=8)
+        client.binary_audio = client.audio_batching = True
+        for sequence in (0, 1, 5):
+            await client.send_audio_chunk(b"x" * 10, sequence)
+        return await write_queued(client)
+
+    frames = [framing.decode_frame(message) for message in asyncio.run(scenario())]
+    assert [(frame.kind, frame.sequence) for frame in frames] == [
+        (framing.KIND_AUDIO_BATCH, 0),
+        (framing.KIND_AUDIO_CHUNK, 5),
+    ]